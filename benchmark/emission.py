@@ -33,7 +33,10 @@ if __name__ == '__main__':
 import sys
 
 from benchmark     import benchmarking
-from notify.signal import Signal
+from notify.bind   import WeakBinding, HAVE_FAST_CALLS, _PYTHON_CALL_METHODS
+from notify.named  import DeclaredSignal
+from notify.signal import Signal, CleanSignal, KeyedSignal, HAVE_FAST_EMISSION, \
+                          _PYTHON_EMISSION_METHODS
 
 
 
@@ -98,6 +101,254 @@ class EmissionBenchmark2 (benchmarking.Benchmark):
 
 
 
+class EmissionBenchmark3 (benchmarking.Benchmark):
+
+    def initialize (self):
+        signal = Signal ()
+
+        for k in xrange (0, 20):
+            signal.connect (_ignoring_handler, k)
+
+        for k in xrange (0, 20, 4):
+            signal.block (_ignoring_handler, k)
+
+        self.__signal = signal
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a signal with 20 function handlers, 5 of them blocked'
+                % int (scale * _NUM_EMISSIONS / 10))
+
+
+    def execute (self, scale = 1.0):
+        signal = self.__signal
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS / 10)):
+            signal ()
+
+
+
+class NamedEmissionBenchmark1 (benchmarking.Benchmark):
+
+    def initialize (self):
+        owner = _Owner ()
+
+        owner.signal.connect (_ignoring_handler)
+        owner.signal.connect (_ignoring_handler, 1)
+        owner.signal.connect (_ignoring_handler, 'a', 'b')
+        owner.signal.connect (_ignoring_handler, None, True, False)
+
+        self.__owner = owner
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a declared signal with 4 function handlers, looked up each time'
+                % int (scale * _NUM_EMISSIONS))
+
+
+    def execute (self, scale = 1.0):
+        owner = self.__owner
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+            owner.signal ()
+
+
+
+class KeyedEmissionBenchmark1 (benchmarking.Benchmark):
+
+    _NUM_KEYS = 1000
+
+    def initialize (self):
+        signal = KeyedSignal ()
+
+        for key in xrange (0, self._NUM_KEYS):
+            signal.connect_key (key, _ignoring_handler)
+            signal.connect_key (key, _ignoring_handler, 1)
+            signal.connect_key (key, _ignoring_handler, 'a', 'b')
+            signal.connect_key (key, _ignoring_handler, None, True, False)
+
+        self.__signal = signal
+
+
+    def get_description (self, scale = 1.0):
+        return ('%d emissions of a keyed signal with 4 function handlers for each of %d keys'
+                % (int (scale * _NUM_EMISSIONS), self._NUM_KEYS))
+
+
+    def execute (self, scale = 1.0):
+        signal   = self.__signal
+        num_keys = self._NUM_KEYS
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+            signal (k % num_keys)
+
+
+
+class _HandlerDeath (object):
+
+    _NUM_HANDLERS = 5000
+
+    def initialize (self):
+        signal  = CleanSignal (deferred_sweep = self._DEFERRED_SWEEP)
+        objects = [_Dummy () for k in xrange (0, self._NUM_HANDLERS)]
+
+        for object in objects:
+            signal.connect (object.ignoring_handler)
+
+        self.__signal  = signal
+        self.__objects = objects
+
+
+    def get_description (self, scale = 1.0):
+        return ('death of all %d handler objects of a clean signal, %s sweeping'
+                % (self._NUM_HANDLERS, self._DEFERRED_SWEEP and 'deferred' or 'immediate'))
+
+
+    def execute (self, scale = 1.0):
+        del self.__objects[:]
+        self.__signal ()
+
+
+class HandlerDeathBenchmark1 (_HandlerDeath, benchmarking.Benchmark):
+    _DEFERRED_SWEEP = False
+
+class HandlerDeathBenchmark2 (_HandlerDeath, benchmarking.Benchmark):
+    _DEFERRED_SWEEP = True
+
+
+
+class _BatchEmission (object):
+
+    # Subclasses must also derive from `benchmarking.Benchmark' and define `_BATCH_SIZE'.
+    # Total number of emitted items doesn't depend on the batch size.
+
+    _BATCH_HANDLERS = False
+
+    def initialize (self):
+        signal = Signal ()
+
+        if self._BATCH_HANDLERS:
+            connect = signal.connect_batch
+        else:
+            connect = signal.connect
+
+        connect (_ignoring_handler)
+        connect (_ignoring_handler, 1)
+        connect (_ignoring_handler, 'a', 'b')
+        connect (_ignoring_handler, None, True, False)
+
+        self.__signal = signal
+        self.__batch  = [(k,) for k in xrange (0, self._BATCH_SIZE)]
+
+
+    def get_description (self, scale = 1.0):
+        if self._BATCH_HANDLERS:
+            handlers = 'batch handlers'
+        else:
+            handlers = 'function handlers'
+
+        return ('%d batch emissions of %d items each of a signal with 4 %s'
+                % (int (scale * _NUM_EMISSIONS / self._BATCH_SIZE), self._BATCH_SIZE,
+                   handlers))
+
+
+    def execute (self, scale = 1.0):
+        signal = self.__signal
+        batch  = self.__batch
+
+        for k in xrange (0, int (scale * _NUM_EMISSIONS / self._BATCH_SIZE)):
+            signal.emit_many (batch)
+
+
+class BatchEmissionBenchmark1 (_BatchEmission, benchmarking.Benchmark):
+    _BATCH_SIZE = 1
+
+class BatchEmissionBenchmark2 (_BatchEmission, benchmarking.Benchmark):
+    _BATCH_SIZE = 100
+
+class BatchEmissionBenchmark3 (_BatchEmission, benchmarking.Benchmark):
+    _BATCH_SIZE = 10000
+
+class BatchEmissionBenchmark4 (_BatchEmission, benchmarking.Benchmark):
+    _BATCH_SIZE     = 100
+    _BATCH_HANDLERS = True
+
+
+
+if HAVE_FAST_EMISSION:
+
+    class _PythonSignal (Signal):
+        __slots__ = ()
+
+    for _name, _method in _PYTHON_EMISSION_METHODS.items ():
+        setattr (_PythonSignal, _name, _method)
+
+    del _name, _method
+
+
+    class PythonEmissionBenchmark1 (benchmarking.Benchmark):
+
+        def initialize (self):
+            signal = _PythonSignal ()
+
+            signal.connect (_ignoring_handler)
+            signal.connect (_ignoring_handler, 1)
+            signal.connect (_ignoring_handler, 'a', 'b')
+            signal.connect (_ignoring_handler, None, True, False)
+
+            self.__signal = signal
+
+
+        def get_description (self, scale = 1.0):
+            return ('%d emissions of a signal with 4 function handlers (pure Python emission)'
+                    % int (scale * _NUM_EMISSIONS))
+
+
+        def execute (self, scale = 1.0):
+            signal = self.__signal
+
+            for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+                signal ()
+
+
+
+if HAVE_FAST_CALLS:
+
+    class _PythonWeakBinding (WeakBinding):
+        __slots__ = ()
+        __call__  = _PYTHON_CALL_METHODS['WeakBinding']
+
+
+    class PythonBindingEmissionBenchmark1 (benchmarking.Benchmark):
+
+        def initialize (self):
+            signal = Signal ()
+            object = _Dummy ()
+
+            signal.connect (_PythonWeakBinding (object.ignoring_handler))
+            signal.connect (_PythonWeakBinding (object.ignoring_handler, (1,)))
+            signal.connect (_PythonWeakBinding (object.ignoring_handler, ('a', 'b')))
+            signal.connect (_PythonWeakBinding (object.ignoring_handler, (None, True, False)))
+
+            self.__signal = signal
+
+            # To keep it alive.
+            self.__object = object
+
+
+        def get_description (self, scale = 1.0):
+            return ('%d emissions of a signal with 4 method handlers (pure Python bindings)'
+                    % int (scale * _NUM_EMISSIONS))
+
+
+        def execute (self, scale = 1.0):
+            signal = self.__signal
+
+            for k in xrange (0, int (scale * _NUM_EMISSIONS)):
+                signal ()
+
+
+
 try:
     import pygtk
     pygtk.require ('2.0')
@@ -180,6 +431,11 @@ class _Dummy (object):
         pass
 
 
+class _Owner (object):
+
+    signal = DeclaredSignal ('signal')
+
+
 
 if __name__ == '__main__':
     benchmarking.main ()
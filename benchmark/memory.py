@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+
+"""
+Memory consumption of signals and connections.  Unlike other benchmarks, this measures
+bytes, not time:
+
+    python benchmark/memory.py [NUM_SIGNALS]
+
+For each tested signal layout, C{NUM_SIGNALS} (one million by default) signals are created
+and kept alive, and average memory per signal is reported.  For each connection layout, a
+method of a separate object is connected to each of C{NUM_SIGNALS} signals, and average
+memory per connection is reported, not counting the signals and objects themselves.
+
+Memory is measured with C{tracemalloc} if available (Python 3.4 and later.)  Otherwise,
+sizes of signal objects, their handler storage, bindings and fixed arguments of bindings
+(the tuple or dictionary and objects directly in it) are summed with C{sys.getsizeof}.
+This leaves out allocator overhead, weak references and functions referenced by bindings
+and anything kept outside of signals, such as the connection registry of clean signals.
+Fixed argument objects are counted for each binding, even if they are shared, like small
+integers.
+"""
+
+
+import gc
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from notify.bind   import Binding
+from notify.signal import Signal, CleanSignal
+
+
+if sys.version_info[0] >= 3:
+    xrange = range
+
+
+
+_NUM_SIGNALS = 1000000
+
+
+def _ignoring_handler (*arguments):
+    pass
+
+
+class _Dummy (object):
+
+    __slots__ = ('__weakref__',)
+
+    def ignoring_handler (self, *arguments, **keywords):
+        pass
+
+
+def _no_handlers (signal):
+    pass
+
+def _one_handler (signal):
+    signal.connect (_ignoring_handler)
+
+def _one_handler_in_tuple (signal):
+    # The layout used before single handlers were stored inline, for comparison.
+    signal.connect (_ignoring_handler)
+    signal._handlers = (signal._handlers,)
+
+def _two_handlers (signal):
+    signal.connect (_ignoring_handler)
+    signal.connect (_ignoring_handler)
+
+
+_LAYOUTS = (('no handlers',                       _no_handlers),
+            ('one handler',                       _one_handler),
+            ('one handler, in one-element tuple', _one_handler_in_tuple),
+            ('two handlers',                      _two_handlers))
+
+
+def _method (signal, object):
+    signal.connect (object.ignoring_handler)
+
+def _method_with_arguments (signal, object):
+    signal.connect (object.ignoring_handler, 1, 2)
+
+def _method_with_keywords (signal, object):
+    signal.connect (object.ignoring_handler, 1, a = 2)
+
+
+_CONNECTION_LAYOUTS = (('method handler',                 Signal,      _method),
+                       ('method handler with arguments',  Signal,      _method_with_arguments),
+                       ('method handler with keywords',   Signal,      _method_with_keywords),
+                       ('method handler of clean signal', CleanSignal, _method))
+
+
+
+def _measure (num_signals, prepare):
+    gc.collect ()
+
+    if tracemalloc is not None:
+        tracemalloc.start ()
+        before = tracemalloc.get_traced_memory () [0]
+
+    signals = [None] * num_signals
+    for k in xrange (0, num_signals):
+        signal = Signal ()
+        prepare (signal)
+        signals[k] = signal
+
+    if tracemalloc is not None:
+        total = tracemalloc.get_traced_memory () [0] - before - sys.getsizeof (signals)
+        tracemalloc.stop ()
+    else:
+        total = 0
+        for signal in signals:
+            total += _get_size (signal)
+
+    return float (total) / num_signals
+
+
+def _measure_connections (num_connections, signal_class, connect):
+    signals = [signal_class () for k in xrange (0, num_connections)]
+    objects = [_Dummy ()       for k in xrange (0, num_connections)]
+
+    gc.collect ()
+
+    if tracemalloc is not None:
+        tracemalloc.start ()
+        before = tracemalloc.get_traced_memory () [0]
+
+    for k in xrange (0, num_connections):
+        connect (signals[k], objects[k])
+
+    if tracemalloc is not None:
+        total = tracemalloc.get_traced_memory () [0] - before
+        tracemalloc.stop ()
+    else:
+        total = 0
+        for signal in signals:
+            total += _get_size (signal) - sys.getsizeof (signal)
+
+    return float (total) / num_connections
+
+
+def _get_size (signal):
+    size     = sys.getsizeof (signal)
+    handlers = signal._handlers
+
+    if isinstance (handlers, tuple):
+        size += sys.getsizeof (handlers)
+
+    if handlers is not None:
+        for connection in handlers:
+            size += sys.getsizeof (connection)
+
+            if isinstance (connection.handler, Binding):
+                size += sys.getsizeof (connection.handler)
+
+                fixed = connection.handler._fixed
+                if fixed is not None:
+                    size += _get_fixed_size (fixed)
+
+    return size
+
+
+def _get_fixed_size (fixed):
+    # See `notify/bind.py' for possible values of `_fixed'.  A tuple can end with a
+    # dictionary of keywords, which is counted with its contents as well.
+    size = sys.getsizeof (fixed)
+
+    if isinstance (fixed, tuple):
+        for argument in fixed:
+            if isinstance (argument, dict):
+                size += _get_fixed_size (argument)
+            else:
+                size += sys.getsizeof (argument)
+    else:
+        for key, value in fixed.items ():
+            size += sys.getsizeof (key) + sys.getsizeof (value)
+
+    return size
+
+
+
+def main (arguments):
+    if arguments:
+        num_signals = int (arguments[0])
+    else:
+        num_signals = _NUM_SIGNALS
+
+    if tracemalloc is not None:
+        sys.stdout.write ('Measuring with tracemalloc\n\n')
+    else:
+        sys.stdout.write ('Measuring with sys.getsizeof (allocator overhead not included)\n\n')
+
+    for description, prepare in _LAYOUTS:
+        size = _measure (num_signals, prepare)
+        sys.stdout.write ('%d signals with %s: %.1f bytes per signal, %.1f MB total\n'
+                          % (num_signals, description, size, size * num_signals / 2.0 ** 20))
+
+    sys.stdout.write ('\n')
+
+    for description, signal_class, connect in _CONNECTION_LAYOUTS:
+        size = _measure_connections (num_signals, signal_class, connect)
+        sys.stdout.write ('%d connections, %s: %.1f bytes per connection, %.1f MB total\n'
+                          % (num_signals, description, size, size * num_signals / 2.0 ** 20))
+
+
+
+if __name__ == '__main__':
+    main (sys.argv[1:])
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -77,6 +77,7 @@ def connecting (self, handler, *arguments, **keywords):
     """
 
     self.connect (handler, *arguments, **keywords)
+    keywords.pop ('_priority', None)
 
     try:
         yield self
@@ -107,6 +108,7 @@ def connecting_safely (self, handler, *arguments, **keywords):
     """
 
     if self.connect_safe (handler, *arguments, **keywords):
+        keywords.pop ('_priority', None)
         try:
             yield self
         finally:
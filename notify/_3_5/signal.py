@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+"""
+Internal module used to implement Python 3.5 features of C{L{AbstractSignal}} and
+C{L{Signal}} classes.  I{Don’t import} this module directly: it is implementation detail
+and will be removed eventually.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('abstract_emit_async', 'emit_async')
+
+
+import asyncio
+import inspect
+import sys
+
+from notify.utils import raise_not_implemented_exception
+
+
+
+async def abstract_emit_async (self, *arguments, **keywords):
+    """
+    emit_async(self, *arguments, **keywords)
+
+    Coroutine counterpart of C{L{emit}}.  Handlers are called just like in C{emit}, but
+    if a handler returns an awaitable (e.g. it is a coroutine function), it is awaited
+    and the result of awaiting is used as the handler’s return value.
+
+    @note:
+    This method is available only in Python 3.5 or newer.
+
+    @rtype:   C{object}
+    @returns: Value, determined by subclass and, possibly, by its
+              L{accumulator <AbstractAccumulator>}.
+    """
+
+    raise_not_implemented_exception (self, 'emit_async')
+
+
+async def emit_async (self, *arguments, _concurrency = 1, **keywords):
+    """
+    emit_async(self, *arguments, _concurrency = 1, **keywords)
+
+    Coroutine counterpart of C{L{emit}}.  Handlers are called just like in C{emit}, but
+    if a handler returns an awaitable (e.g. it is a coroutine function), it is awaited
+    and the result of awaiting is used as the handler’s return value.  Plain handlers
+    are just called, there is no overhead for them.  Accumulator, if any, is applied to
+    handlers’ values in the order of connection and emission stops as soon as it tells
+    so.  This method never emits asynchronously in the sense of C{L{emit}}.
+
+    By default, awaitables are awaited one by one, i.e. next handler is only called when
+    the previous one is completely finished.  If C{_concurrency} is not 1, handlers are
+    run concurrently, up to C{_concurrency} at a time or all at once, if it is C{None}
+    or 0.  In this case, once emission is stopped, those handlers that are still running
+    are cancelled and those that already finished are disregarded.
+
+    Handlers can stop emission with C{L{stop_emission}} only while they are being called,
+    not while their result is awaited.  In particular, body of a coroutine function is
+    executed when it is awaited, so it cannot stop emission, but an ordinary function
+    that calls C{stop_emission} and then returns an awaitable can.
+
+    @note:
+    This method is available only in Python 3.5 or newer.
+
+    @rtype:   C{object}
+    @returns: Value, determined by the signal’s L{accumulator <AbstractAccumulator>}.
+    """
+
+    # This module is imported while `notify.signal' is still being initialized.
+    from notify.signal import _WEAK_HANDLERS
+
+    handlers    = self._get_emission_handlers (arguments)
+    accumulator = self.accumulator
+
+    if accumulator is not None:
+        value = accumulator.get_initial_value ()
+
+    if handlers is not None:
+        might_have_garbage = False
+
+        if _concurrency == 1:
+            for connection in handlers:
+                handler = connection.handler
+                if connection.blocked:
+                    continue
+
+                if not handler and isinstance (handler, _WEAK_HANDLERS):
+                    might_have_garbage = True
+                    continue
+
+                handler_value, stopped = await _invoke_handler (self, handler,
+                                                                arguments, keywords)
+
+                if accumulator is not None and handler_value is not _NO_VALUE:
+                    value = accumulator.accumulate_value (value, handler_value)
+                    if not accumulator.should_continue (value):
+                        stopped = True
+
+                if stopped:
+                    might_have_garbage = True
+                    break
+
+        else:
+            if _concurrency:
+                semaphore = asyncio.Semaphore (_concurrency)
+            else:
+                semaphore = None
+
+            tasks = []
+
+            for connection in handlers:
+                handler = connection.handler
+                if connection.blocked:
+                    continue
+
+                if not handler and isinstance (handler, _WEAK_HANDLERS):
+                    might_have_garbage = True
+                    continue
+
+                tasks.append (asyncio.ensure_future (_invoke_limited (self, handler,
+                                                                      arguments, keywords,
+                                                                      semaphore)))
+
+            try:
+                for task in tasks:
+                    handler_value, stopped = await task
+
+                    if accumulator is not None and handler_value is not _NO_VALUE:
+                        value = accumulator.accumulate_value (value, handler_value)
+                        if not accumulator.should_continue (value):
+                            stopped = True
+
+                    if stopped:
+                        might_have_garbage = True
+                        break
+
+            finally:
+                unfinished_tasks = [task for task in tasks if not task.done ()]
+                if unfinished_tasks:
+                    for task in unfinished_tasks:
+                        task.cancel ()
+
+                    await asyncio.gather (*unfinished_tasks, return_exceptions = True)
+
+        if might_have_garbage:
+            self.collect_garbage ()
+
+    if accumulator is None:
+        return None
+    else:
+        return accumulator.post_process_value (value)
+
+
+
+# Marks handlers that raised an exception; such handlers don't contribute to accumulated
+# value, just like in synchronous emission.
+_NO_VALUE = object ()
+
+
+def _call_handler (signal, handler, arguments, keywords):
+    # Call `handler' as if it was in a normal emission of `signal'.  The emission level is
+    # only raised for the duration of the synchronous call, since awaiting would break
+    # proper nesting of emissions.
+    from notify.signal import AbstractSignal
+
+    saved_emission_level = signal._Signal__emission_level
+    signal._Signal__emission_level = abs (saved_emission_level) + 1
+
+    try:
+        try:
+            handler_value = handler (*arguments, **keywords)
+        except:
+            AbstractSignal.exception_handler (signal, sys.exc_info () [1], handler)
+            handler_value = _NO_VALUE
+
+        return handler_value, signal._Signal__emission_level < 0
+
+    finally:
+        signal._Signal__emission_level = saved_emission_level
+
+
+async def _invoke_handler (signal, handler, arguments, keywords):
+    from notify.signal import AbstractSignal
+
+    handler_value, stopped = _call_handler (signal, handler, arguments, keywords)
+
+    if handler_value is not _NO_VALUE and inspect.isawaitable (handler_value):
+        try:
+            handler_value = await handler_value
+        except asyncio.CancelledError:
+            raise
+        except:
+            AbstractSignal.exception_handler (signal, sys.exc_info () [1], handler)
+            handler_value = _NO_VALUE
+
+    return handler_value, stopped
+
+
+async def _invoke_limited (signal, handler, arguments, keywords, semaphore):
+    if semaphore is None:
+        return await _invoke_handler (signal, handler, arguments, keywords)
+
+    async with semaphore:
+        return await _invoke_handler (signal, handler, arguments, keywords)
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
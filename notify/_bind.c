@@ -0,0 +1,915 @@
+/*--------------------------------------------------------------------*\
+ * This file is part of Py-notify.                                    *
+ *                                                                    *
+ * Copyright (C) 2008 Paul Pogonyshev.                                *
+ *                                                                    *
+ * This library is free software; you can redistribute it and/or      *
+ * modify it under the terms of the GNU Lesser General Public License *
+ * as published by the Free Software Foundation; either version 2.1   *
+ * of the License, or (at your option) any later version.             *
+ *                                                                    *
+ * This library is distributed in the hope that it will be useful,    *
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of     *
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  *
+ * Lesser General Public License for more details.                    *
+ *                                                                    *
+ * You should have received a copy of the GNU Lesser General Public   *
+ * License along with this library; if not, write to the Free         *
+ * Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        *
+ * Boston, MA 02110-1301 USA                                          *
+\*--------------------------------------------------------------------*/
+
+
+#include <Python.h>
+#include <structmember.h>
+
+
+/* See Python documentation for why it prevents rare and very obscure bug.  Need to
+ * backport for older Python versions.
+ */
+#ifdef Py_CLEAR
+#  define Compatibility_CLEAR(object) Py_CLEAR (object)
+#else
+#  define Compatibility_CLEAR(object)                   \
+     do                                                 \
+       {                                                \
+         if (object)                                    \
+           {                                            \
+             PyObject *temp = (PyObject *) (object);    \
+             (object) = NULL;                           \
+             Py_DECREF (temp);                          \
+           }                                            \
+       }                                                \
+     while (0)
+#endif
+
+/* Py_VISIT is not available in 2.3. */
+#ifdef Py_VISIT
+#  define Compatibility_VISIT(object) Py_VISIT (object)
+#else
+#  define Compatibility_VISIT(object)                           \
+     do                                                         \
+       {                                                        \
+         if (object)                                            \
+           {                                                    \
+             int result = visit ((PyObject *) (object), arg);   \
+             if (result)                                        \
+               return result;                                   \
+           }                                                    \
+       }                                                        \
+     while (0)
+#endif
+
+
+/* Py_ssize_t only appeared in 2.5. */
+#if PY_VERSION_HEX < 0x02050000
+typedef int Py_ssize_t;
+#endif
+
+
+/* Working around more changes in Py3k: module initialization. */
+#ifdef PyMODINIT_FUNC
+#  define Compatibility_MODINIT_FUNC PyMODINIT_FUNC
+#else
+#  ifdef DL_EXPORT
+#    define Compatibility_MODINIT_FUNC DL_EXPORT (void)
+#  else
+#    define Compatibility_MODINIT_FUNC void
+#  endif
+#endif
+
+
+#ifdef PyModuleDef_HEAD_INIT
+
+#  define Compatibility_ModuleDef                 PyModuleDef
+#  define Compatibility_ModuleDef_HEAD_INIT       PyModuleDef_HEAD_INIT
+#  define Compatibility_MODINIT_FUNC_NAME(module) PyInit_##module
+
+#  define Compatibility_ModuleCreate(definition)  PyModule_Create (definition)
+#  define Compatibility_ModulePostCreate(module, definition)     \
+     (PyModule_AddStringConstant ((module), "__docformat__",     \
+                                  "epytext en") == 0)
+
+#  define Compatibility_ModuleReturn(module)      return (module)
+
+#  define Compatibility_ModuleState(def, module, type)           \
+     ((type *) PyModule_GetState (module))
+#  define Compatibility_ModuleStateFromDef(def, type)            \
+     ((type *) PyModule_GetState (PyState_FindModule (&def)))
+
+#else  /* !defined PyMODINIT_FUNC */
+
+typedef
+struct
+{
+  const int      dummy;
+  const char    *m_name;
+  const char    *m_doc;
+  int            m_size;
+  PyMethodDef   *m_methods;
+  inquiry        m_reload;
+  traverseproc   m_traverse;
+  inquiry        m_clear;
+  freefunc       m_free;
+}
+Compatibility_ModuleDef;
+
+#  define Compatibility_ModuleDef_HEAD_INIT       0
+#  define Compatibility_MODINIT_FUNC_NAME(module) init##module
+
+#  define Compatibility_ModuleCreate(definition)                        \
+     Py_InitModule ((char *) (definition)->m_name, NULL)
+#  define Compatibility_ModulePostCreate(module, definition)            \
+     (PyModule_AddStringConstant ((module), "__doc__",                  \
+                                  (char *) (definition)->m_doc) == 0    \
+      && PyModule_AddStringConstant ((module), "__docformat__",         \
+                                     "epytext en") == 0)
+
+#  define Compatibility_ModuleReturn(module)      return
+
+#  define Compatibility_ModuleState(def, module, type)                  \
+     (&__2_x_state__##def)
+#  define Compatibility_ModuleStateFromDef(def, type)                   \
+     (&__2_x_state__##def)
+#  define Compatibility_2_x_MODULE_STATE          1
+
+
+#endif  /* !defined PyMODINIT_FUNC */
+
+
+/* Also compatibility, but let's avoid long name in this case. */
+#if defined (PY_MAJOR_VERSION) && PY_MAJOR_VERSION >= 3
+#  define PyString_InternFromString PyUnicode_InternFromString
+#endif
+
+
+
+
+
+
+/*- Type forward declarations --------------------------------------*/
+
+/* Offsets of `Binding' slots we need to access.  They are looked up at module
+ * initialization time, so that we don't need to go through attribute access on each call.
+ */
+typedef
+struct
+{
+  Py_ssize_t  object;
+  Py_ssize_t  function;
+  Py_ssize_t  class_;
+  Py_ssize_t  fixed;
+}
+BindingSlotOffsets;
+
+
+typedef
+struct
+{
+  PyTypeObject *       binding_type;
+  PyTypeObject *       weak_binding_type;
+
+  /* Reference stored in weak bindings without an object. */
+  PyObject *           none_reference;
+
+  /* Type of fixed keywords in `_fixed' slot, see `notify/bind.py'. */
+  PyTypeObject *       frozendict_type;
+
+  BindingSlotOffsets   offsets;
+
+  /* Pure Python implementations of `__call__', for bindings with overridden getters. */
+  PyObject *           python_binding_call;
+  PyObject *           python_weak_binding_call;
+
+  /* Getters as defined in `Binding' and `WeakBinding' classes. */
+  PyObject *           get_object;
+  PyObject *           weak_get_object;
+  PyObject *           get_function;
+  PyObject *           get_class;
+  PyObject *           get_arguments;
+  PyObject *           get_keywords;
+
+  PyObject *           get_object_name;
+  PyObject *           get_function_name;
+  PyObject *           get_class_name;
+  PyObject *           get_arguments_name;
+  PyObject *           get_keywords_name;
+  PyObject *           call_after_garbage_collecting_name;
+}
+BindModuleState;
+
+
+/* What get_getters_kind() returns. */
+#define GETTERS_OVERRIDDEN      0
+#define GETTERS_OF_BINDING      1
+#define GETTERS_OF_WEAK_BINDING 2
+
+
+/* Calls with at most this many arguments (including binding's object and fixed
+ * arguments) don't allocate an argument tuple if vectorcall protocol is available.
+ */
+#define MAX_STACK_ARGUMENTS     8
+
+
+
+/*- Functions forward declarations ---------------------------------*/
+
+static PyObject *   Binding___call__              (PyObject *self,
+                                                   PyObject *arguments, PyObject *keywords);
+static PyObject *   WeakBinding___call__          (PyObject *self,
+                                                   PyObject *arguments, PyObject *keywords);
+
+static PyObject *   do_call                       (BindModuleState *state, PyObject *self,
+                                                   int getters_kind,
+                                                   PyObject *arguments, PyObject *keywords);
+static PyObject *   call_python_implementation    (PyObject *implementation, PyObject *self,
+                                                   PyObject *arguments, PyObject *keywords);
+
+static int          get_getters_kind              (BindModuleState *state, PyObject *self);
+static PyObject *   get_object                    (BindModuleState *state, PyObject *self,
+                                                   int getters_kind);
+
+static PyObject *   get_slot                      (PyObject *self, Py_ssize_t offset,
+                                                   const char *name);
+static int          find_slot_offset              (PyTypeObject *type, const char *name,
+                                                   Py_ssize_t *offset);
+static PyObject *   get_class_dict_item           (PyTypeObject *type, const char *name);
+
+static int          bind_module_initialize_state  (PyObject *self);
+static int          bind_module_traverse          (PyObject *self, visitproc visit, void *arg);
+static int          bind_module_clear             (PyObject *self);
+
+
+
+/*- Documentation --------------------------------------------------*/
+
+#define MODULE_DOC "\
+Internal helper module for C{L{notify.bind}}.  Do not use directly."
+
+
+#define BINDING___CALL___DOC "\
+__call__(self, *arguments, **keywords)\n\
+\n\
+C implementation of C{Binding.__call__} method.  Semantics are exactly the same as those \
+of the pure Python implementation."
+
+#define WEAK_BINDING___CALL___DOC "\
+__call__(self, *arguments, **keywords)\n\
+\n\
+C implementation of C{WeakBinding.__call__} method.  Semantics are exactly the same as \
+those of the pure Python implementation."
+
+
+
+/*- Static variables -----------------------------------------------*/
+
+static PyMethodDef  Binding___call___definition
+  = { "__call__", (PyCFunction) Binding___call__, METH_VARARGS | METH_KEYWORDS,
+      BINDING___CALL___DOC };
+
+static PyMethodDef  WeakBinding___call___definition
+  = { "__call__", (PyCFunction) WeakBinding___call__, METH_VARARGS | METH_KEYWORDS,
+      WEAK_BINDING___CALL___DOC };
+
+
+static Compatibility_ModuleDef  bind_module
+  = { Compatibility_ModuleDef_HEAD_INIT,
+      "notify._bind",
+      MODULE_DOC,
+      sizeof (BindModuleState),
+      NULL,
+      NULL,
+      bind_module_traverse,
+      bind_module_clear,
+      NULL };
+
+#define BIND_MODULE_STATE(module)                                       \
+  Compatibility_ModuleState (bind_module, module, BindModuleState)
+#define BIND_MODULE_STATE_FROM_DEF()                                    \
+  Compatibility_ModuleStateFromDef (bind_module, BindModuleState)
+
+#if Compatibility_2_x_MODULE_STATE
+static BindModuleState __2_x_state__bind_module;
+#endif
+
+
+#define SLOT(object, offset) (*(PyObject **) ((char *) (object) + (offset)))
+
+
+
+/*- Binding methods ------------------------------------------------*/
+
+static PyObject *
+Binding___call__ (PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  BindModuleState *state        = BIND_MODULE_STATE_FROM_DEF ();
+  int              getters_kind = get_getters_kind (state, self);
+
+  if (getters_kind == GETTERS_OVERRIDDEN)
+    return call_python_implementation (state->python_binding_call, self, arguments, keywords);
+
+  return do_call (state, self, getters_kind, arguments, keywords);
+}
+
+
+static PyObject *
+WeakBinding___call__ (PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  BindModuleState *state = BIND_MODULE_STATE_FROM_DEF ();
+  PyObject        *reference;
+  int              is_python_reference;
+  int              getters_kind;
+
+  /* Like the Python implementation, look at the slot directly, not through getter. */
+  reference = get_slot (self, state->offsets.object, "_object");
+  if (!reference)
+    return NULL;
+
+  is_python_reference = 0;
+
+  if (PyWeakref_CheckRefExact (reference))
+    {
+#if PY_VERSION_HEX >= 0x030D0000
+      PyObject *object;
+      int       is_alive = PyWeakref_GetRef (reference, &object);
+
+      Py_DECREF (reference);
+
+      if (is_alive == -1)
+        return NULL;
+
+      Py_XDECREF (object);
+
+      if (!is_alive)
+#else
+      PyObject *object = PyWeakref_GET_OBJECT (reference);
+
+      Py_DECREF (reference);
+
+      if (object == Py_None)
+#endif
+        return PyObject_CallMethodObjArgs (self, state->call_after_garbage_collecting_name,
+                                           NULL);
+    }
+  else
+    {
+      /* Anything else than `_NONE_REFERENCE' can only be assigned from outside.  Let
+       * Python code figure out if it is alive.
+       */
+      is_python_reference = (reference != state->none_reference);
+      Py_DECREF (reference);
+    }
+
+  if (!is_python_reference)
+    getters_kind = get_getters_kind (state, self);
+  else
+    getters_kind = GETTERS_OVERRIDDEN;
+
+  if (getters_kind == GETTERS_OVERRIDDEN)
+    return call_python_implementation (state->python_weak_binding_call, self,
+                                       arguments, keywords);
+
+  return do_call (state, self, getters_kind, arguments, keywords);
+}
+
+
+
+/*- Call implementation --------------------------------------------*/
+
+/* NOTE: If, for some reason, you change this, don't forget to adjust `Binding.__call__'
+ *       in `notify/bind.py' accordingly.  Both implementations must behave identically.
+ */
+static PyObject *
+do_call (BindModuleState *state, PyObject *self, int getters_kind,
+         PyObject *arguments, PyObject *keywords)
+{
+  PyObject   *function        = NULL;
+  PyObject   *class_          = NULL;
+  PyObject   *fixed           = NULL;
+  PyObject   *fixed_arguments = NULL;
+  PyObject   *fixed_keywords  = NULL;
+  PyObject   *object          = NULL;
+  PyObject   *all_arguments   = NULL;
+  PyObject   *all_keywords    = NULL;
+  PyObject   *result          = NULL;
+  Py_ssize_t  num_fixed_arguments;
+  Py_ssize_t  num_arguments;
+  Py_ssize_t  num_all_arguments;
+  Py_ssize_t  index;
+  int         with_object;
+
+  if (   !(function = get_slot (self, state->offsets.function, "_function"))
+      || !(class_   = get_slot (self, state->offsets.class_,   "_class"))
+      || !(fixed    = get_slot (self, state->offsets.fixed,    "_fixed")))
+    goto do_return;
+
+  /* `fixed_arguments' is `fixed' itself, with its first `num_fixed_arguments' items being
+   * the arguments; `fixed_keywords' is borrowed from `fixed'.
+   */
+  num_fixed_arguments = 0;
+
+  if (fixed == Py_None)
+    ;
+  else if (Py_TYPE (fixed) == state->frozendict_type)
+    fixed_keywords = fixed;
+  else if (PyTuple_CheckExact (fixed))
+    {
+      fixed_arguments     = fixed;
+      num_fixed_arguments = PyTuple_GET_SIZE (fixed);
+
+      if (num_fixed_arguments > 0
+          && (Py_TYPE (PyTuple_GET_ITEM (fixed, num_fixed_arguments - 1))
+              == state->frozendict_type))
+        fixed_keywords = PyTuple_GET_ITEM (fixed, --num_fixed_arguments);
+    }
+  else
+    {
+      /* Only possible if the slot has been assigned from outside.  Let Python code
+       * handle (or fail on) whatever is there.
+       */
+      result = call_python_implementation (state->python_binding_call, self,
+                                           arguments, keywords);
+      goto do_return;
+    }
+
+  if (keywords && PyDict_Size (keywords) > 0)
+    {
+      if (fixed_keywords && PyDict_Size (fixed_keywords) > 0)
+        {
+          all_keywords = PyDict_Copy (fixed_keywords);
+          if (!all_keywords || PyDict_Update (all_keywords, keywords) == -1)
+            goto do_return;
+        }
+      else
+        {
+          Py_INCREF (keywords);
+          all_keywords = keywords;
+        }
+    }
+  else if (fixed_keywords && PyDict_Size (fixed_keywords) > 0)
+    {
+      /* Never pass our own dictionary: a C function could modify it. */
+      all_keywords = PyDict_Copy (fixed_keywords);
+      if (!all_keywords)
+        goto do_return;
+    }
+
+  with_object = (class_ != Py_None);
+
+  if (with_object)
+    {
+      object = get_object (state, self, getters_kind);
+      if (!object)
+        goto do_return;
+    }
+
+  num_arguments       = PyTuple_GET_SIZE (arguments);
+  num_all_arguments   = with_object + num_fixed_arguments + num_arguments;
+
+#if PY_VERSION_HEX >= 0x03090000
+  if (num_all_arguments <= MAX_STACK_ARGUMENTS)
+    {
+      /* The first item is not used by us, but lets the callee prepend an argument without
+       * copying, see PY_VECTORCALL_ARGUMENTS_OFFSET.  All items are borrowed, we (or the
+       * caller, for `arguments') hold references to their containers.
+       */
+      PyObject  *stack[MAX_STACK_ARGUMENTS + 1];
+      PyObject **all_argument_stack = stack + 1;
+      Py_ssize_t position           = 0;
+
+      if (with_object)
+        all_argument_stack[position++] = object;
+
+      for (index = 0; index < num_fixed_arguments; ++index)
+        all_argument_stack[position++] = PyTuple_GET_ITEM (fixed_arguments, index);
+
+      for (index = 0; index < num_arguments; ++index)
+        all_argument_stack[position++] = PyTuple_GET_ITEM (arguments, index);
+
+      result = PyObject_VectorcallDict (function, all_argument_stack,
+                                        num_all_arguments | PY_VECTORCALL_ARGUMENTS_OFFSET,
+                                        all_keywords);
+      goto do_return;
+    }
+#endif
+
+  if (num_all_arguments == num_arguments)
+    {
+      Py_INCREF (arguments);
+      all_arguments = arguments;
+    }
+  else
+    {
+      Py_ssize_t position = 0;
+
+      all_arguments = PyTuple_New (num_all_arguments);
+      if (!all_arguments)
+        goto do_return;
+
+      if (with_object)
+        {
+          Py_INCREF (object);
+          PyTuple_SET_ITEM (all_arguments, position++, object);
+        }
+
+      for (index = 0; index < num_fixed_arguments; ++index)
+        {
+          PyObject *argument = PyTuple_GET_ITEM (fixed_arguments, index);
+          Py_INCREF (argument);
+          PyTuple_SET_ITEM (all_arguments, position++, argument);
+        }
+
+      for (index = 0; index < num_arguments; ++index)
+        {
+          PyObject *argument = PyTuple_GET_ITEM (arguments, index);
+          Py_INCREF (argument);
+          PyTuple_SET_ITEM (all_arguments, position++, argument);
+        }
+    }
+
+  result = PyObject_Call (function, all_arguments, all_keywords);
+
+ do_return:
+  Py_XDECREF (function);
+  Py_XDECREF (class_);
+  Py_XDECREF (fixed);
+  Py_XDECREF (object);
+  Py_XDECREF (all_arguments);
+  Py_XDECREF (all_keywords);
+
+  return result;
+}
+
+
+/* Call a pure Python `__call__' implementation as an unbound method. */
+static PyObject *
+call_python_implementation (PyObject *implementation, PyObject *self,
+                            PyObject *arguments, PyObject *keywords)
+{
+  Py_ssize_t  num_arguments = PyTuple_GET_SIZE (arguments);
+  PyObject   *all_arguments = PyTuple_New (num_arguments + 1);
+  PyObject   *result;
+  Py_ssize_t  index;
+
+  if (!all_arguments)
+    return NULL;
+
+  Py_INCREF (self);
+  PyTuple_SET_ITEM (all_arguments, 0, self);
+
+  for (index = 0; index < num_arguments; ++index)
+    {
+      PyObject *argument = PyTuple_GET_ITEM (arguments, index);
+      Py_INCREF (argument);
+      PyTuple_SET_ITEM (all_arguments, index + 1, argument);
+    }
+
+  result = PyObject_Call (implementation, all_arguments, keywords);
+  Py_DECREF (all_arguments);
+
+  return result;
+}
+
+
+
+/*- Getters --------------------------------------------------------*/
+
+/* Subclasses may override `_get_*' methods and the Python implementation of `__call__'
+ * honors that.  We only read slots directly if all getters are those of `Binding', except
+ * `_get_object', which may also be that of `WeakBinding'.  Type attribute lookups are
+ * cached by Python, so this is cheap compared to calling the getters.
+ */
+static int
+get_getters_kind (BindModuleState *state, PyObject *self)
+{
+  PyTypeObject *type       = Py_TYPE (self);
+  PyObject     *get_object = _PyType_Lookup (type, state->get_object_name);
+  int           getters_kind;
+
+  if (get_object == state->get_object)
+    getters_kind = GETTERS_OF_BINDING;
+  else if (get_object == state->weak_get_object)
+    getters_kind = GETTERS_OF_WEAK_BINDING;
+  else
+    return GETTERS_OVERRIDDEN;
+
+  if (   _PyType_Lookup (type, state->get_function_name)  != state->get_function
+      || _PyType_Lookup (type, state->get_class_name)     != state->get_class
+      || _PyType_Lookup (type, state->get_arguments_name) != state->get_arguments
+      || _PyType_Lookup (type, state->get_keywords_name)  != state->get_keywords)
+    return GETTERS_OVERRIDDEN;
+
+  return getters_kind;
+}
+
+
+/* Equivalent of `_get_object' of given kind. */
+static PyObject *
+get_object (BindModuleState *state, PyObject *self, int getters_kind)
+{
+  PyObject *reference = get_slot (self, state->offsets.object, "_object");
+  PyObject *object;
+
+  if (!reference || getters_kind == GETTERS_OF_BINDING)
+    return reference;
+
+  if (PyWeakref_CheckRefExact (reference))
+    {
+#if PY_VERSION_HEX >= 0x030D0000
+      if (PyWeakref_GetRef (reference, &object) == 0)
+        {
+          Py_INCREF (Py_None);
+          object = Py_None;
+        }
+#else
+      object = PyWeakref_GET_OBJECT (reference);
+      Py_INCREF (object);
+#endif
+    }
+  else
+    object = PyObject_CallObject (reference, NULL);
+
+  Py_DECREF (reference);
+  return object;
+}
+
+
+
+/*- Slot access ----------------------------------------------------*/
+
+static PyObject *
+get_slot (PyObject *self, Py_ssize_t offset, const char *name)
+{
+  PyObject *value = SLOT (self, offset);
+
+  if (!value)
+    {
+      PyErr_SetString (PyExc_AttributeError, name);
+      return NULL;
+    }
+
+  Py_INCREF (value);
+  return value;
+}
+
+
+static int
+find_slot_offset (PyTypeObject *type, const char *name, Py_ssize_t *offset)
+{
+  PyObject *descriptor = PyDict_GetItemString (type->tp_dict, name);
+
+  if (!descriptor
+      || Py_TYPE (descriptor) != &PyMemberDescr_Type
+      || ((PyMemberDescrObject *) descriptor)->d_member->type != T_OBJECT_EX)
+    {
+      PyErr_Format (PyExc_RuntimeError,
+                    "'%s' must be a slot of '%s' for the extension to work",
+                    name, type->tp_name);
+      return -1;
+    }
+
+  *offset = ((PyMemberDescrObject *) descriptor)->d_member->offset;
+  return 0;
+}
+
+
+static PyObject *
+get_class_dict_item (PyTypeObject *type, const char *name)
+{
+  PyObject *item = PyDict_GetItemString (type->tp_dict, name);
+
+  if (!item)
+    {
+      PyErr_Format (PyExc_RuntimeError,
+                    "'%s' must define '%s' for the extension to work", type->tp_name, name);
+      return NULL;
+    }
+
+  Py_INCREF (item);
+  return item;
+}
+
+
+
+/*- Module functions -----------------------------------------------*/
+
+#define INTERN_STRING(field, string)                                    \
+  do                                                                    \
+    {                                                                   \
+      state->field = PyString_InternFromString (string);                \
+      if (!state->field)                                                \
+        goto error;                                                     \
+    }                                                                   \
+  while (0)
+
+#define GET_CLASS_DICT_ITEM(field, type, name)                          \
+  do                                                                    \
+    {                                                                   \
+      state->field = get_class_dict_item (state->type, name);           \
+      if (!state->field)                                                \
+        goto error;                                                     \
+    }                                                                   \
+  while (0)
+
+
+static int
+bind_module_initialize_state (PyObject *self)
+{
+  BindModuleState *state       = BIND_MODULE_STATE (self);
+  PyObject        *bind_module = NULL;
+
+  bind_module = PyImport_ImportModule ("notify.bind");
+  if (!bind_module)
+    goto error;
+
+  state->binding_type = (PyTypeObject *) PyObject_GetAttrString (bind_module, "Binding");
+  if (!state->binding_type)
+    goto error;
+
+  state->weak_binding_type = (PyTypeObject *) PyObject_GetAttrString (bind_module,
+                                                                      "WeakBinding");
+  if (!state->weak_binding_type)
+    goto error;
+
+  if (!PyType_Check (state->binding_type) || !PyType_Check (state->weak_binding_type))
+    {
+      PyErr_SetString (PyExc_RuntimeError, "'Binding' and 'WeakBinding' must be types");
+      goto error;
+    }
+
+  state->none_reference = PyObject_GetAttrString (bind_module, "_NONE_REFERENCE");
+  if (!state->none_reference)
+    goto error;
+
+  state->frozendict_type = (PyTypeObject *) PyObject_GetAttrString (bind_module,
+                                                                    "frozendict");
+  if (!state->frozendict_type)
+    goto error;
+
+  if (!PyType_Check (state->frozendict_type))
+    {
+      PyErr_SetString (PyExc_RuntimeError, "'frozendict' must be a type");
+      goto error;
+    }
+
+  if (   find_slot_offset (state->binding_type, "_object",   &state->offsets.object)   == -1
+      || find_slot_offset (state->binding_type, "_function", &state->offsets.function) == -1
+      || find_slot_offset (state->binding_type, "_class",    &state->offsets.class_)   == -1
+      || find_slot_offset (state->binding_type, "_fixed",    &state->offsets.fixed)    == -1)
+    goto error;
+
+  /* The module is imported before `notify.bind' replaces these with our methods. */
+  GET_CLASS_DICT_ITEM (python_binding_call,      binding_type,      "__call__");
+  GET_CLASS_DICT_ITEM (python_weak_binding_call, weak_binding_type, "__call__");
+
+  GET_CLASS_DICT_ITEM (get_object,      binding_type,      "_get_object");
+  GET_CLASS_DICT_ITEM (weak_get_object, weak_binding_type, "_get_object");
+  GET_CLASS_DICT_ITEM (get_function,    binding_type,      "_get_function");
+  GET_CLASS_DICT_ITEM (get_class,       binding_type,      "_get_class");
+  GET_CLASS_DICT_ITEM (get_arguments,   binding_type,      "_get_arguments");
+  GET_CLASS_DICT_ITEM (get_keywords,    binding_type,      "_get_keywords");
+
+  INTERN_STRING (get_object_name,                    "_get_object");
+  INTERN_STRING (get_function_name,                  "_get_function");
+  INTERN_STRING (get_class_name,                     "_get_class");
+  INTERN_STRING (get_arguments_name,                 "_get_arguments");
+  INTERN_STRING (get_keywords_name,                  "_get_keywords");
+  INTERN_STRING (call_after_garbage_collecting_name, "_call_after_garbage_collecting");
+
+  Py_DECREF (bind_module);
+
+  return 0;
+
+ error:
+  Py_XDECREF (bind_module);
+  bind_module_clear (self);
+
+  return -1;
+}
+
+static int
+bind_module_traverse (PyObject *self, visitproc visit, void *arg)
+{
+  BindModuleState *state = BIND_MODULE_STATE (self);
+
+  Compatibility_VISIT (state->binding_type);
+  Compatibility_VISIT (state->weak_binding_type);
+
+  Compatibility_VISIT (state->none_reference);
+  Compatibility_VISIT (state->frozendict_type);
+
+  Compatibility_VISIT (state->python_binding_call);
+  Compatibility_VISIT (state->python_weak_binding_call);
+
+  Compatibility_VISIT (state->get_object);
+  Compatibility_VISIT (state->weak_get_object);
+  Compatibility_VISIT (state->get_function);
+  Compatibility_VISIT (state->get_class);
+  Compatibility_VISIT (state->get_arguments);
+  Compatibility_VISIT (state->get_keywords);
+
+  return 0;
+}
+
+static int
+bind_module_clear (PyObject *self)
+{
+  BindModuleState *state = BIND_MODULE_STATE (self);
+
+  Compatibility_CLEAR (state->binding_type);
+  Compatibility_CLEAR (state->weak_binding_type);
+
+  Compatibility_CLEAR (state->none_reference);
+  Compatibility_CLEAR (state->frozendict_type);
+
+  Compatibility_CLEAR (state->python_binding_call);
+  Compatibility_CLEAR (state->python_weak_binding_call);
+
+  Compatibility_CLEAR (state->get_object);
+  Compatibility_CLEAR (state->weak_get_object);
+  Compatibility_CLEAR (state->get_function);
+  Compatibility_CLEAR (state->get_class);
+  Compatibility_CLEAR (state->get_arguments);
+  Compatibility_CLEAR (state->get_keywords);
+
+  Compatibility_CLEAR (state->get_object_name);
+  Compatibility_CLEAR (state->get_function_name);
+  Compatibility_CLEAR (state->get_class_name);
+  Compatibility_CLEAR (state->get_arguments_name);
+  Compatibility_CLEAR (state->get_keywords_name);
+  Compatibility_CLEAR (state->call_after_garbage_collecting_name);
+
+  return 0;
+}
+
+
+
+/*- Module initialization ------------------------------------------*/
+
+#define REGISTER_METHOD(dictionary, name, type, definition, error_label) \
+  do                                                                    \
+    {                                                                   \
+      PyObject *descriptor = PyDescr_NewMethod (type, &definition);     \
+      if (!descriptor                                                   \
+          || PyDict_SetItemString (dictionary, name, descriptor) == -1) \
+        {                                                               \
+          Py_XDECREF (descriptor);                                      \
+          goto error_label;                                             \
+        }                                                               \
+      Py_DECREF (descriptor);                                           \
+    }                                                                   \
+  while (0)
+
+
+Compatibility_MODINIT_FUNC
+Compatibility_MODINIT_FUNC_NAME (_bind) (void)
+{
+  PyObject        *module = NULL;
+  PyObject        *dictionary;
+  BindModuleState *state;
+
+  module = Compatibility_ModuleCreate (&bind_module);
+  if (!module)
+    goto error;
+
+  state = BIND_MODULE_STATE (module);
+  memset (state, 0, sizeof (BindModuleState));
+
+  if (!Compatibility_ModulePostCreate (module, &bind_module))
+    goto error;
+
+  if (bind_module_initialize_state (module) == -1)
+    goto error;
+
+  dictionary = PyModule_GetDict (module);
+  if (!dictionary)
+    goto error;
+
+  /* Method descriptors bound to binding types.  Python code installs them into the
+   * classes instead of pure Python implementations.  Both are named `__call__', so they
+   * are registered in the module under different names.
+   */
+  REGISTER_METHOD (dictionary, "binding_call",
+                   state->binding_type, Binding___call___definition, error);
+  REGISTER_METHOD (dictionary, "weak_binding_call",
+                   state->weak_binding_type, WeakBinding___call___definition, error);
+
+  goto do_return;
+
+ error:
+  Compatibility_CLEAR (module);
+
+ do_return:
+  Compatibility_ModuleReturn (module);
+}
+
+
+/*
+ * Local variables:
+ * coding: utf-8
+ * mode: c
+ * c-basic-offset: 2
+ * indent-tabs-mode: nil
+ * fill-column: 90
+ * End:
+ */
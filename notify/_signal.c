@@ -0,0 +1,1010 @@
+/*--------------------------------------------------------------------*\
+ * This file is part of Py-notify.                                    *
+ *                                                                    *
+ * Copyright (C) 2007, 2008 Paul Pogonyshev.                          *
+ *                                                                    *
+ * This library is free software; you can redistribute it and/or      *
+ * modify it under the terms of the GNU Lesser General Public License *
+ * as published by the Free Software Foundation; either version 2.1   *
+ * of the License, or (at your option) any later version.             *
+ *                                                                    *
+ * This library is distributed in the hope that it will be useful,    *
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of     *
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  *
+ * Lesser General Public License for more details.                    *
+ *                                                                    *
+ * You should have received a copy of the GNU Lesser General Public   *
+ * License along with this library; if not, write to the Free         *
+ * Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        *
+ * Boston, MA 02110-1301 USA                                          *
+\*--------------------------------------------------------------------*/
+
+
+#include <Python.h>
+#include <structmember.h>
+
+
+/* See Python documentation for why it prevents rare and very obscure bug.  Need to
+ * backport for older Python versions.
+ */
+#ifdef Py_CLEAR
+#  define Compatibility_CLEAR(object) Py_CLEAR (object)
+#else
+#  define Compatibility_CLEAR(object)                   \
+     do                                                 \
+       {                                                \
+         if (object)                                    \
+           {                                            \
+             PyObject *temp = (PyObject *) (object);    \
+             (object) = NULL;                           \
+             Py_DECREF (temp);                          \
+           }                                            \
+       }                                                \
+     while (0)
+#endif
+
+/* Py_VISIT is not available in 2.3. */
+#ifdef Py_VISIT
+#  define Compatibility_VISIT(object) Py_VISIT (object)
+#else
+#  define Compatibility_VISIT(object)                           \
+     do                                                         \
+       {                                                        \
+         if (object)                                            \
+           {                                                    \
+             int result = visit ((PyObject *) (object), arg);   \
+             if (result)                                        \
+               return result;                                   \
+           }                                                    \
+       }                                                        \
+     while (0)
+#endif
+
+
+/* Py_ssize_t only appeared in 2.5. */
+#if PY_VERSION_HEX < 0x02050000
+typedef int Py_ssize_t;
+#endif
+
+
+/* Working around more changes in Py3k: module initialization. */
+#ifdef PyMODINIT_FUNC
+#  define Compatibility_MODINIT_FUNC PyMODINIT_FUNC
+#else
+#  ifdef DL_EXPORT
+#    define Compatibility_MODINIT_FUNC DL_EXPORT (void)
+#  else
+#    define Compatibility_MODINIT_FUNC void
+#  endif
+#endif
+
+
+#ifdef PyModuleDef_HEAD_INIT
+
+#  define Compatibility_ModuleDef                 PyModuleDef
+#  define Compatibility_ModuleDef_HEAD_INIT       PyModuleDef_HEAD_INIT
+#  define Compatibility_MODINIT_FUNC_NAME(module) PyInit_##module
+
+#  define Compatibility_ModuleCreate(definition)  PyModule_Create (definition)
+#  define Compatibility_ModulePostCreate(module, definition)     \
+     (PyModule_AddStringConstant ((module), "__docformat__",     \
+                                  "epytext en") == 0)
+
+#  define Compatibility_ModuleReturn(module)      return (module)
+
+#  define Compatibility_ModuleState(def, module, type)           \
+     ((type *) PyModule_GetState (module))
+#  define Compatibility_ModuleStateFromDef(def, type)            \
+     ((type *) PyModule_GetState (PyState_FindModule (&def)))
+
+#else  /* !defined PyMODINIT_FUNC */
+
+typedef
+struct
+{
+  const int      dummy;
+  const char    *m_name;
+  const char    *m_doc;
+  int            m_size;
+  PyMethodDef   *m_methods;
+  inquiry        m_reload;
+  traverseproc   m_traverse;
+  inquiry        m_clear;
+  freefunc       m_free;
+}
+Compatibility_ModuleDef;
+
+#  define Compatibility_ModuleDef_HEAD_INIT       0
+#  define Compatibility_MODINIT_FUNC_NAME(module) init##module
+
+#  define Compatibility_ModuleCreate(definition)                        \
+     Py_InitModule ((char *) (definition)->m_name, NULL)
+#  define Compatibility_ModulePostCreate(module, definition)            \
+     (PyModule_AddStringConstant ((module), "__doc__",                  \
+                                  (char *) (definition)->m_doc) == 0    \
+      && PyModule_AddStringConstant ((module), "__docformat__",         \
+                                     "epytext en") == 0)
+
+#  define Compatibility_ModuleReturn(module)      return
+
+#  define Compatibility_ModuleState(def, module, type)                  \
+     (&__2_x_state__##def)
+#  define Compatibility_ModuleStateFromDef(def, type)                   \
+     (&__2_x_state__##def)
+#  define Compatibility_2_x_MODULE_STATE          1
+
+
+#endif  /* !defined PyMODINIT_FUNC */
+
+
+/* Also compatibility, but let's avoid long name in this case. */
+#if defined (PY_MAJOR_VERSION) && PY_MAJOR_VERSION >= 3
+#  define PyInt_AsLong   PyLong_AsLong
+#  define PyInt_FromLong PyLong_FromLong
+#  define PyString_InternFromString PyUnicode_InternFromString
+#endif
+
+
+
+/*- Type forward declarations --------------------------------------*/
+
+/* Offsets of `Signal' slots we need to access.  They are looked up at module
+ * initialization time, so that we don't need to go through attribute access on each
+ * emission.
+ */
+typedef
+struct
+{
+  Py_ssize_t  asynchronous;
+  Py_ssize_t  handlers;
+  Py_ssize_t  accumulator;
+  Py_ssize_t  emission_level;
+
+  /* These are of `_Connection' class. */
+  Py_ssize_t  connection_handler;
+  Py_ssize_t  connection_blocked;
+}
+SignalSlotOffsets;
+
+
+typedef
+struct
+{
+  PyTypeObject *       signal_type;
+  PyTypeObject *       abstract_signal_type;
+  PyTypeObject *       connection_type;
+  PyTypeObject *       weak_binding_type;
+  PyTypeObject *       batch_handler_type;
+
+  SignalSlotOffsets    offsets;
+
+  /* The `_emit' descriptor installed into `Signal', to detect subclasses overriding it. */
+  PyObject *           emit_method;
+
+  PyObject *           async_keyword;
+  PyObject *           emit_name;
+  PyObject *           emit_asynchronously_name;
+  PyObject *           collect_garbage_name;
+  PyObject *           exception_handler_name;
+  PyObject *           get_initial_value_name;
+  PyObject *           accumulate_value_name;
+  PyObject *           should_continue_name;
+  PyObject *           post_process_value_name;
+}
+SignalModuleState;
+
+
+
+/*- Functions forward declarations ---------------------------------*/
+
+static PyObject *   Signal_emit                     (PyObject *self,
+                                                     PyObject *arguments, PyObject *keywords);
+static PyObject *   Signal__emit                    (PyObject *self,
+                                                     PyObject *arguments, PyObject *keywords);
+
+static PyObject *   do_emit                         (SignalModuleState *state, PyObject *self,
+                                                     PyObject *arguments, PyObject *keywords);
+static int          call_exception_handler          (SignalModuleState *state, PyObject *self,
+                                                     PyObject *handler);
+
+static PyObject *   get_slot                        (PyObject *self, Py_ssize_t offset,
+                                                     const char *name);
+static void         set_slot                        (PyObject *self, Py_ssize_t offset,
+                                                     PyObject *value);
+static int          get_emission_level              (SignalModuleState *state, PyObject *self,
+                                                     long *emission_level);
+static int          set_emission_level              (SignalModuleState *state, PyObject *self,
+                                                     long emission_level);
+
+static int          find_slot_offset                (PyTypeObject *type, const char *name,
+                                                     Py_ssize_t *offset);
+
+static int          signal_module_initialize_state  (PyObject *self);
+static int          signal_module_traverse          (PyObject *self, visitproc visit, void *arg);
+static int          signal_module_clear             (PyObject *self);
+
+
+
+/*- Documentation --------------------------------------------------*/
+
+#define MODULE_DOC "\
+Internal helper module for C{L{notify.signal}}.  Do not use directly."
+
+
+#define SIGNAL_EMIT_DOC "\
+emit(self, *arguments, **keywords)\n\
+\n\
+C implementation of C{Signal.emit} method.  Semantics are exactly the same as those of \
+the pure Python implementation."
+
+#define SIGNAL__EMIT_DOC "\
+_emit(self, *arguments, **keywords)\n\
+\n\
+C implementation of C{Signal._emit} method.  Semantics are exactly the same as those of \
+the pure Python implementation."
+
+
+
+/*- Static variables -----------------------------------------------*/
+
+static PyMethodDef  Signal_emit_definition
+  = { "emit",  (PyCFunction) Signal_emit,  METH_VARARGS | METH_KEYWORDS, SIGNAL_EMIT_DOC };
+
+static PyMethodDef  Signal__emit_definition
+  = { "_emit", (PyCFunction) Signal__emit, METH_VARARGS | METH_KEYWORDS, SIGNAL__EMIT_DOC };
+
+
+static Compatibility_ModuleDef  signal_module
+  = { Compatibility_ModuleDef_HEAD_INIT,
+      "notify._signal",
+      MODULE_DOC,
+      sizeof (SignalModuleState),
+      NULL,
+      NULL,
+      signal_module_traverse,
+      signal_module_clear,
+      NULL };
+
+#define SIGNAL_MODULE_STATE(module)                                     \
+  Compatibility_ModuleState (signal_module, module, SignalModuleState)
+#define SIGNAL_MODULE_STATE_FROM_DEF()                                  \
+  Compatibility_ModuleStateFromDef (signal_module, SignalModuleState)
+
+#if Compatibility_2_x_MODULE_STATE
+static SignalModuleState __2_x_state__signal_module;
+#endif
+
+
+#define SLOT(object, offset) (*(PyObject **) ((char *) (object) + (offset)))
+
+
+
+/*- Signal methods -------------------------------------------------*/
+
+static PyObject *
+Signal_emit (PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  SignalModuleState *state        = SIGNAL_MODULE_STATE_FROM_DEF ();
+  PyObject          *asynchronous = NULL;
+  PyObject          *result       = NULL;
+  int                is_asynchronous;
+
+  if (keywords && PyDict_Size (keywords) > 0)
+    asynchronous = PyDict_GetItem (keywords, state->async_keyword);
+
+  if (asynchronous)
+    {
+      /* Never modify the dictionary we are given, it may belong to the caller. */
+      Py_INCREF (asynchronous);
+
+      keywords = PyDict_Copy (keywords);
+      if (!keywords || PyDict_DelItem (keywords, state->async_keyword) == -1)
+        goto do_return;
+    }
+  else
+    {
+      asynchronous = get_slot (self, state->offsets.asynchronous, "asynchronous");
+      if (!asynchronous)
+        return NULL;
+
+      Py_XINCREF (keywords);
+    }
+
+  is_asynchronous = PyObject_IsTrue (asynchronous);
+  if (is_asynchronous == -1)
+    goto do_return;
+
+  if (is_asynchronous)
+    {
+      PyObject *method = PyObject_GetAttr (self, state->emit_asynchronously_name);
+      if (!method)
+        goto do_return;
+
+      result = PyObject_Call (method, arguments, keywords);
+      Py_DECREF (method);
+    }
+  else
+    {
+      /* Subclasses may override `_emit' alone, then we must go through the method. */
+      if (_PyType_Lookup (Py_TYPE (self), state->emit_name) == state->emit_method)
+        result = do_emit (state, self, arguments, keywords);
+      else
+        {
+          PyObject *method = PyObject_GetAttr (self, state->emit_name);
+          if (!method)
+            goto do_return;
+
+          result = PyObject_Call (method, arguments, keywords);
+          Py_DECREF (method);
+        }
+    }
+
+ do_return:
+  Py_DECREF  (asynchronous);
+  Py_XDECREF (keywords);
+
+  return result;
+}
+
+
+static PyObject *
+Signal__emit (PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  return do_emit (SIGNAL_MODULE_STATE_FROM_DEF (), self, arguments, keywords);
+}
+
+
+
+/*- Emission implementation ----------------------------------------*/
+
+/* NOTE: If, for some reason, you change this, don't forget to adjust `Signal._emit' in
+ *       `notify/signal.py' accordingly.  Both implementations must behave identically.
+ */
+static PyObject *
+do_emit (SignalModuleState *state, PyObject *self, PyObject *arguments, PyObject *keywords)
+{
+  PyObject   *handlers;
+  PyObject   *accumulator;
+  PyObject   *value  = NULL;
+  PyObject   *result = NULL;
+  long        saved_emission_level;
+  int         might_have_garbage = 0;
+  int         failed             = 0;
+  int         is_single;
+  Py_ssize_t  num_handlers;
+  Py_ssize_t  index;
+
+  handlers = get_slot (self, state->offsets.handlers, "_handlers");
+  if (!handlers)
+    return NULL;
+
+  accumulator = get_slot (self, state->offsets.accumulator, "_Signal__accumulator");
+  if (!accumulator)
+    goto do_return;
+
+  if (accumulator != Py_None)
+    {
+      value = PyObject_CallMethodObjArgs (accumulator, state->get_initial_value_name, NULL);
+      if (!value)
+        goto do_return;
+    }
+
+  if (handlers != Py_None)
+    {
+      PyObject *error_type      = NULL;
+      PyObject *error_value     = NULL;
+      PyObject *error_traceback = NULL;
+
+      /* A single connection is stored as is, without a tuple. */
+      is_single = PyObject_TypeCheck (handlers, state->connection_type);
+
+      if (is_single)
+        num_handlers = 1;
+      else if (PyTuple_Check (handlers))
+        num_handlers = PyTuple_GET_SIZE (handlers);
+      else
+        {
+          PyErr_SetString (PyExc_TypeError,
+                           "'_handlers' must be a tuple, a '_Connection' or None");
+          goto do_return;
+        }
+
+      if (get_emission_level (state, self, &saved_emission_level) == -1)
+        goto do_return;
+
+      if (set_emission_level (state, self, labs (saved_emission_level) + 1) == -1)
+        goto do_return;
+
+      /* The tuple is a snapshot that is never modified, so we can simply iterate over it.
+       * Our reference keeps it (and so all its items) alive even if the signal replaces
+       * it with a new one during emission.
+       */
+      for (index = 0; index < num_handlers; ++index)
+        {
+          PyObject *connection = (is_single ? handlers : PyTuple_GET_ITEM (handlers, index));
+          PyObject *handler;
+          PyObject *blocked;
+          long      emission_level;
+          int       is_blocked;
+
+          if (get_emission_level (state, self, &emission_level) == -1)
+            {
+              failed = 1;
+              break;
+            }
+
+          if (emission_level < 0)
+            {
+              might_have_garbage = 1;
+              break;
+            }
+
+          if (!PyObject_TypeCheck (connection, state->connection_type))
+            {
+              PyErr_SetString (PyExc_TypeError,
+                               "'_handlers' must contain only '_Connection' objects");
+              failed = 1;
+              break;
+            }
+
+          /* Handlers disconnected while in emission have non-zero counter too. */
+          blocked = get_slot (connection, state->offsets.connection_blocked,
+                              "_Connection.blocked");
+          if (!blocked)
+            {
+              failed = 1;
+              break;
+            }
+
+          is_blocked = PyObject_IsTrue (blocked);
+          Py_DECREF (blocked);
+
+          if (is_blocked)
+            {
+              if (is_blocked == -1)
+                {
+                  failed = 1;
+                  break;
+                }
+
+              continue;
+            }
+
+          handler = get_slot (connection, state->offsets.connection_handler,
+                              "_Connection.handler");
+          if (!handler)
+            {
+              failed = 1;
+              break;
+            }
+
+          if (   PyObject_TypeCheck (handler, state->weak_binding_type)
+              || PyObject_TypeCheck (handler, state->batch_handler_type))
+            {
+              int is_alive = PyObject_IsTrue (handler);
+
+              if (is_alive != 1)
+                {
+                  Py_DECREF (handler);
+
+                  if (is_alive == -1)
+                    {
+                      failed = 1;
+                      break;
+                    }
+
+                  /* Handler will be removed in collect_garbage(), don't bother now. */
+                  might_have_garbage = 1;
+                  continue;
+                }
+            }
+
+          result = PyObject_Call (handler, arguments, keywords);
+
+          if (!result)
+            {
+              if (call_exception_handler (state, self, handler) == -1)
+                {
+                  Py_DECREF (handler);
+                  failed = 1;
+                  break;
+                }
+            }
+          else if (accumulator != Py_None)
+            {
+              PyObject *new_value;
+              PyObject *should_continue;
+              int       is_true;
+
+              new_value = PyObject_CallMethodObjArgs (accumulator, state->accumulate_value_name,
+                                                      value, result, NULL);
+              Compatibility_CLEAR (result);
+
+              if (!new_value)
+                {
+                  Py_DECREF (handler);
+                  failed = 1;
+                  break;
+                }
+
+              Py_DECREF (value);
+              value = new_value;
+
+              should_continue = PyObject_CallMethodObjArgs (accumulator,
+                                                            state->should_continue_name,
+                                                            value, NULL);
+              if (!should_continue)
+                {
+                  Py_DECREF (handler);
+                  failed = 1;
+                  break;
+                }
+
+              is_true = PyObject_IsTrue (should_continue);
+              Py_DECREF (should_continue);
+
+              if (is_true != 1)
+                {
+                  Py_DECREF (handler);
+
+                  if (is_true == -1)
+                    failed = 1;
+                  else
+                    might_have_garbage = 1;
+
+                  break;
+                }
+            }
+          else
+            Compatibility_CLEAR (result);
+
+          Py_DECREF (handler);
+        }
+
+      /* This is the `finally' clause of the Python implementation.  Note that any
+       * exception raised here replaces the pending one, if any.
+       */
+
+      if (failed)
+        PyErr_Fetch (&error_type, &error_value, &error_traceback);
+
+      if (set_emission_level (state, self, saved_emission_level) == -1)
+        goto finally_failed;
+
+      if (might_have_garbage && saved_emission_level == 0)
+        {
+          PyObject *collect_result
+            = PyObject_CallMethodObjArgs (self, state->collect_garbage_name, NULL);
+
+          if (!collect_result)
+            goto finally_failed;
+
+          Py_DECREF (collect_result);
+        }
+
+      if (failed)
+        {
+          PyErr_Restore (error_type, error_value, error_traceback);
+          goto do_return;
+        }
+
+      goto finally_done;
+
+    finally_failed:
+      if (failed)
+        {
+          Py_XDECREF (error_type);
+          Py_XDECREF (error_value);
+          Py_XDECREF (error_traceback);
+        }
+
+      goto do_return;
+
+    finally_done:
+      ;
+    }
+
+  if (accumulator == Py_None)
+    {
+      Py_INCREF (Py_None);
+      result = Py_None;
+    }
+  else
+    result = PyObject_CallMethodObjArgs (accumulator, state->post_process_value_name,
+                                         value, NULL);
+
+ do_return:
+  Py_DECREF  (handlers);
+  Py_XDECREF (accumulator);
+  Py_XDECREF (value);
+
+  return result;
+}
+
+
+/* Call `AbstractSignal.exception_handler' for the currently raised exception, making it
+ * available from sys.exc_info() for the duration of the call, just like it would be
+ * inside an `except' clause.
+ */
+static int
+call_exception_handler (SignalModuleState *state, PyObject *self, PyObject *handler)
+{
+  PyObject *exception_type;
+  PyObject *exception;
+  PyObject *traceback;
+  PyObject *saved_type;
+  PyObject *saved_value;
+  PyObject *saved_traceback;
+  PyObject *exception_handler;
+  PyObject *result;
+
+  PyErr_Fetch (&exception_type, &exception, &traceback);
+  PyErr_NormalizeException (&exception_type, &exception, &traceback);
+
+  if (!exception)
+    {
+      Py_INCREF (Py_None);
+      exception = Py_None;
+    }
+
+#if defined (PY_MAJOR_VERSION) && PY_MAJOR_VERSION >= 3
+  if (traceback && exception != Py_None)
+    PyException_SetTraceback (exception, traceback);
+#endif
+
+  exception_handler = PyObject_GetAttr ((PyObject *) state->abstract_signal_type,
+                                        state->exception_handler_name);
+  if (!exception_handler)
+    {
+      Py_XDECREF (exception_type);
+      Py_DECREF  (exception);
+      Py_XDECREF (traceback);
+      return -1;
+    }
+
+  Py_XINCREF (exception_type);
+  Py_INCREF  (exception);
+  Py_XINCREF (traceback);
+
+#if PY_VERSION_HEX >= 0x03030000
+  PyErr_GetExcInfo (&saved_type, &saved_value, &saved_traceback);
+  PyErr_SetExcInfo (exception_type, exception, traceback);
+#else
+  {
+    PyThreadState *thread_state = PyThreadState_GET ();
+
+    saved_type                    = thread_state->exc_type;
+    saved_value                   = thread_state->exc_value;
+    saved_traceback               = thread_state->exc_traceback;
+    thread_state->exc_type        = exception_type;
+    thread_state->exc_value       = exception;
+    thread_state->exc_traceback   = traceback;
+  }
+#endif
+
+  result = PyObject_CallFunctionObjArgs (exception_handler, self, exception, handler, NULL);
+
+#if PY_VERSION_HEX >= 0x03030000
+  PyErr_SetExcInfo (saved_type, saved_value, saved_traceback);
+#else
+  {
+    PyThreadState *thread_state = PyThreadState_GET ();
+
+    Py_XDECREF (thread_state->exc_type);
+    Py_XDECREF (thread_state->exc_value);
+    Py_XDECREF (thread_state->exc_traceback);
+
+    thread_state->exc_type      = saved_type;
+    thread_state->exc_value     = saved_value;
+    thread_state->exc_traceback = saved_traceback;
+  }
+#endif
+
+  Py_DECREF  (exception_handler);
+  Py_XDECREF (exception_type);
+  Py_DECREF  (exception);
+  Py_XDECREF (traceback);
+
+  if (!result)
+    return -1;
+
+  Py_DECREF (result);
+  return 0;
+}
+
+
+
+/*- Slot access ----------------------------------------------------*/
+
+static PyObject *
+get_slot (PyObject *self, Py_ssize_t offset, const char *name)
+{
+  PyObject *value = SLOT (self, offset);
+
+  if (!value)
+    {
+      PyErr_SetString (PyExc_AttributeError, name);
+      return NULL;
+    }
+
+  Py_INCREF (value);
+  return value;
+}
+
+
+static void
+set_slot (PyObject *self, Py_ssize_t offset, PyObject *value)
+{
+  PyObject *old_value = SLOT (self, offset);
+
+  SLOT (self, offset) = value;
+  Py_XDECREF (old_value);
+}
+
+
+static int
+get_emission_level (SignalModuleState *state, PyObject *self, long *emission_level)
+{
+  PyObject *value = get_slot (self, state->offsets.emission_level, "_Signal__emission_level");
+
+  if (!value)
+    return -1;
+
+  *emission_level = PyInt_AsLong (value);
+  Py_DECREF (value);
+
+  if (*emission_level == -1 && PyErr_Occurred ())
+    return -1;
+
+  return 0;
+}
+
+
+static int
+set_emission_level (SignalModuleState *state, PyObject *self, long emission_level)
+{
+  PyObject *value = PyInt_FromLong (emission_level);
+
+  if (!value)
+    return -1;
+
+  set_slot (self, state->offsets.emission_level, value);
+  return 0;
+}
+
+
+static int
+find_slot_offset (PyTypeObject *type, const char *name, Py_ssize_t *offset)
+{
+  PyObject *descriptor = PyDict_GetItemString (type->tp_dict, name);
+
+  if (!descriptor
+      || Py_TYPE (descriptor) != &PyMemberDescr_Type
+      || ((PyMemberDescrObject *) descriptor)->d_member->type != T_OBJECT_EX)
+    {
+      PyErr_Format (PyExc_RuntimeError,
+                    "'%s' must be a slot of '%s' for the extension to work",
+                    name, type->tp_name);
+      return -1;
+    }
+
+  *offset = ((PyMemberDescrObject *) descriptor)->d_member->offset;
+  return 0;
+}
+
+
+
+/*- Module functions -----------------------------------------------*/
+
+#define INTERN_STRING(field, string)                                    \
+  do                                                                    \
+    {                                                                   \
+      state->field = PyString_InternFromString (string);                \
+      if (!state->field)                                                \
+        goto error;                                                     \
+    }                                                                   \
+  while (0)
+
+
+static int
+signal_module_initialize_state (PyObject *self)
+{
+  SignalModuleState *state         = SIGNAL_MODULE_STATE (self);
+  PyObject          *signal_module = NULL;
+  PyObject          *bind_module   = NULL;
+
+  signal_module = PyImport_ImportModule ("notify.signal");
+  if (!signal_module)
+    goto error;
+
+  bind_module = PyImport_ImportModule ("notify.bind");
+  if (!bind_module)
+    goto error;
+
+  state->signal_type = (PyTypeObject *) PyObject_GetAttrString (signal_module, "Signal");
+  if (!state->signal_type)
+    goto error;
+
+  state->abstract_signal_type
+    = (PyTypeObject *) PyObject_GetAttrString (signal_module, "AbstractSignal");
+  if (!state->abstract_signal_type)
+    goto error;
+
+  state->connection_type
+    = (PyTypeObject *) PyObject_GetAttrString (signal_module, "_Connection");
+  if (!state->connection_type)
+    goto error;
+
+  state->weak_binding_type = (PyTypeObject *) PyObject_GetAttrString (bind_module,
+                                                                      "WeakBinding");
+  if (!state->weak_binding_type)
+    goto error;
+
+  state->batch_handler_type
+    = (PyTypeObject *) PyObject_GetAttrString (signal_module, "_BatchHandler");
+  if (!state->batch_handler_type)
+    goto error;
+
+  if (!PyType_Check (state->signal_type)
+      || !PyType_Check (state->abstract_signal_type)
+      || !PyType_Check (state->connection_type)
+      || !PyType_Check (state->weak_binding_type)
+      || !PyType_Check (state->batch_handler_type))
+    {
+      PyErr_SetString (PyExc_RuntimeError,
+                       "'Signal', 'AbstractSignal', '_Connection', 'WeakBinding' and "
+                       "'_BatchHandler' must be types");
+      goto error;
+    }
+
+  if (   find_slot_offset (state->signal_type, "asynchronous",
+                           &state->offsets.asynchronous)                  == -1
+      || find_slot_offset (state->signal_type, "_handlers",
+                           &state->offsets.handlers)                      == -1
+      || find_slot_offset (state->signal_type, "_Signal__accumulator",
+                           &state->offsets.accumulator)                   == -1
+      || find_slot_offset (state->signal_type, "_Signal__emission_level",
+                           &state->offsets.emission_level)                == -1
+      || find_slot_offset (state->connection_type, "handler",
+                           &state->offsets.connection_handler)            == -1
+      || find_slot_offset (state->connection_type, "blocked",
+                           &state->offsets.connection_blocked)            == -1)
+    goto error;
+
+  INTERN_STRING (async_keyword,            "_async");
+  INTERN_STRING (emit_name,                "_emit");
+  INTERN_STRING (emit_asynchronously_name, "_emit_asynchronously");
+  INTERN_STRING (collect_garbage_name,     "collect_garbage");
+  INTERN_STRING (exception_handler_name,   "exception_handler");
+  INTERN_STRING (get_initial_value_name,   "get_initial_value");
+  INTERN_STRING (accumulate_value_name,    "accumulate_value");
+  INTERN_STRING (should_continue_name,     "should_continue");
+  INTERN_STRING (post_process_value_name,  "post_process_value");
+
+  Py_DECREF (signal_module);
+  Py_DECREF (bind_module);
+
+  return 0;
+
+ error:
+  Py_XDECREF (signal_module);
+  Py_XDECREF (bind_module);
+  signal_module_clear (self);
+
+  return -1;
+}
+
+static int
+signal_module_traverse (PyObject *self, visitproc visit, void *arg)
+{
+  SignalModuleState *state = SIGNAL_MODULE_STATE (self);
+
+  Compatibility_VISIT (state->signal_type);
+  Compatibility_VISIT (state->abstract_signal_type);
+  Compatibility_VISIT (state->connection_type);
+  Compatibility_VISIT (state->weak_binding_type);
+  Compatibility_VISIT (state->batch_handler_type);
+  Compatibility_VISIT (state->emit_method);
+
+  return 0;
+}
+
+static int
+signal_module_clear (PyObject *self)
+{
+  SignalModuleState *state = SIGNAL_MODULE_STATE (self);
+
+  Compatibility_CLEAR (state->signal_type);
+  Compatibility_CLEAR (state->abstract_signal_type);
+  Compatibility_CLEAR (state->connection_type);
+  Compatibility_CLEAR (state->weak_binding_type);
+  Compatibility_CLEAR (state->batch_handler_type);
+
+  Compatibility_CLEAR (state->emit_method);
+
+  Compatibility_CLEAR (state->async_keyword);
+  Compatibility_CLEAR (state->emit_name);
+  Compatibility_CLEAR (state->emit_asynchronously_name);
+  Compatibility_CLEAR (state->collect_garbage_name);
+  Compatibility_CLEAR (state->exception_handler_name);
+  Compatibility_CLEAR (state->get_initial_value_name);
+  Compatibility_CLEAR (state->accumulate_value_name);
+  Compatibility_CLEAR (state->should_continue_name);
+  Compatibility_CLEAR (state->post_process_value_name);
+
+  return 0;
+}
+
+
+
+/*- Module initialization ------------------------------------------*/
+
+#define REGISTER_METHOD(dictionary, type, definition, error_label)       \
+  do                                                                    \
+    {                                                                   \
+      PyObject *descriptor = PyDescr_NewMethod (type, &definition);     \
+      if (!descriptor                                                   \
+          || (PyDict_SetItemString (dictionary, definition.ml_name,     \
+                                    descriptor)                         \
+              == -1))                                                   \
+        {                                                               \
+          Py_XDECREF (descriptor);                                      \
+          goto error_label;                                             \
+        }                                                               \
+      Py_DECREF (descriptor);                                           \
+    }                                                                   \
+  while (0)
+
+
+Compatibility_MODINIT_FUNC
+Compatibility_MODINIT_FUNC_NAME (_signal) (void)
+{
+  PyObject          *module = NULL;
+  PyObject          *dictionary;
+  SignalModuleState *state;
+
+  module = Compatibility_ModuleCreate (&signal_module);
+  if (!module)
+    goto error;
+
+  state = SIGNAL_MODULE_STATE (module);
+  memset (state, 0, sizeof (SignalModuleState));
+
+  if (!Compatibility_ModulePostCreate (module, &signal_module))
+    goto error;
+
+  if (signal_module_initialize_state (module) == -1)
+    goto error;
+
+  dictionary = PyModule_GetDict (module);
+  if (!dictionary)
+    goto error;
+
+  /* Method descriptors bound to `Signal' type.  Python code installs them into the class
+   * instead of pure Python implementations.
+   */
+  REGISTER_METHOD (dictionary, state->signal_type, Signal_emit_definition,  error);
+  REGISTER_METHOD (dictionary, state->signal_type, Signal__emit_definition, error);
+
+  state->emit_method = PyDict_GetItemString (dictionary, Signal__emit_definition.ml_name);
+  Py_INCREF (state->emit_method);
+
+  goto do_return;
+
+ error:
+  Compatibility_CLEAR (module);
+
+ do_return:
+  Compatibility_ModuleReturn (module);
+}
+
+
+/*
+ * Local variables:
+ * coding: utf-8
+ * mode: c
+ * c-basic-offset: 2
+ * indent-tabs-mode: nil
+ * fill-column: 90
+ * End:
+ */
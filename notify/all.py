@@ -35,10 +35,17 @@ __docformat__ = 'epytext en'
 
 from notify.base      import *
 from notify.bind      import *
+from notify.bridge    import *
 from notify.condition import *
+from notify.executor  import *
+from notify.failure   import *
 from notify.gc        import *
 from notify.mediator  import *
+from notify.named     import *
+from notify.profiling import *
+from notify.scheduler import *
 from notify.signal    import *
+from notify.tracing   import *
 from notify.utils     import *
 from notify.variable  import *
 
@@ -63,14 +63,15 @@ possible with lambdas and is not an advantage of bindings, just a feature.
 __docformat__ = 'epytext en'
 __all__       = ('Binding', 'WeakBinding', 'RaisingWeakBinding',
                  'BindingCompatibleTypes',
-                 'CannotWeakReferenceError', 'GarbageCollectedError')
+                 'CannotWeakReferenceError', 'GarbageCollectedError',
+                 'HAVE_FAST_CALLS')
 
 
 import sys
 from types        import FunctionType, MethodType
 import weakref
 
-from notify.utils import is_callable, frozendict, DummyReference
+from notify.utils import _PYTHON_IMPLEMENTATION, is_callable, frozendict, DummyReference
 
 
 
@@ -87,6 +88,13 @@ _PY3K = (sys.version_info[0] >= 3)
 # unusable for `WeakBinding' below), won't compare as needed by itself and so on.
 #
 # Conclusion: let's not use it at all.
+#
+# Implementation note: fixed arguments and keywords share one slot, `_fixed'.  Its value
+# depends on what the binding has: None if neither, a `frozendict' if only keywords and
+# otherwise a tuple of arguments, followed by keywords if the last item is a `frozendict'
+# (possibly empty, if the last fixed argument just happens to be a `frozendict'); see
+# `_pack_fixed_arguments'.  Most bindings have no fixed arguments at all, so this saves a
+# slot in each of them, while the class of a binding doesn't depend on its arguments.
 
 class Binding (object):
 
@@ -97,7 +105,7 @@ class Binding (object):
     callables and with equal argument lists, will be equal.
     """
 
-    __slots__ = ('_object', '_function', '_class', '_arguments', '_keywords')
+    __slots__ = ('_object', '_function', '_class', '_fixed', '_hash')
 
 
     def __init__(self, callable_object, arguments = (), keywords = None):
@@ -126,10 +134,8 @@ class Binding (object):
 
         # This raises `TypeError' if `arguments' or `keywords' type is inappropriate.
         arguments = tuple (arguments)
-        if keywords is None:
-            keywords = frozendict.EMPTY
         # Note: not isinstance, subclasses might become modifiable again.
-        elif type (keywords) is not frozendict:
+        if keywords and type (keywords) is not frozendict:
             keywords = frozendict (keywords)
 
         super (Binding, self).__init__()
@@ -148,8 +154,8 @@ class Binding (object):
             self._function = callable_object
             self._class    = None
 
-        self._arguments = arguments
-        self._keywords  = keywords
+        self._fixed = _pack_fixed_arguments (arguments, keywords)
+        self._hash  = None
 
 
     def wrap (cls, callable_object, arguments = (), keywords = None):
@@ -240,10 +246,26 @@ class Binding (object):
         @rtype: C{tuple}
         """
 
-        return self._arguments
+        fixed = self._fixed
+
+        if fixed is None or type (fixed) is frozendict:
+            return ()
+        elif type (fixed[-1]) is frozendict:
+            return fixed[:-1]
+        else:
+            return fixed
 
     def _get_keywords (self):
-        return self._keywords
+        fixed = self._fixed
+
+        if fixed is None:
+            return frozendict.EMPTY
+        elif type (fixed) is frozendict:
+            return fixed
+        elif type (fixed[-1]) is frozendict:
+            return fixed[-1]
+        else:
+            return frozendict.EMPTY
 
 
     def __call__(self, *arguments, **keywords):
@@ -261,7 +283,8 @@ class Binding (object):
         """
 
         # NOTE: If, for some reason, you change this, don't forget to adjust
-        #       `WeakBinding.__call__' accordingly.
+        #       `WeakBinding.__call__' and C implementation in `notify/_bind.c'
+        #       accordingly.
         if keywords:
             fixed_keywords = self._get_keywords ()
             if fixed_keywords:
@@ -337,13 +360,22 @@ class Binding (object):
 
 
     def __hash__(self):
+        # Bindings never change, so the hash is computed only once.
+        _hash = self._hash
+        if _hash is not None:
+            return _hash
+
         _class    = self._get_class     ()
         object    = self._get_object    ()
         arguments = self._get_arguments ()
         keywords  = self._get_keywords  ()
 
         if _class is not None or object is not None:
-            _hash = hash (MethodType (self._get_function (), object, _class))
+            # Must be the same as that of equal methods, see __eq__().
+            if _PY3K:
+                _hash = hash (MethodType (self._get_function (), object))
+            else:
+                _hash = hash (MethodType (self._get_function (), object, _class))
         else:
             _hash = hash (self._get_function ())
 
@@ -352,6 +384,7 @@ class Binding (object):
         if keywords:
             _hash ^= hash (keywords)
 
+        self._hash = _hash
         return _hash
 
 
@@ -495,6 +528,23 @@ class Binding (object):
                 return '<%s>' % description
 
 
+def _pack_fixed_arguments (arguments, keywords):
+    # Return value of `_fixed' slot for given tuple and `frozendict'.  This never maps
+    # different arguments and keywords to equal values, so it can be used in keys.
+    if keywords:
+        if arguments:
+            return arguments + (keywords,)
+        else:
+            return keywords
+    elif arguments:
+        if type (arguments[-1]) is frozendict:
+            return arguments + (frozendict.EMPTY,)
+        else:
+            return arguments
+    else:
+        return None
+
+
 BindingCompatibleTypes = (MethodType, Binding)
 """
 Types ‘compatible’ with C{L{Binding}} to certain extent.  These include
@@ -508,10 +558,12 @@ itself uses the variable several times in calls to C{isinstance} function.
 
 #-- Weak binding classes ---------------------------------------------
 
-# Implementation note: self._object can contain a real WeakReference, a _NONE_REFERENCE or
-# None.  _NONE_REFERENCE is stored if the binding is created without an object at all
-# (i.e. not for a method, or for a static method.)  None indicates that the binding was
-# created with an object, but it has been garbage-collected.
+# Implementation note: self._object contains either a real weak reference or
+# _NONE_REFERENCE.  _NONE_REFERENCE is stored if the binding is created without an object
+# at all (i.e. not for a method, or for a static method.)  Bindings without a callback use
+# the plain weak reference to the object, which Python shares among all its users, so
+# they don't allocate anything besides themselves.  A binding with a callback has its own
+# reference, with the callback attached directly.
 
 class WeakBinding (Binding):
 
@@ -530,10 +582,16 @@ class WeakBinding (Binding):
 
         - boolean state (see C{L{__nonzero__}} method) of the binding becomes C{False}.
 
+    Bindings created with C{L{wrap}} without a callback are I{interned}: as long as such a
+    binding exists, C{wrap} returns the same object for the same callable, arguments and
+    binding class.  Since signals wrap handlers this way, connecting the same handler
+    with the same arguments many times doesn’t create new bindings, and finding it for
+    disconnecting is mostly a matter of identity comparison.
+
     @see:  RaisingWeakBinding
     """
 
-    __slots__ = ('__callback', '__hash')
+    __slots__ = ('__weakref__',)
 
 
     def __init__(self, callable_object, arguments = (), callback = None, keywords = None):
@@ -574,44 +632,61 @@ class WeakBinding (Binding):
                 raise TypeError ("'callback' must be callable")
 
             try:
-                self.__callback = callback
-                self._object    = weakref.ref (self._object, self.__object_garbage_collected)
+                self._object = weakref.ref (self._object, callback)
             except:
                 raise CannotWeakReferenceError (self._object)
         else:
             self._object = _NONE_REFERENCE
 
-        self.__hash = None
-
 
     def wrap (cls, callable_object, arguments = (), callback = None, keywords = None):
         # Inherit documentation somehow?
         if arguments or keywords:
-            return cls (callable_object, arguments, callback, keywords)
+            return cls._intern (callable_object, arguments, callback, keywords)
 
         if (isinstance (callable_object, BindingCompatibleTypes)
             and not isinstance (callable_object, WeakBinding)):
 
             if _PY3K:
                 if callable_object.__self__ is not None:
-                    return cls (callable_object, arguments, callback, keywords)
+                    return cls._intern (callable_object, arguments, callback, keywords)
             else:
                 if callable_object.im_self is not None:
-                    return cls (callable_object, arguments, callback, keywords)
+                    return cls._intern (callable_object, arguments, callback, keywords)
 
         return callable_object
 
 
-    wrap = classmethod (wrap)
+    def _intern (cls, callable_object, arguments, callback, keywords):
+        # Bindings with callbacks are never shared, since callbacks are per binding.
+        if callback is None:
+            key, object = _get_intern_key (cls, callable_object, arguments, keywords)
 
+            if key is not None:
+                binding = _interned_bindings.get (key)
 
-    def _get_object (self):
-        reference = self._object
+                # The key contains id of the object, which can be reused by a new object
+                # while a binding for the old one is still alive.
+                if binding is None or binding._get_object () is not object:
+                    binding = cls (callable_object, arguments, None, keywords)
 
-        if reference is not None:
-            return reference ()
-        else:
-            return None
+                    # Share the equal value of fixed arguments with the key.
+                    if len (key) > 4:
+                        binding._fixed = key[4]
+
+                    _interned_bindings[key] = binding
+
+                return binding
+
+        return cls (callable_object, arguments, callback, keywords)
+
+
+    wrap    = classmethod (wrap)
+    _intern = classmethod (_intern)
+
+
+    def _get_object (self):
+        return self._object ()
 
 
     def __call__(self, *arguments, **keywords):
@@ -628,9 +703,9 @@ class WeakBinding (Binding):
 
         reference = self._object
 
-        if reference is not None:
-            # FIXME: Resurrect 0.2 optimization of inlining super method once that is more
-            #        stable.  It is an _important_ optimization.
+        # NOTE: On CPython this is normally replaced with an inlined C implementation,
+        #       see the end of the module.
+        if reference () is not None or reference is _NONE_REFERENCE:
             return super (WeakBinding, self).__call__(*arguments, **keywords)
         else:
             return self._call_after_garbage_collecting ()
@@ -652,25 +727,13 @@ class WeakBinding (Binding):
         return None
 
 
-    def __object_garbage_collected (self, reference):
-        self._object = None
-
-        callback = self.__callback
-        if callback is not None:
-            self.__callback = None
-            callback (reference)
-
-
     def __hash__(self):
-        if self.__hash is None:
-            if self:
-                self.__hash = super (WeakBinding, self).__hash__()
-            else:
-                raise TypeError (("%s's object had been garbage-collected "
-                                  "before first call to __hash__()")
-                                 % self.__class__.__name__)
+        if self._hash is None and not self:
+            raise TypeError (("%s's object had been garbage-collected "
+                              "before first call to __hash__()")
+                             % self.__class__.__name__)
 
-        return self.__hash
+        return super (WeakBinding, self).__hash__()
 
 
     def __nonzero__(self):
@@ -682,7 +745,8 @@ class WeakBinding (Binding):
         @rtype: C{bool}
         """
 
-        return self._object is not None
+        reference = self._object
+        return reference () is not None or reference is _NONE_REFERENCE
 
     if _PY3K:
         __bool__ = __nonzero__
@@ -693,6 +757,73 @@ _NONE_REFERENCE = DummyReference (None)
 
 
 
+# Implementation note: keys of `_interned_bindings' are tuples of binding class, function,
+# id of the object (so that the object is not referenced strongly), object's class and,
+# if the binding has any, the value of its `_fixed' slot; see `_get_intern_key'.  Values
+# are referenced weakly, so that an entry disappears together with the last user of its
+# binding.  Since object ids can be reused, the object of a found binding is always
+# checked.
+
+_interned_bindings = weakref.WeakValueDictionary ()
+
+
+def _get_intern_key (cls, callable_object, arguments, keywords):
+    # Mirrors `Binding.__init__'.  Returns `(None, None)' if the binding cannot be
+    # interned, e.g. because an argument is not hashable.
+    try:
+        if isinstance (callable_object, BindingCompatibleTypes):
+            if _PY3K:
+                object   = callable_object.__self__
+                function = callable_object.__func__
+                _class   = type (object)
+            else:
+                object   = callable_object.im_self
+                function = callable_object.im_func
+                _class   = callable_object.im_class
+        else:
+            object   = None
+            function = callable_object
+            _class   = None
+
+        arguments = tuple (arguments)
+        if keywords and type (keywords) is not frozendict:
+            keywords = frozendict (keywords)
+
+        fixed = _pack_fixed_arguments (arguments, keywords)
+
+        # Keys of bindings without fixed arguments and keywords are shorter, since there
+        # are usually many of them.
+        if fixed is None:
+            key = (cls, function, id (object), _class)
+        else:
+            key = (cls, function, id (object), _class, fixed)
+
+        hash (key)
+
+        return key, object
+
+    except TypeError:
+        return None, None
+
+
+def _find_binding (callable_object, arguments, keywords):
+    """
+    Return a binding equal to C{Binding (callable_object, arguments, keywords)}, reusing
+    the binding interned by C{L{WeakBinding.wrap}} if there is one.  This is meant for
+    finding connected handlers by comparison.
+    """
+
+    key, object = _get_intern_key (WeakBinding, callable_object, arguments, keywords)
+
+    if key is not None:
+        binding = _interned_bindings.get (key)
+        if binding is not None and binding._get_object () is object:
+            return binding
+
+    return Binding (callable_object, arguments, keywords)
+
+
+
 class RaisingWeakBinding (WeakBinding):
 
     """
@@ -734,6 +865,40 @@ class GarbageCollectedError (RuntimeError):
 
 
 
+#-- Optional C implementation of calls -------------------------------
+
+# The extension provides faster __call__() methods for `Binding' and `WeakBinding' (and so
+# for all their subclasses that don't override them.)  They read slots directly instead
+# of calling `_get_*' methods, unless a subclass overrides any of those, in which case
+# they defer to pure Python implementations below.  These are also the fallback for
+# other Python implementations or if the extension is not built.
+
+_bind = None
+
+if _PYTHON_IMPLEMENTATION == 'CPython':
+    try:
+        from notify import _bind
+    except ImportError:
+        pass
+
+HAVE_FAST_CALLS = (_bind is not None)
+"""
+Whether C{L{Binding}} and C{L{WeakBinding}} use C implementation of C{__call__} method.
+Semantics are exactly the same in both cases, but C implementation is considerably
+faster.
+"""
+
+# Kept around mainly for benchmarking and testing, like `_PYTHON_EMISSION_METHODS' in
+# `notify.signal'.
+_PYTHON_CALL_METHODS = { 'Binding':     Binding.__dict__['__call__'],
+                         'WeakBinding': WeakBinding.__dict__['__call__'] }
+
+if HAVE_FAST_CALLS:
+    Binding.__call__     = _bind.binding_call
+    WeakBinding.__call__ = _bind.weak_binding_call
+
+
+
 # Local variables:
 # mode: python
 # python-indent: 4
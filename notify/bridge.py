@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+"""
+Bridges mirror signals and variables into other processes.  A C{L{SignalBridge}} works
+over a connection to another process, where there is another bridge.  Each side
+I{exports} some of its signals and variables under chosen names and I{imports} those
+exported by the other side:
+
+    >>> from multiprocessing import Pipe
+    ... from notify.bridge   import SignalBridge
+    ...
+    ... here, there = Pipe ()
+    ...
+    ... # In this process.
+    ... bridge = SignalBridge (here)
+    ... bridge.export_signal   ('saved', document.saved)
+    ... bridge.export_variable ('title', document.title)
+    ...
+    ... # In another process, which has got the other end of the pipe.
+    ... bridge = SignalBridge (there)
+    ... saved  = bridge.import_signal   ('saved')
+    ... title  = bridge.import_variable ('title')
+    ... bridge.start ()
+
+Emissions of an exported signal are re-emitted by the imported signal on the other side
+with the same arguments.  Imported variables are ordinary variables that are
+L{set <base.AbstractValueObject.set>} to each new value of the exported one, starting
+with its value at the time of exporting.
+
+Any object with C{send_bytes}, C{recv_bytes}, C{poll} and C{close} methods can serve as a
+connection.  In particular, these are the ends of a C{multiprocessing.Pipe} and
+connections created with C{multiprocessing.connection.Listener} and
+C{multiprocessing.connection.Client}, including those over Unix domain sockets (C{family
+= 'AF_UNIX'}).  Pairs of queues can be used through C{L{QueueConnection}} adapter.
+
+Messages are serialized with C{pickle} by default, but any object with C{dumps} and
+C{loads} functions, e.g. C{json} module, can be specified instead.  Several messages can
+be combined into one frame to save on system calls, see C{batch_size} argument of
+C{L{SignalBridge}}.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('SignalBridge', 'QueueConnection')
+
+
+import pickle
+import struct
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from notify.signal   import Signal
+from notify.utils    import _BytesType, _current_thread, _start_daemon_thread
+from notify.variable import Variable
+
+
+
+#-- Bridges ----------------------------------------------------------
+
+class SignalBridge (object):
+
+    """
+    One end of a bridge between two processes.  See module documentation for details.
+
+    Incoming messages are only processed by C{L{receive}}, either called explicitly or
+    from a background thread started with C{L{start}}.  Imported signals are emitted and
+    imported variables are set in the thread that processes messages.
+
+    Messages for names that are not imported on the receiving side are dropped, except
+    that the last value of each variable is remembered, so that a variable can be
+    imported after the other side has exported it.
+    """
+
+    def __init__(self, connection, serializer = None, batch_size = 1):
+        """
+        Create a bridge over C{connection}, which must be connected to a bridge in
+        another process.
+
+        @param  connection: connection to the other process.
+        @type   connection: C{multiprocessing.Connection} or compatible object.
+
+        @param  serializer: object with C{dumps} and C{loads} functions, e.g. C{pickle}
+                            (default if C{None}) or C{json} module.
+
+        @param  batch_size: number of outgoing messages combined into one frame.  If it
+                            is larger than 1, you need to call C{L{flush}} to make sure
+                            all messages are sent.
+        @type   batch_size: C{int}
+
+        @raises ValueError: if C{batch_size} is less than 1.
+        """
+
+        if batch_size < 1:
+            raise ValueError ("'batch_size' must be at least 1")
+
+        if serializer is None:
+            serializer = pickle
+
+        self.__connection         = connection
+        self.__serializer         = serializer
+        self.__batch_size         = batch_size
+
+        # Outgoing records and connection writes are protected by the lock, since
+        # exported signals can be emitted from any thread.
+        self.__lock               = threading.Lock ()
+        self.__outgoing           = []
+
+        self.__imported_signals   = {}
+        self.__imported_variables = {}
+        self.__received_values    = {}
+
+        self.__thread             = None
+        self.__closed             = False
+
+
+    connection = property (lambda self: self.__connection)
+    serializer = property (lambda self: self.__serializer)
+    batch_size = property (lambda self: self.__batch_size)
+
+
+    def export_signal (self, name, signal):
+        """
+        Forward emissions of C{signal} to the other side, where they are re-emitted by the
+        signal imported under C{name}.  All emission arguments must be serializable,
+        otherwise emission of C{signal} raises.  Values returned by handlers on the other
+        side are not transmitted back.
+        """
+
+        signal.connect (self.__forward_emission, name)
+
+    def unexport_signal (self, name, signal):
+        """
+        Stop forwarding emissions of C{signal} exported under C{name}.
+
+        @rtype:   C{bool}
+        @returns: Whether C{signal} has been exported under C{name}.
+        """
+
+        return signal.disconnect (self.__forward_emission, name)
+
+
+    def export_variable (self, name, variable):
+        """
+        Forward current value and all changes of C{variable} (or any other value object)
+        to the other side, where they are set on the variable imported under C{name}.
+        """
+
+        variable.changed.connect (self.__forward_value, name)
+        self.__send (('set', name, variable.get ()))
+
+    def unexport_variable (self, name, variable):
+        """
+        Stop forwarding changes of C{variable} exported under C{name}.
+
+        @rtype:   C{bool}
+        @returns: Whether C{variable} has been exported under C{name}.
+        """
+
+        return variable.changed.disconnect (self.__forward_value, name)
+
+
+    def import_signal (self, name, signal = None):
+        """
+        Import signal exported under C{name} by the other side.  Its emissions are
+        repeated with C{signal} or, if it is C{None}, with a new C{L{Signal
+        <signal.Signal>}}.  Previously imported signal with the same name, if any, is
+        forgotten.
+
+        @rtype:   C{L{AbstractSignal <signal.AbstractSignal>}}
+        @returns: The signal that will be emitted.
+        """
+
+        if signal is None:
+            signal = Signal ()
+
+        self.__imported_signals[name] = signal
+        return signal
+
+    def import_variable (self, name, variable = None):
+        """
+        Import variable exported under C{name} by the other side.  Its values are set on
+        C{variable} or, if it is C{None}, on a new C{L{Variable <variable.Variable>}}.  If
+        a value has been received already, it is set immediately.  Previously imported
+        variable with the same name, if any, is forgotten.
+
+        @rtype:   C{L{AbstractVariable <variable.AbstractVariable>}}
+        @returns: The variable that will receive values.
+        """
+
+        if variable is None:
+            variable = Variable ()
+
+        self.__imported_variables[name] = variable
+
+        if name in self.__received_values:
+            variable.set (self.__received_values[name])
+
+        return variable
+
+
+    def flush (self):
+        """
+        Send all outgoing messages that are not sent yet.  This is only needed if the
+        bridge has been created with C{batch_size} larger than 1.
+        """
+
+        self.__lock.acquire ()
+        try:
+            self.__send_frame ()
+        finally:
+            self.__lock.release ()
+
+
+    def receive (self, timeout = 0):
+        """
+        Process all incoming messages, waiting up to C{timeout} seconds for them to
+        arrive.  If C{timeout} is C{None}, wait indefinitely.
+
+        @rtype:          C{int}
+        @returns:        Number of processed messages.
+
+        @raises EOFError: if the other side has closed the connection.
+        """
+
+        connection   = self.__connection
+        num_messages = 0
+
+        while connection.poll (timeout):
+            num_messages += self.__process_frame (connection.recv_bytes ())
+            timeout       = 0
+
+        return num_messages
+
+
+    def start (self):
+        """
+        Start a daemon thread that processes incoming messages until the bridge is
+        L{closed <close>} or the other side closes the connection.  If the thread is
+        running already, do nothing.
+        """
+
+        if self.__thread is None:
+            self.__thread = _start_daemon_thread (self.__receive_continuously)
+
+
+    def close (self):
+        """
+        Send pending messages, stop the receiving thread, if any, and close the
+        connection.  Exported signals and variables must not change after this.
+        """
+
+        if self.__closed:
+            return
+
+        self.flush ()
+        self.__closed = True
+
+        thread = self.__thread
+        if thread is not None and thread is not _current_thread ():
+            thread.join ()
+
+        self.__thread = None
+        self.__connection.close ()
+
+
+    def __forward_emission (self, name, *arguments, **keywords):
+        self.__send (('emit', name, arguments, keywords))
+
+    def __forward_value (self, name, value):
+        self.__send (('set', name, value))
+
+
+    # Implementation note: a frame is a sequence of records, each being a serialized
+    # message, prefixed with its length.  Messages are serialized one by one, so that
+    # unserializable arguments of one emission don't spoil the whole frame.
+
+    def __send (self, message):
+        data = self.__serializer.dumps (message)
+        if not isinstance (data, _BytesType):
+            data = data.encode ('utf-8')
+
+        self.__lock.acquire ()
+        try:
+            self.__outgoing.append (struct.pack (_LENGTH_FORMAT, len (data)))
+            self.__outgoing.append (data)
+
+            if len (self.__outgoing) >= 2 * self.__batch_size:
+                self.__send_frame ()
+        finally:
+            self.__lock.release ()
+
+    def __send_frame (self):
+        # Must be called with the lock held.
+        if self.__outgoing:
+            frame           = _BytesType ().join (self.__outgoing)
+            self.__outgoing = []
+
+            self.__connection.send_bytes (frame)
+
+
+    def __process_frame (self, frame):
+        num_messages = 0
+        offset       = 0
+
+        while offset < len (frame):
+            length  = struct.unpack (_LENGTH_FORMAT, frame[offset : offset + _LENGTH_SIZE]) [0]
+            offset += _LENGTH_SIZE
+
+            self.__process_message (self.__serializer.loads (frame[offset : offset + length]))
+
+            offset       += length
+            num_messages += 1
+
+        return num_messages
+
+    def __process_message (self, message):
+        # Serializers like JSON turn tuples into lists, so don't rely on types.
+        kind, name = message[0], message[1]
+
+        if kind == 'emit':
+            signal = self.__imported_signals.get (name)
+            if signal is not None:
+                keywords = dict ([(str (keyword), value)
+                                  for keyword, value in message[3].items ()])
+                signal.emit (*message[2], **keywords)
+
+        elif kind == 'set':
+            self.__received_values[name] = message[2]
+
+            variable = self.__imported_variables.get (name)
+            if variable is not None:
+                variable.set (message[2])
+
+
+    def __receive_continuously (self):
+        try:
+            while not self.__closed:
+                self.receive (_POLL_INTERVAL)
+        except EOFError:
+            pass
+
+
+
+_LENGTH_FORMAT = '>I'
+_LENGTH_SIZE   = struct.calcsize (_LENGTH_FORMAT)
+
+# How often the receiving thread checks if the bridge has been closed, in seconds.
+_POLL_INTERVAL = 0.1
+
+
+
+#-- Connections ------------------------------------------------------
+
+class QueueConnection (object):
+
+    """
+    Adapter that lets a C{L{SignalBridge}} communicate through a pair of queues, e.g.
+    C{multiprocessing.Queue} instances.  Other process must use the same queues,
+    swapped.
+    """
+
+    __slots__ = ('__send_queue', '__receive_queue', '__received')
+
+
+    def __init__(self, send_queue, receive_queue):
+        self.__send_queue    = send_queue
+        self.__receive_queue = receive_queue
+        self.__received      = None
+
+
+    def send_bytes (self, data):
+        self.__send_queue.put (data)
+
+
+    def poll (self, timeout = 0.0):
+        if self.__received is None:
+            try:
+                if timeout is None or timeout > 0:
+                    self.__received = self.__receive_queue.get (True, timeout)
+                else:
+                    self.__received = self.__receive_queue.get (False)
+            except queue.Empty:
+                return False
+
+        return True
+
+    def recv_bytes (self):
+        self.poll (None)
+
+        data            = self.__received
+        self.__received = None
+
+        # Closing side puts an empty string, since real frames are never empty.
+        if not data:
+            raise EOFError
+
+        return data
+
+
+    def close (self):
+        self.__send_queue.put (_BytesType ())
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
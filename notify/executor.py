@@ -0,0 +1,437 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+"""
+Executors run functions in the background and deliver their results through
+C{L{Future}} objects.  L{Signals <signal>} use them for asynchronous emission.
+
+The interface is a subset of that in C{concurrent.futures} module found in later Python
+versions: an executor is any object with C{submit} method.  In particular, instances of
+C{concurrent.futures.Executor} subclasses can be used wherever an executor is expected.
+However, this module doesn’t depend on C{concurrent.futures} and works with any Python
+version Py-notify supports.
+
+Unless told otherwise, signals use value of the C{AbstractExecutor.default} variable.
+Initially, it is an instance of C{L{ThreadPoolExecutor}}.  Threads are only started when
+they are first needed, so there is no overhead if you never emit signals asynchronously.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('Future', 'TimeoutError',
+                 'AbstractExecutor', 'ThreadPoolExecutor', 'SerialExecutor')
+
+
+import sys
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from notify.utils import _current_thread, _notify_all, _start_daemon_thread, \
+                         raise_not_implemented_exception
+
+
+
+#-- Futures ----------------------------------------------------------
+
+class TimeoutError (Exception):
+
+    """
+    Error raised by C{L{Future.result}} and C{L{Future.exception}} if the result is not
+    available within specified timeout.
+    """
+
+
+
+class Future (object):
+
+    """
+    Result of a function call that is possibly not finished yet.  Futures are created by
+    executors; L{result <result>} is set once the function returns or raises an
+    exception.
+    """
+
+    __slots__ = ('__condition', '__done', '__result', '__exception', '__callbacks')
+
+
+    def __init__(self):
+        self.__condition = threading.Condition (threading.Lock ())
+        self.__done      = False
+        self.__result    = None
+        self.__exception = None
+        self.__callbacks = None
+
+
+    def done (self):
+        """
+        Determine if the result (or exception) is already available.
+
+        @rtype: C{bool}
+        """
+
+        return self.__done
+
+
+    def result (self, timeout = None):
+        """
+        Wait for the function to finish and return its value.  If the function raised an
+        exception, it is reraised here instead.
+
+        @param  timeout:      maximum number of seconds to wait or C{None} to wait as long
+                              as needed.
+        @type   timeout:      C{float} or C{None}
+
+        @rtype:               C{object}
+
+        @raises TimeoutError: if the function doesn’t finish within C{timeout}.
+        """
+
+        exception = self.exception (timeout)
+        if exception is not None:
+            raise exception
+
+        return self.__result
+
+    def exception (self, timeout = None):
+        """
+        Wait for the function to finish and return exception it raised or C{None} if it
+        returned normally.
+
+        @param  timeout:      maximum number of seconds to wait or C{None} to wait as long
+                              as needed.
+        @type   timeout:      C{float} or C{None}
+
+        @rtype:               C{BaseException} or C{None}
+
+        @raises TimeoutError: if the function doesn’t finish within C{timeout}.
+        """
+
+        if not self.__done:
+            self.__condition.acquire ()
+            try:
+                if not self.__done:
+                    self.__condition.wait (timeout)
+                    if not self.__done:
+                        raise TimeoutError ('future result is not available after %s seconds'
+                                            % timeout)
+            finally:
+                self.__condition.release ()
+
+        return self.__exception
+
+
+    def add_done_callback (self, callback):
+        """
+        Arrange for C{callback} to be called with the future as its only argument once
+        the result is available.  If it is available already, C{callback} is called
+        immediately.  Callbacks are called in the thread that finishes the future, in the
+        order they were added.
+        """
+
+        self.__condition.acquire ()
+        try:
+            if not self.__done:
+                if self.__callbacks is None:
+                    self.__callbacks = [callback]
+                else:
+                    self.__callbacks.append (callback)
+
+                return
+        finally:
+            self.__condition.release ()
+
+        callback (self)
+
+
+    def set_result (self, result):
+        """
+        Set the result of the future.  This method is for executors only.
+        """
+
+        self.__finish (result, None)
+
+    def set_exception (self, exception):
+        """
+        Set the exception the function has raised.  This method is for executors only.
+        """
+
+        self.__finish (None, exception)
+
+
+    def __finish (self, result, exception):
+        self.__condition.acquire ()
+        try:
+            if self.__done:
+                raise ValueError ('future is already done')
+
+            self.__result    = result
+            self.__exception = exception
+            self.__done      = True
+
+            callbacks        = self.__callbacks
+            self.__callbacks = None
+
+            _notify_all (self.__condition)
+        finally:
+            self.__condition.release ()
+
+        if callbacks is not None:
+            for callback in callbacks:
+                callback (self)
+
+
+    def __repr__(self):
+        if not self.__done:
+            state = 'pending'
+        elif self.__exception is not None:
+            state = 'raised %r' % self.__exception
+        else:
+            state = 'returned %r' % self.__result
+
+        return '<%s.%s at 0x%x: %s>' % (self.__module__, self.__class__.__name__, id (self),
+                                         state)
+
+
+
+def _run (future, function, arguments, keywords):
+    try:
+        result = function (*arguments, **keywords)
+    except:
+        future.set_exception (sys.exc_info () [1])
+    else:
+        future.set_result (result)
+
+
+
+#-- Executors --------------------------------------------------------
+
+class AbstractExecutor (object):
+
+    """
+    Simple executor interface with one method for implementations to define.  Note that
+    you don’t need to derive from this class: anything with compatible C{L{submit}} will
+    do.
+
+    @cvar default:
+    Default executor for asynchronous signal emission.  Starts out as a
+    C{L{ThreadPoolExecutor}} instance, but can be set to anything with C{submit} method
+    at any time.
+    """
+
+    def submit (self, function, *arguments, **keywords):
+        """
+        Schedule C{function} to be called with C{arguments} and C{keywords} and return a
+        C{L{Future}} for the result.
+
+        @rtype: C{L{Future}}
+        """
+
+        raise_not_implemented_exception (self)
+
+
+
+class ThreadPoolExecutor (AbstractExecutor):
+
+    """
+    Executor that calls functions in a bounded pool of threads.  Threads are started
+    only when there is no idle one to pick a new task up and their number never exceeds
+    C{max_workers}.  Tasks that cannot be started immediately wait in a queue.  Threads
+    of the pool are daemonic, i.e. they don’t prevent the program from exiting.
+    """
+
+    def __init__(self, max_workers = 4):
+        """
+        Create a new pool with at most C{max_workers} threads.  No threads are started at
+        this point.
+
+        @raises ValueError: if C{max_workers} is less than one.
+        """
+
+        if max_workers < 1:
+            raise ValueError ("'max_workers' must be at least 1")
+
+        self.__max_workers = max_workers
+        self.__tasks       = queue.Queue ()
+        self.__lock        = threading.Lock ()
+        self.__workers     = []
+        self.__num_idle    = 0
+        self.__shut_down   = False
+
+
+    max_workers = property (lambda self: self.__max_workers)
+
+
+    def submit (self, function, *arguments, **keywords):
+        future = Future ()
+
+        self.__lock.acquire ()
+        try:
+            if self.__shut_down:
+                raise RuntimeError ('cannot submit tasks to a shut down executor')
+
+            self.__tasks.put ((future, function, arguments, keywords))
+
+            if (len (self.__workers) < self.__max_workers
+                and self.__tasks.qsize () > self.__num_idle):
+                self.__workers.append (_start_daemon_thread (self.__work))
+        finally:
+            self.__lock.release ()
+
+        return future
+
+
+    def shutdown (self, wait = True):
+        """
+        Stop accepting new tasks and let all threads exit once they have finished already
+        submitted tasks.  If C{wait} is true, wait until that happens.
+        """
+
+        self.__lock.acquire ()
+        try:
+            self.__shut_down = True
+            workers          = self.__workers
+            self.__workers   = []
+
+            for worker in workers:
+                self.__tasks.put (None)
+        finally:
+            self.__lock.release ()
+
+        if wait:
+            for worker in workers:
+                if worker is not _current_thread ():
+                    worker.join ()
+
+
+    def __work (self):
+        while True:
+            self.__lock.acquire ()
+            self.__num_idle += 1
+            self.__lock.release ()
+
+            task = self.__tasks.get ()
+
+            self.__lock.acquire ()
+            self.__num_idle -= 1
+            self.__lock.release ()
+
+            if task is None:
+                return
+
+            _run (*task)
+
+            # Don't keep references to task objects while idle.
+            task = None
+
+
+
+class SerialExecutor (AbstractExecutor):
+
+    """
+    Executor that runs submitted functions one at a time and in the order of submission,
+    using another executor to actually run them.  At most one task of the underlying
+    executor is occupied at any given time.
+    """
+
+    def __init__(self, executor = None):
+        """
+        Create a new serial executor that runs functions with C{executor}.  If it is
+        C{None}, value of C{L{AbstractExecutor.default}} at submission time is used.
+        """
+
+        self.__executor = executor
+        self.__lock     = threading.Lock ()
+        self.__pending  = []
+        self.__running  = False
+
+
+    executor = property (lambda self: self.__executor)
+
+
+    def submit (self, function, *arguments, **keywords):
+        future = Future ()
+
+        self.__lock.acquire ()
+        try:
+            self.__pending.append ((future, function, arguments, keywords))
+
+            if self.__running:
+                return future
+
+            self.__running = True
+        finally:
+            self.__lock.release ()
+
+        executor = self.__executor
+        if executor is None:
+            executor = AbstractExecutor.default
+
+        try:
+            executor.submit (self.__run_pending)
+        except:
+            self.__lock.acquire ()
+            try:
+                self.__running = False
+                pending        = self.__pending
+                self.__pending = []
+            finally:
+                self.__lock.release ()
+
+            exception = sys.exc_info () [1]
+            for task in pending:
+                task[0].set_exception (exception)
+
+            raise
+
+        return future
+
+
+    def __run_pending (self):
+        while True:
+            self.__lock.acquire ()
+            try:
+                if not self.__pending:
+                    self.__running = False
+                    return
+
+                task = self.__pending.pop (0)
+            finally:
+                self.__lock.release ()
+
+            _run (*task)
+
+
+
+AbstractExecutor.default = ThreadPoolExecutor ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
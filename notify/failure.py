@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+"""
+Failure budgets protect the program from handlers that keep raising exceptions.  By
+default, exceptions in signal handlers are passed to C{sys.excepthook}, which formats and
+prints a traceback each time.  If a handler fails on each emission of a frequently
+emitted signal, this quickly dominates running time.  A C{L{FailureBudget}} is an
+L{exception handler <signal.AbstractSignal.exception_handler>} that instead counts
+failures of each handler, reports them at a limited rate and, once a handler fails too
+many times within a time window, I{quarantines} it, i.e. L{blocks
+<signal.AbstractSignal.block>} it:
+
+    >>> from notify.failure import FailureBudget
+    ... from notify.signal  import AbstractSignal
+    ...
+    ... budget = FailureBudget (max_failures = 5, failure_window = 10.0,
+    ...                         report_interval = 60.0)
+    ... AbstractSignal.exception_handler = budget
+    ...
+    ... # Later:
+    ... for statistics in budget.get_statistics ():
+    ...     if statistics.quarantined:
+    ...         print statistics
+
+Budget can be set for specific signals with C{L{FailureBudget.set_max_failures}}.
+Quarantined handlers stay connected, so they can be returned to service with
+C{L{FailureBudget.release}}.
+
+Exceptions that are not errors, namely C{SystemExit} and C{KeyboardInterrupt}, are
+reraised without counting, as with the L{default exception handler
+<signal.AbstractSignal.default_exception_handler>}.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('FailureBudget', 'FailureStatistics')
+
+
+import threading
+
+from notify.scheduler import _clock
+from notify.signal    import AbstractSignal, KeyedSignal
+
+
+
+#-- Statistics -------------------------------------------------------
+
+class FailureStatistics (object):
+
+    """
+    Failure counters of one handler of one signal.  Unlike C{L{HandlerStatistics
+    <profiling.HandlerStatistics>}}, these are kept per handler object, so different
+    connections of the same function have different counters.
+
+    @ivar num_failures:
+    The number of failures counted against the budget, i.e. those within the failure
+    window.  It never exceeds the budget and is always 0 if the budget is C{None}.
+
+    @ivar total_failures:
+    The number of all failures of the handler.
+
+    @ivar num_reports:
+    The number of failures passed to the reporter.
+
+    @ivar num_suppressed_reports:
+    The number of failures not reported because of rate limiting or quarantine.
+
+    @ivar quarantined:
+    Whether the handler has been blocked for exceeding the budget.
+    """
+
+    __slots__ = ('signal', 'handler', 'num_failures', 'total_failures', 'num_reports',
+                 'num_suppressed_reports', 'quarantined', 'last_failure_time',
+                 'last_report_time', '_failure_times', '_blocked_keys')
+
+
+    def __init__(self, signal, handler):
+        self.signal                 = signal
+        self.handler                = handler
+        self.num_failures           = 0
+        self.total_failures         = 0
+        self.num_reports            = 0
+        self.num_suppressed_reports = 0
+        self.quarantined            = False
+        self.last_failure_time      = None
+        self.last_report_time       = None
+
+        # Times of failures counted against the budget, oldest first.
+        self._failure_times         = []
+
+        # Keys of a `KeyedSignal' the handler has been quarantined for, or None.
+        self._blocked_keys          = None
+
+
+    def __repr__(self):
+        return ('<%s.%s: %r of %s; %d failures, %d total, %d reported%s>'
+                % (self.__module__, self.__class__.__name__, self.handler, self.signal,
+                   self.num_failures, self.total_failures, self.num_reports,
+                   self.quarantined and ', quarantined' or ''))
+
+
+
+#-- Budget -----------------------------------------------------------
+
+class FailureBudget (object):
+
+    """
+    Exception handler that limits the damage done by failing signal handlers.  Instances
+    are callable with the same arguments as any other exception handler, so they are
+    installed by simple assignment to C{L{AbstractSignal.exception_handler
+    <signal.AbstractSignal.exception_handler>}}.
+
+    Note that the budget keeps references to all signals and handlers that have failed
+    until they are L{released <release>} or C{L{clear}} is called.
+
+    Exception handlers are not told emission arguments, so a handler connected for
+    several keys of a C{L{KeyedSignal <signal.KeyedSignal>}} is quarantined for all of
+    them.  Releasing it unblocks it only for those keys.
+    """
+
+    def __init__(self, max_failures = 10, report_interval = 60.0, failure_window = 60.0,
+                 reporter = None, timer = None):
+        """
+        Create a new budget.  A handler is quarantined once it fails C{max_failures} times
+        within C{failure_window} seconds.
+
+        @param  max_failures:    number of failures within the window after which a
+                                 handler is quarantined; C{None} means never.
+        @type   max_failures:    C{int} or C{None}
+
+        @param  report_interval: minimal time between two reports for the same handler,
+                                 in seconds; C{None} means to report only the first
+                                 failure.  Quarantining is always reported.
+        @type   report_interval: C{float} or C{None}
+
+        @param  failure_window:  length of the window in seconds.  Failures that are
+                                 older than this are not counted against the budget, so
+                                 handlers that fail only now and then never exceed it.
+        @type   failure_window:  C{float}
+
+        @param  reporter:        exception handler that reports failures;
+                                 C{L{AbstractSignal.printing_exception_handler
+                                 <signal.AbstractSignal.printing_exception_handler>}} by
+                                 default.
+
+        @param  timer:           function returning current time in seconds;
+                                 C{time.monotonic} by default, where available, or
+                                 C{time.time}.
+
+        @raises ValueError: if C{max_failures} is less than 1 or C{failure_window} is not
+                            positive.
+        """
+
+        if max_failures is not None and max_failures < 1:
+            raise ValueError ("'max_failures' must be at least 1 or None")
+        if failure_window is None or not failure_window > 0:
+            raise ValueError ("'failure_window' must be positive")
+
+        if reporter is None:
+            reporter = AbstractSignal.printing_exception_handler
+        if timer is None:
+            timer = _clock
+
+        self.__max_failures    = max_failures
+        self.__report_interval = report_interval
+        self.__failure_window  = failure_window
+        self.__reporter        = reporter
+        self.__timer           = timer
+
+        self.__lock            = threading.Lock ()
+
+        # Map signals to their budgets, if different from `max_failures'.
+        self.__signal_budgets  = {}
+
+        # Map `(signal, handler)' tuples to `FailureStatistics'.
+        self.__statistics      = {}
+
+
+    max_failures    = property (lambda self: self.__max_failures)
+    report_interval = property (lambda self: self.__report_interval)
+    failure_window  = property (lambda self: self.__failure_window)
+
+
+    def set_max_failures (self, signal, max_failures):
+        """
+        Set a different budget for handlers of C{signal}.  C{max_failures} has the same
+        meaning as the constructor argument.  Handlers that are already over the new
+        budget are quarantined on their next failure.
+        """
+
+        if max_failures is not None and max_failures < 1:
+            raise ValueError ("'max_failures' must be at least 1 or None")
+
+        self.__signal_budgets[signal] = max_failures
+
+    def get_max_failures (self, signal):
+        """
+        Return the budget for handlers of C{signal}.
+
+        @rtype: C{int} or C{None}
+        """
+
+        return self.__signal_budgets.get (signal, self.__max_failures)
+
+
+    def __call__(self, signal, exception, handler):
+        if (isinstance (exception, (SystemExit, KeyboardInterrupt))
+            or not isinstance (exception, Exception)):
+            raise exception
+
+        now           = self.__timer ()
+        max_failures  = self.get_max_failures (signal)
+        should_block  = False
+        should_report = False
+
+        self.__lock.acquire ()
+        try:
+            key        = _get_key (signal, handler)
+            statistics = self.__statistics.get (key)
+            if statistics is None:
+                statistics = self.__statistics[key] = FailureStatistics (signal, handler)
+
+            if max_failures is not None:
+                # Only the latest `max_failures' failures matter for the budget.
+                failure_times = statistics._failure_times
+                failure_times.append (now)
+
+                while (len (failure_times) > max_failures
+                       or now - failure_times[0] > self.__failure_window):
+                    del failure_times[0]
+
+                statistics.num_failures = len (failure_times)
+
+            statistics.total_failures    += 1
+            statistics.last_failure_time  = now
+
+            if statistics.quarantined:
+                # Normally impossible, but can happen if a quarantined handler has been
+                # unblocked other than with release().
+                pass
+            elif max_failures is not None and statistics.num_failures >= max_failures:
+                statistics.quarantined = True
+                should_block           = True
+                should_report          = True
+            elif statistics.last_report_time is None:
+                should_report = True
+            elif self.__report_interval is not None:
+                should_report = (now - statistics.last_report_time >= self.__report_interval)
+
+            if should_report:
+                statistics.num_reports      += 1
+                statistics.last_report_time  = now
+            else:
+                statistics.num_suppressed_reports += 1
+        finally:
+            self.__lock.release ()
+
+        if should_block:
+            statistics._blocked_keys = _block (signal, handler)
+
+        if should_report:
+            self.__reporter (signal, exception, handler)
+
+
+    def get_statistics (self, signal = None):
+        """
+        Return failure statistics of all handlers of C{signal} or, if it is C{None}, of
+        all signals, in no particular order.
+
+        @rtype: C{list} of C{L{FailureStatistics}}
+        """
+
+        return [statistics for statistics in list (self.__statistics.values ())
+                if signal is None or statistics.signal is signal]
+
+    def get_quarantined_handlers (self, signal):
+        """
+        Return all handlers of C{signal} that are currently quarantined.
+
+        @rtype: C{list}
+        """
+
+        return [statistics.handler for statistics in self.get_statistics (signal)
+                if statistics.quarantined]
+
+
+    def release (self, signal, handler):
+        """
+        Release C{handler} of C{signal} from quarantine, i.e. unblock it, and forget its
+        failures.  If the handler is not quarantined, only its failures are forgotten.
+
+        @rtype:   C{bool}
+        @returns: Whether the handler has been quarantined.
+        """
+
+        self.__lock.acquire ()
+        try:
+            statistics = self.__statistics.pop (_get_key (signal, handler), None)
+        finally:
+            self.__lock.release ()
+
+        if statistics is not None and statistics.quarantined:
+            _unblock (signal, handler, statistics._blocked_keys)
+            return True
+        else:
+            return False
+
+
+    def clear (self):
+        """
+        Forget all statistics.  Quarantined handlers remain blocked.
+        """
+
+        self.__lock.acquire ()
+        try:
+            self.__statistics = {}
+        finally:
+            self.__lock.release ()
+
+
+def _block (signal, handler):
+    # Handlers connected for a key of a `KeyedSignal' are not found by block(), and
+    # exception handlers are not told the key, so we have to try all.  Returns the keys
+    # the handler has been blocked for, so that exactly those are unblocked later, or None
+    # if it has been blocked with block().
+    if signal.block (handler) or not isinstance (signal, KeyedSignal):
+        return None
+
+    return [key for key in signal.get_keys () if signal.block_key (key, handler)]
+
+
+def _unblock (signal, handler, blocked_keys):
+    if blocked_keys is None:
+        signal.unblock (handler)
+    else:
+        for key in blocked_keys:
+            signal.unblock_key (key, handler)
+
+
+def _get_key (signal, handler):
+    # Handlers can be unhashable (e.g. bindings of unhashable objects.)  Then identity is
+    # the best we can do; this is fine, since handlers of connections never change.
+    try:
+        hash (handler)
+        return (signal, handler)
+    except TypeError:
+        return (signal, id (handler))
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -229,15 +229,24 @@ class UnprotectionError (ValueError):
     """
 
 
-if _PYTHON_IMPLEMENTATION == 'CPython':
-    from notify._gc import DebugGCProtector, FastGCProtector, RaisingGCProtector
-
-    StandardGCProtector       = FastGCProtector
-    HAVE_FAST_IMPLEMENTATIONS = True
+HAVE_FAST_IMPLEMENTATIONS = False
 
+if _PYTHON_IMPLEMENTATION == 'CPython':
+    try:
+        from notify._gc import DebugGCProtector, FastGCProtector, RaisingGCProtector
+        HAVE_FAST_IMPLEMENTATIONS = True
+    except ImportError:
+        pass
+
+if HAVE_FAST_IMPLEMENTATIONS:
+    StandardGCProtector = FastGCProtector
 else:
-    StandardGCProtector       = SlowGCProtector
-    HAVE_FAST_IMPLEMENTATIONS = False
+    StandardGCProtector = SlowGCProtector
+
+    # These are only implemented in C.
+    __all__ = tuple ([name for name in __all__
+                      if name not in ('FastGCProtector', 'RaisingGCProtector',
+                                      'DebugGCProtector')])
 
 
 _default = StandardGCProtector ()
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+"""
+Named signals are created on demand and don’t occupy any memory while they have no
+handlers.  This is useful for objects that provide many signals most of which are never
+connected to.  There are two ways to use them.
+
+Signals can be declared in a class body with C{L{DeclaredSignal}}:
+
+    >>> from notify.named import *
+    ... import sys
+    ...
+    ... class Document (object):
+    ...     saved  = DeclaredSignal ('saved')
+    ...     closed = DeclaredSignal ('closed')
+    ...
+    ... document = Document ()
+    ... document.saved.connect (lambda: sys.stdout.write ('Saved\\n'))
+    ... document.saved ()
+
+Alternatively, a C{L{SignalCollection}} object returns signals by name:
+
+    >>> signals = SignalCollection (['saved', 'closed'])
+    ... signals['saved'].connect (lambda: sys.stdout.write ('Saved\\n'))
+    ... signals['saved'] ()
+
+In both cases the returned objects are ordinary C{L{Signal <signal.Signal>}} instances.
+There is one weak table for all named signals, indexed by owner object and signal name,
+so that the same signal object is returned while somebody references it.  Signals with
+at least one handler are additionally kept by their owner, just like ordinary signal
+attributes.  This means that you can store a signal object in a local variable to avoid
+repeated lookups, but a signal that is not connected to and not referenced anywhere
+costs nothing.
+
+Connected signals are kept in a dictionary stored in owner’s C{__dict__} under
+C{'_notify_connected_signals'} key, which is only present while the owner has connected
+named signals.  The dictionary is not copied by C{copy} module and not pickled: copies
+and unpickled objects get an empty dictionary instead, so their signals start without
+handlers.
+
+Owners must be weakly referencable: classes with C{__slots__} must include
+C{'__weakref__'} in them.  Owners that have no C{__dict__} can’t keep their connected
+signals, so those are stored in a global table until disconnected or until the owner is
+garbage-collected.  Then a handler that references its owner keeps the owner alive until
+the handler is disconnected.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('DeclaredSignal', 'SignalCollection')
+
+
+import weakref
+
+from notify.signal import Signal
+
+
+
+#-- Public classes ---------------------------------------------------
+
+class DeclaredSignal (object):
+
+    """
+    Descriptor that declares a named signal in a class body.  When read from an instance
+    of the class, it returns the instance’s own C{L{Signal <signal.Signal>}}, creating it
+    if needed.  When read from the class itself, it returns the descriptor.
+    """
+
+    __slots__ = ('__name', '__accumulator')
+
+
+    def __init__(self, name, accumulator = None):
+        """
+        Declare a signal with given C{name} and, optionally, C{accumulator}.  The name is
+        only used for informational purposes, but normally it should be the same as that
+        of the class attribute.
+
+        @raises TypeError: if C{accumulator} is not C{None} and not an instance of
+                           C{L{AbstractAccumulator <signal.AbstractSignal.AbstractAccumulator>}}.
+        """
+
+        if not (accumulator is None or isinstance (accumulator, Signal.AbstractAccumulator)):
+            raise TypeError ("you must provide a 'Signal.AbstractAccumulator' or None")
+
+        self.__name        = name
+        self.__accumulator = accumulator
+
+
+    name        = property (lambda self: self.__name)
+    accumulator = property (lambda self: self.__accumulator)
+
+
+    def __get__(self, instance, owner = None):
+        if instance is None:
+            return self
+
+        return _get_signal (instance, self, self.__accumulator)
+
+
+    def __set__(self, instance, value):
+        raise AttributeError ("declared signals cannot be reassigned")
+
+
+    def __repr__(self):
+        return '<%s.%s: %s>' % (self.__module__, self.__class__.__name__, self.__name)
+
+
+
+class SignalCollection (object):
+
+    """
+    Factory of signals, indexed by name.  C{collection[name]} returns a C{L{Signal
+    <signal.Signal>}} that belongs to the collection, creating it if needed.  Collection
+    doesn’t implement C{L{AbstractSignal <signal.AbstractSignal>}} itself.
+    """
+
+    __slots__ = ('__names', '__connected_signals', '__weakref__')
+
+
+    def __init__(self, names = None):
+        """
+        Create a new collection.  If C{names} is not C{None}, only signals with those
+        names can be retrieved.  Otherwise, any hashable object can be used as a name.
+        """
+
+        if names is not None:
+            self.__names = dict ([(name, True) for name in names])
+        else:
+            self.__names = None
+
+        self.__connected_signals = None
+
+
+    def __getitem__(self, name):
+        if self.__names is not None and name not in self.__names:
+            raise KeyError (name)
+
+        return _get_signal (self, name, None)
+
+
+    def __contains__(self, name):
+        """
+        Determine if the collection allows signals with given C{name}.
+
+        @rtype: C{bool}
+        """
+
+        return self.__names is None or name in self.__names
+
+
+    def get_connected_names (self):
+        """
+        Return names of signals in the collection that currently have handlers, in no
+        particular order.
+
+        @rtype: C{list}
+        """
+
+        if self.__connected_signals is None:
+            return []
+
+        return list (self.__connected_signals.keys ())
+
+
+
+#-- Internals --------------------------------------------------------
+
+class _NamedSignal (Signal):
+
+    """
+    Signal that lives in the table of named signals.  It puts itself into the table of
+    connected signals when it gets its first handler and removes itself from there once
+    the last one is disconnected.
+    """
+
+    __slots__ = ('__owner', '__key', '__weakref__')
+
+
+    def __init__(self, owner, key, accumulator):
+        super (_NamedSignal, self).__init__(accumulator)
+
+        self.__owner = weakref.ref (owner, _create_forgetting_callback (key))
+        self.__key   = key
+
+
+    owner = property (lambda self: self.__owner (),
+                      doc = ("""
+                      The object this signal belongs to or C{None} if the object has been
+                      garbage-collected.
+                      """))
+
+
+    def _is_owned_by (self, owner):
+        return self.__owner () is owner
+
+
+    def do_connect (self, handler, priority = 0):
+        if self._handlers is None:
+            owner = self.__owner ()
+            if owner is not None:
+                _keep_connected_signal (owner, self.__key, self)
+
+        return super (_NamedSignal, self).do_connect (handler, priority)
+
+
+    def collect_garbage (self):
+        super (_NamedSignal, self).collect_garbage ()
+
+        if self._handlers is None:
+            _forget_connected_signal (self.__owner (), self.__key, self)
+
+
+    def _additional_description (self, formatter):
+        return (['name: %s' % formatter (self.__key[1])]
+                + super (_NamedSignal, self)._additional_description (formatter))
+
+
+
+# Both tables are indexed by `(id (owner), name)' tuples, where name is the descriptor
+# object for declared signals.  Owner ids can be reused, so signals remember weak
+# references to their owners and are never returned for a different object.
+#
+# Signals without handlers are only referenced from `_all_signals' weakly, so they
+# disappear as soon as nobody uses them.  Connected signals are referenced from their
+# owner: from a dictionary in its `__dict__' or, for collections, in a slot.  A handler
+# that references the owner then forms a cycle that the garbage collector can free.
+# Only connected signals of owners without `__dict__' go to `_connected_signals'.
+# Callbacks of owner references close over keys, not signals, so that there are no
+# reference cycles.
+
+_all_signals       = weakref.WeakValueDictionary ()
+_connected_signals = {}
+
+# Key of connected signal dictionary in owner's `__dict__'.
+_CONNECTED_SIGNALS_KEY = '_notify_connected_signals'
+
+
+def _get_signal (owner, name, accumulator):
+    key    = (id (owner), name)
+    signal = _all_signals.get (key)
+
+    if signal is None or not signal._is_owned_by (owner):
+        signal            = _NamedSignal (owner, key, accumulator)
+        _all_signals[key] = signal
+
+    return signal
+
+
+def _get_connected_signals (owner, create):
+    # Return owner's dictionary of connected signals, indexed by name, or None if owner
+    # has no such dictionary and `create' is false or it cannot store one.
+    if isinstance (owner, SignalCollection):
+        signals = owner._SignalCollection__connected_signals
+        if signals is None and create:
+            signals = owner._SignalCollection__connected_signals = _ConnectedSignals (owner)
+
+        return signals
+
+    storage = getattr (owner, '__dict__', None)
+    if not isinstance (storage, dict):
+        return None
+
+    signals = storage.get (_CONNECTED_SIGNALS_KEY)
+
+    # Shallow copies of the owner share its `__dict__' contents and deep copies get an
+    # ownerless dictionary, don't mix them up.
+    if signals is not None and signals.owner_id != id (owner):
+        signals = None
+
+    if signals is None and create:
+        signals = storage[_CONNECTED_SIGNALS_KEY] = _ConnectedSignals (owner)
+
+    return signals
+
+
+def _keep_connected_signal (owner, key, signal):
+    signals = _get_connected_signals (owner, True)
+
+    if signals is not None:
+        signals[key[1]] = signal
+    else:
+        _connected_signals[key] = signal
+
+
+def _forget_connected_signal (owner, key, signal):
+    if owner is not None:
+        signals = _get_connected_signals (owner, False)
+
+        if signals is not None and signals.get (key[1]) is signal:
+            del signals[key[1]]
+
+            if not signals and not isinstance (owner, SignalCollection):
+                del owner.__dict__[_CONNECTED_SIGNALS_KEY]
+
+            return
+
+    if _connected_signals.get (key) is signal:
+        del _connected_signals[key]
+
+
+class _ConnectedSignals (dict):
+
+    # Copies and unpickled instances are empty and belong to no owner, so that signals
+    # and their handlers are neither duplicated nor pickled together with the owner.
+
+    __slots__ = ('owner_id',)
+
+
+    def __init__(self, owner = None):
+        super (_ConnectedSignals, self).__init__()
+
+        if owner is not None:
+            self.owner_id = id (owner)
+        else:
+            self.owner_id = None
+
+
+    def __reduce__(self):
+        return (_ConnectedSignals, ())
+
+
+def _create_forgetting_callback (key):
+    def forget (reference):
+        signal = _connected_signals.get (key)
+        if signal is not None and signal._NamedSignal__owner is reference:
+            del _connected_signals[key]
+
+    return forget
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,711 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+"""
+Profiling of signal handlers.  An enabled C{L{EmissionProfiler}} measures time of each
+handler call in emissions of all C{L{Signal <signal.Signal>}} instances and collects
+L{statistics <HandlerStatistics>} per signal and handler:
+
+    >>> from notify.profiling import EmissionProfiler
+    ...
+    ... profiler = EmissionProfiler ()
+    ... profiler.enable ()
+    ... variable.value = 42
+    ... profiler.disable ()
+    ...
+    ... profiler.dump ()
+
+Profilers are also context managers, so with Python 2.5 or later you can simply write
+C{with EmissionProfiler () as profiler:} to profile a block of code.
+
+Statistics of a handler are keyed by its function and, for methods, the class of the
+object, so that all instances of a class share the same entry.  Handlers called by
+iterators from C{L{emit_iter <signal.Signal.emit_iter>}} are measured too.
+
+Profilers replace emission methods of C{Signal} while enabled and restore them when the
+last one is disabled.  Therefore, there is no overhead at all if you don’t use profiling.
+Note that while profiling, emission always goes through pure Python code, so it is
+slower than usual, especially if C implementation is L{available
+<signal.HAVE_FAST_EMISSION>}.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('EmissionProfiler', 'HandlerStatistics')
+
+
+import sys
+import time
+
+from notify.bind   import Binding
+from notify.signal import AbstractSignal, Signal, KeyedSignal, _BatchHandler, \
+                          _EmissionIterator, _ThreadSafeSignalMixin, _WEAK_HANDLERS, \
+                          _PYTHON_EMISSION_METHODS
+
+
+
+if hasattr (time, 'perf_counter'):
+    _timer = time.perf_counter
+elif sys.platform == 'win32':
+    _timer = time.clock
+else:
+    _timer = time.time
+
+
+
+#-- Statistics -------------------------------------------------------
+
+class HandlerStatistics (object):
+
+    """
+    Timing statistics of one handler of one signal.  Handler here means function, plus
+    object class for methods, not a specific connection.
+
+    @cvar HISTOGRAM_BOUNDS:
+    Upper bounds, in seconds, of histogram bins.  The last bin, for which there is no
+    bound, counts all slower calls.
+    """
+
+    __slots__ = ('function', 'object_class', 'num_calls', 'total_time', 'max_time',
+                 'histogram')
+
+    HISTOGRAM_BOUNDS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+
+    def __init__(self, function, object_class):
+        self.function     = function
+        self.object_class = object_class
+        self.num_calls    = 0
+        self.total_time   = 0.0
+        self.max_time     = 0.0
+        self.histogram    = [0] * (len (self.HISTOGRAM_BOUNDS) + 1)
+
+
+    average_time = property (lambda self: self.num_calls and self.total_time / self.num_calls,
+                             doc = ("""
+                             Average time of one handler call, in seconds.
+
+                             @type: float
+                             """))
+
+
+    def _add_call (self, call_time):
+        self.num_calls  += 1
+        self.total_time += call_time
+
+        if call_time > self.max_time:
+            self.max_time = call_time
+
+        bin = 0
+        for bound in self.HISTOGRAM_BOUNDS:
+            if call_time <= bound:
+                break
+            bin += 1
+
+        self.histogram[bin] += 1
+
+
+    def format_histogram (self):
+        """
+        Return text representation of the histogram, listing non-empty bins only.
+
+        @rtype: C{str}
+        """
+
+        bins   = []
+        bounds = self.HISTOGRAM_BOUNDS
+
+        for bin in range (0, len (self.histogram)):
+            if self.histogram[bin]:
+                if bin < len (bounds):
+                    bins.append ('<=%gs: %d' % (bounds[bin], self.histogram[bin]))
+                else:
+                    bins.append ('>%gs: %d' % (bounds[-1], self.histogram[bin]))
+
+        return ', '.join (bins)
+
+
+    def __repr__(self):
+        if self.object_class is not None:
+            name = '%s.%s' % (self.object_class.__name__, self.function.__name__)
+        else:
+            name = getattr (self.function, '__name__', repr (self.function))
+
+        return ('<%s.%s: %s; %d calls, %.6f s total, %.6f s max>'
+                % (self.__module__, self.__class__.__name__, name,
+                   self.num_calls, self.total_time, self.max_time))
+
+
+
+#-- Profiler ---------------------------------------------------------
+
+class EmissionProfiler (object):
+
+    """
+    Collector of handler timing statistics.  Profiler only collects statistics while it
+    is L{enabled <enable>}.  Several profilers may be enabled at the same time, then each
+    of them collects the same statistics independently.
+
+    Note that profiler keeps references to all signals and handlers it has seen until
+    C{L{clear}} is called or the profiler itself is destroyed.
+    """
+
+    def __init__(self):
+        self.__enabled    = False
+
+        # Map signals to dictionaries of `HandlerStatistics', keyed by `(function, class)'
+        # tuples.
+        self.__statistics = {}
+
+
+    def enable (self):
+        """
+        Start collecting statistics.  If the profiler is enabled already, do nothing.
+        """
+
+        if not self.__enabled:
+            self.__enabled = True
+            _activate (self)
+
+    def disable (self):
+        """
+        Stop collecting statistics.  Already collected statistics are retained.  If the
+        profiler is not enabled, do nothing.
+        """
+
+        if self.__enabled:
+            self.__enabled = False
+            _deactivate (self)
+
+    def is_enabled (self):
+        """
+        Determine if the profiler currently collects statistics.
+
+        @rtype: C{bool}
+        """
+
+        return self.__enabled
+
+
+    def __enter__(self):
+        self.enable ()
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.disable ()
+
+
+    def clear (self):
+        """
+        Forget all collected statistics.
+        """
+
+        self.__statistics = {}
+
+
+    def get_profiled_signals (self):
+        """
+        Return all signals that were emitted while the profiler was enabled, in no
+        particular order.
+
+        @rtype: C{list}
+        """
+
+        return list (self.__statistics.keys ())
+
+    def get_statistics (self, signal):
+        """
+        Return statistics of all handlers of C{signal} that were called while the
+        profiler was enabled, in no particular order.
+
+        @rtype: C{list} of C{L{HandlerStatistics}}
+        """
+
+        statistics = self.__statistics.get (signal)
+        if statistics is None:
+            return []
+
+        return list (statistics.values ())
+
+    def get_slowest_handlers (self, signal, num_handlers = 10):
+        """
+        Return statistics of at most C{num_handlers} handlers of C{signal} with the
+        largest total time, slowest first.
+
+        @rtype: C{list} of C{L{HandlerStatistics}}
+        """
+
+        statistics = [(-entry.total_time, k, entry)
+                      for k, entry in enumerate (self.get_statistics (signal))]
+        statistics.sort ()
+
+        return [entry for total_time, k, entry in statistics[:num_handlers]]
+
+
+    def dump (self, num_handlers = 10, stream = None):
+        """
+        Write a report to C{stream} (standard output by default), listing at most
+        C{num_handlers} slowest handlers per signal.  Signals with the largest total time
+        spent in handlers come first.
+        """
+
+        if stream is None:
+            stream = sys.stdout
+
+        signals = []
+        for signal, statistics in self.__statistics.items ():
+            total_time = 0.0
+            for entry in statistics.values ():
+                total_time += entry.total_time
+
+            signals.append ((-total_time, len (signals), signal))
+
+        signals.sort ()
+
+        for minus_total_time, k, signal in signals:
+            stream.write ('%s: %.6f s in handlers\n' % (signal, -minus_total_time))
+
+            for entry in self.get_slowest_handlers (signal, num_handlers):
+                stream.write ('    %r\n' % entry)
+
+                histogram = entry.format_histogram ()
+                if histogram:
+                    stream.write ('        %s\n' % histogram)
+
+
+    # Emission observer protocol, see `_profiling_emit' below.
+
+    def _begin_emission (self, signal, start_time):
+        return True
+
+    def _end_emission (self, signal, end_time):
+        pass
+
+    def _add_call (self, signal, handler, start_time, call_time):
+        statistics = self.__statistics.get (signal)
+        if statistics is None:
+            statistics = self.__statistics[signal] = {}
+
+        key   = _get_handler_key (handler)
+        entry = statistics.get (key)
+        if entry is None:
+            entry = statistics[key] = HandlerStatistics (*key)
+
+        entry._add_call (call_time)
+
+
+
+#-- Internals --------------------------------------------------------
+
+# Enabled profilers and other emission observers, such as tracers from `notify.tracing'.
+_active_observers = ()
+_original_methods = None
+
+# Classes whose `_emit' is replaced in all of them.  Thread-safe signals have their own
+# copy of pure Python `Signal._emit', see `_ThreadSafeSignalMixin'.  Keyed signals differ
+# only in how handlers are found, which `_profiling_emit' asks the signal about.  Their
+# private `__emit', used by `emit_many', is replaced as well.  `Signal.emit_many' is
+# replaced separately, since it is not shared with any other emission method.  So are
+# `next' and `__next__' of iterators returned by `Signal.emit_iter'.
+_INSTRUMENTED_CLASSES = (Signal, _ThreadSafeSignalMixin, KeyedSignal)
+
+
+def _activate (observer):
+    global _active_observers, _original_methods
+
+    if not _active_observers:
+        _original_methods = [(Signal, 'emit',      Signal.__dict__['emit']),
+                             (Signal, 'emit_many', Signal.__dict__['emit_many'])]
+        for instrumented_class in _INSTRUMENTED_CLASSES:
+            _original_methods.append ((instrumented_class, '_emit',
+                                       instrumented_class.__dict__['_emit']))
+
+        _original_methods.append ((KeyedSignal, '_KeyedSignal__emit',
+                                   KeyedSignal.__dict__['_KeyedSignal__emit']))
+
+        for name in ('next', '__next__'):
+            _original_methods.append ((_EmissionIterator, name,
+                                       _EmissionIterator.__dict__[name]))
+
+        Signal.emit      = _PYTHON_EMISSION_METHODS['emit']
+        Signal.emit_many = _profiling_emit_many
+        for instrumented_class in _INSTRUMENTED_CLASSES:
+            instrumented_class._emit = _profiling_emit
+
+        KeyedSignal._KeyedSignal__emit = _profiling_keyed_emit
+
+        _EmissionIterator.next     = _profiling_iterator_next
+        _EmissionIterator.__next__ = _profiling_iterator_next
+
+    # A new tuple, so that emissions in progress keep using their snapshot.
+    _active_observers = _active_observers + (observer,)
+
+
+def _deactivate (observer):
+    global _active_observers, _original_methods
+
+    _active_observers = tuple ([active_observer for active_observer in _active_observers
+                                if active_observer is not observer])
+
+    if not _active_observers:
+        for instrumented_class, name, method in _original_methods:
+            setattr (instrumented_class, name, method)
+
+        _original_methods = None
+        _handler_keys.clear ()
+
+
+# Maps handlers to their statistics keys.  Computing a key is relatively expensive and
+# handler objects normally stay the same for the lifetime of connection.  Cleared when
+# profiling stops, so that handlers are not kept alive.
+_handler_keys = {}
+
+def _get_handler_key (handler):
+    try:
+        return _handler_keys[handler]
+    except (KeyError, TypeError):
+        pass
+
+    binding = handler
+    if isinstance (binding, _BatchHandler):
+        binding = binding.handler
+
+    if not isinstance (binding, Binding):
+        binding = Binding (binding)
+
+    key = (binding._get_function (), binding._get_class ())
+
+    try:
+        _handler_keys[handler] = key
+    except TypeError:
+        # Unhashable handler, don't cache.
+        pass
+
+    return key
+
+
+# NOTE: This must behave exactly like `Signal._emit', except for time measurement.  It
+#       replaces `KeyedSignal._emit' too, so handlers are retrieved with
+#       `_get_emission_handlers'.
+#
+# Observers are notified with `_begin_emission (signal, start_time)', which returns
+# whether the observer is interested in this emission at all, `_add_call (signal,
+# handler, start_time, call_time)' for each handler call and `_end_emission (signal,
+# end_time)'.  Emissions of signals without handlers are not reported.
+
+def _profiling_emit (self, *arguments, **keywords):
+    accumulator = self._Signal__accumulator
+
+    if accumulator is None:
+        _profiling_keyed_emit (self, arguments, keywords, None, None)
+        return None
+    else:
+        value = _profiling_keyed_emit (self, arguments, keywords,
+                                       accumulator, accumulator.get_initial_value ()) [0]
+        return accumulator.post_process_value (value)
+
+
+# NOTE: This replaces `KeyedSignal.__emit', which `KeyedSignal.emit_many' calls directly,
+#       and must behave like it.  Returns accumulated value and whether the accumulator
+#       stopped emission.
+
+def _profiling_keyed_emit (self, arguments, keywords, accumulator, value):
+    handlers = self._get_emission_handlers (arguments)
+    stopped  = False
+
+    if handlers is not None:
+        start     = _timer ()
+        observers = [observer for observer in _active_observers
+                     if observer._begin_emission (self, start)]
+
+        try:
+            saved_emission_level = self._Signal__emission_level
+            self._Signal__emission_level = abs (saved_emission_level) + 1
+            might_have_garbage = False
+
+            for connection in handlers:
+                if self._Signal__emission_level < 0:
+                    might_have_garbage = True
+                    break
+
+                # See `Signal._emit' for why handler is read before the counter.
+                handler = connection.handler
+                if connection.blocked:
+                    continue
+
+                if not handler and isinstance (handler, _WEAK_HANDLERS):
+                    might_have_garbage = True
+                    continue
+
+                start = _timer ()
+
+                try:
+                    try:
+                        handler_value = handler (*arguments, **keywords)
+                    except:
+                        AbstractSignal.exception_handler (self, sys.exc_info () [1], handler)
+                        continue
+                finally:
+                    call_time = _timer () - start
+
+                    for observer in observers:
+                        observer._add_call (self, handler, start, call_time)
+
+                if accumulator is not None:
+                    value = accumulator.accumulate_value (value, handler_value)
+                    if not accumulator.should_continue (value):
+                        might_have_garbage = True
+                        stopped            = True
+                        break
+        finally:
+            self._Signal__emission_level = saved_emission_level
+            if might_have_garbage and saved_emission_level == 0:
+                self.collect_garbage ()
+
+            if observers:
+                end = _timer ()
+                for observer in observers:
+                    observer._end_emission (self, end)
+
+    return value, stopped
+
+
+# NOTE: This must behave exactly like `Signal.emit_many', except for time measurement.
+#       The whole batch is reported to observers as one emission.  A batch handler call
+#       counts as one call, other handlers have a call per item.
+
+def _profiling_emit_many (self, argument_tuples, reduce = False):
+    handlers    = self._handlers
+    accumulator = self._Signal__accumulator
+    batch       = list (argument_tuples)
+
+    if accumulator is None:
+        values = None
+    elif reduce:
+        value  = accumulator.get_initial_value ()
+    else:
+        values = [accumulator.get_initial_value () for arguments in batch]
+
+    if handlers is not None and batch:
+        start     = _timer ()
+        observers = [observer for observer in _active_observers
+                     if observer._begin_emission (self, start)]
+
+        indices = None
+
+        try:
+            saved_emission_level = self._Signal__emission_level
+            self._Signal__emission_level = abs (saved_emission_level) + 1
+            might_have_garbage = False
+
+            for connection in handlers:
+                if self._Signal__emission_level < 0:
+                    might_have_garbage = True
+                    break
+
+                handler = connection.handler
+                if connection.blocked:
+                    continue
+
+                if not handler and isinstance (handler, _WEAK_HANDLERS):
+                    might_have_garbage = True
+                    continue
+
+                if isinstance (handler, _BatchHandler):
+                    start = _timer ()
+
+                    try:
+                        try:
+                            handler_values = handler.handler (batch)
+                        except:
+                            AbstractSignal.exception_handler (self, sys.exc_info () [1],
+                                                              handler)
+                            continue
+                    finally:
+                        call_time = _timer () - start
+
+                        for observer in observers:
+                            observer._add_call (self, handler, start, call_time)
+
+                    if accumulator is None:
+                        continue
+
+                    handler_values = enumerate (handler_values)
+                else:
+                    handler_values = _profiling_call_for_each (self, handler, batch,
+                                                               observers)
+
+                    if accumulator is None:
+                        for index, handler_value in handler_values:
+                            pass
+
+                        continue
+
+                if reduce:
+                    for index, handler_value in handler_values:
+                        value = accumulator.accumulate_value (value, handler_value)
+                        if not accumulator.should_continue (value):
+                            self._Signal__emission_level = -self._Signal__emission_level
+                            break
+                else:
+                    stopped_indices = None
+
+                    for index, handler_value in handler_values:
+                        if indices is not None:
+                            index = indices[index]
+
+                        values[index] = accumulator.accumulate_value (values[index],
+                                                                      handler_value)
+                        if not accumulator.should_continue (values[index]):
+                            if stopped_indices is None:
+                                stopped_indices = {}
+                            stopped_indices[index] = True
+
+                    if stopped_indices is not None:
+                        if indices is None:
+                            indices = range (len (batch))
+
+                        remaining = [(indices[k], batch[k]) for k in range (len (batch))
+                                     if indices[k] not in stopped_indices]
+                        indices   = [item[0] for item in remaining]
+                        batch     = [item[1] for item in remaining]
+
+                        if not batch:
+                            might_have_garbage = True
+                            break
+        finally:
+            self._Signal__emission_level = saved_emission_level
+            if might_have_garbage and saved_emission_level == 0:
+                self.collect_garbage ()
+
+            if observers:
+                end = _timer ()
+                for observer in observers:
+                    observer._end_emission (self, end)
+
+    if accumulator is None:
+        return None
+    elif reduce:
+        return accumulator.post_process_value (value)
+    else:
+        return [accumulator.post_process_value (value) for value in values]
+
+
+def _profiling_call_for_each (self, handler, batch, observers):
+    # Like `Signal.__call_for_each', but reports each call to `observers'.
+    for index in range (len (batch)):
+        start = _timer ()
+
+        try:
+            try:
+                handler_value = handler (*batch[index])
+            except:
+                AbstractSignal.exception_handler (self, sys.exc_info () [1], handler)
+                handler_value = _FAILED
+        finally:
+            call_time = _timer () - start
+
+            for observer in observers:
+                observer._add_call (self, handler, start, call_time)
+
+        if handler_value is not _FAILED:
+            yield index, handler_value
+
+        if self._Signal__emission_level < 0:
+            return
+
+
+# Marks failed handler calls in `_profiling_call_for_each'.
+_FAILED = object ()
+
+
+# NOTE: This must behave exactly like `_EmissionIterator.next', except for time
+#       measurement.  Iterators can be suspended and abandoned at any point, so, much like
+#       emission level, each handler call is reported to observers as an emission of its
+#       own.  Otherwise emissions of different iterators would not nest.
+
+def _profiling_iterator_next (self):
+    handlers = self._EmissionIterator__handlers
+    if handlers is None:
+        raise StopIteration
+
+    signal = self._EmissionIterator__signal
+
+    while self._EmissionIterator__index < len (handlers):
+        connection                     = handlers[self._EmissionIterator__index]
+        self._EmissionIterator__index += 1
+
+        handler = connection.handler
+        if connection.blocked:
+            continue
+
+        if not handler and isinstance (handler, _WEAK_HANDLERS):
+            self._EmissionIterator__might_have_garbage = True
+            continue
+
+        start     = _timer ()
+        observers = [observer for observer in _active_observers
+                     if observer._begin_emission (signal, start)]
+
+        saved_emission_level = signal._Signal__emission_level
+        signal._Signal__emission_level = abs (saved_emission_level) + 1
+        succeeded = False
+
+        try:
+            try:
+                start = _timer ()
+
+                try:
+                    handler_value = handler (*self._EmissionIterator__arguments,
+                                             **self._EmissionIterator__keywords)
+                    succeeded     = True
+                except:
+                    AbstractSignal.exception_handler (signal, sys.exc_info () [1], handler)
+            finally:
+                stopped = (signal._Signal__emission_level < 0)
+                signal._Signal__emission_level = saved_emission_level
+        finally:
+            end = _timer ()
+
+            for observer in observers:
+                observer._add_call (signal, handler, start, end - start)
+            for observer in observers:
+                observer._end_emission (signal, end)
+
+        if stopped:
+            self._EmissionIterator__index = len (handlers)
+
+        if succeeded:
+            return handler_value
+
+    self.close ()
+    raise StopIteration
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+"""
+Schedulers call functions after a delay.  They are used by L{debounced
+<signal.DebouncedSignal>} and L{throttled <signal.ThrottledSignal>} signals to deliver
+coalesced emissions.
+
+A scheduler is any object with C{L{call_later <AbstractScheduler.call_later>}} method.
+This module provides three implementations:
+C{L{TimerThreadScheduler}}, which runs all calls in one background thread;
+C{L{AsyncioScheduler}}, which delegates to an C{asyncio} event loop; and
+C{L{ManualScheduler}}, where time only advances when told to, which is mostly useful for
+tests.
+
+Unless told otherwise, signals use value of the C{AbstractScheduler.default} variable.
+Initially, it is an instance of C{L{TimerThreadScheduler}}.  Its thread is only started
+when it is first needed.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('AbstractScheduler', 'ScheduledCall',
+                 'TimerThreadScheduler', 'AsyncioScheduler', 'ManualScheduler')
+
+
+import heapq
+import sys
+import threading
+import time
+
+from notify.utils import _current_thread, _start_daemon_thread, raise_not_implemented_exception
+
+
+
+# Deadlines must not move when wall clock is adjusted.
+if hasattr (time, 'monotonic'):
+    _clock = time.monotonic
+else:
+    _clock = time.time
+
+
+
+#-- Scheduled calls --------------------------------------------------
+
+class ScheduledCall (object):
+
+    """
+    A function call scheduled with C{L{TimerThreadScheduler}} or C{L{ManualScheduler}}.
+    The only thing you can do with it is to cancel the call.  Other schedulers may return
+    different objects, but they always have C{L{cancel}} method.
+    """
+
+    __slots__ = ('deadline', '__function', '__arguments')
+
+
+    def __init__(self, deadline, function, arguments):
+        self.deadline    = deadline
+        self.__function  = function
+        self.__arguments = arguments
+
+
+    def cancel (self):
+        """
+        Cancel the call if it hasn’t been made yet.  Otherwise, do nothing.
+        """
+
+        self.__function  = None
+        self.__arguments = None
+
+
+    def is_cancelled (self):
+        """
+        Determine if the call has been cancelled.
+
+        @rtype: C{bool}
+        """
+
+        return self.__function is None
+
+
+    def _run (self):
+        function = self.__function
+        if function is None:
+            return
+
+        arguments = self.__arguments
+        self.cancel ()
+
+        try:
+            function (*arguments)
+        except:
+            # There is nobody to report the exception to, but it must not kill a thread
+            # that other calls depend on.
+            sys.excepthook (*sys.exc_info ())
+
+
+    def __repr__(self):
+        if self.is_cancelled ():
+            return '<%s.%s: cancelled>' % (self.__module__, self.__class__.__name__)
+        else:
+            return '<%s.%s: %r at %s>' % (self.__module__, self.__class__.__name__,
+                                          self.__function, self.deadline)
+
+
+
+#-- Schedulers -------------------------------------------------------
+
+class AbstractScheduler (object):
+
+    """
+    Simple scheduler interface with one method for implementations to define.  Note that
+    you don’t need to derive from this class: anything with compatible C{L{call_later}}
+    will do.
+
+    @cvar default:
+    Default scheduler for debounced and throttled signals.  Starts out as a
+    C{L{TimerThreadScheduler}} instance, but can be set to any scheduler at any time.
+    """
+
+    def call_later (self, delay, function, *arguments):
+        """
+        Arrange for C{function} to be called with C{arguments} once C{delay} seconds
+        pass.  Return an object with C{cancel} method that can be used to cancel the call
+        before it is made.
+
+        Note that functions may be called in a different thread, depending on the
+        scheduler.
+
+        @rtype: C{object}
+        """
+
+        raise_not_implemented_exception (self)
+
+
+
+class TimerThreadScheduler (AbstractScheduler):
+
+    """
+    Scheduler that runs all calls in one background thread.  Unlike with
+    C{threading.Timer}, there is no thread per call: pending calls are kept in a heap,
+    ordered by deadline, and the thread sleeps until the earliest one is due.  The thread
+    is daemonic and only started when the first call is scheduled.
+    """
+
+    def __init__(self):
+        self.__condition = threading.Condition (threading.Lock ())
+        self.__thread    = None
+
+        # Heap of `(deadline, sequence number, call)' tuples.  Sequence numbers make
+        # calls with equal deadlines run in the order they were scheduled.
+        self.__calls     = []
+        self.__sequence  = 0
+        self.__shut_down = False
+
+
+    def call_later (self, delay, function, *arguments):
+        call = ScheduledCall (_clock () + delay, function, arguments)
+
+        self.__condition.acquire ()
+        try:
+            if self.__shut_down:
+                raise RuntimeError ('cannot schedule calls with a shut down scheduler')
+
+            heapq.heappush (self.__calls, (call.deadline, self.__sequence, call))
+            self.__sequence += 1
+
+            if self.__thread is None:
+                self.__thread = _start_daemon_thread (self.__work)
+            elif self.__calls[0][2] is call:
+                # The thread may be sleeping until a later deadline.
+                self.__condition.notify ()
+        finally:
+            self.__condition.release ()
+
+        return call
+
+
+    def shutdown (self, wait = True):
+        """
+        Stop accepting new calls, drop pending ones and let the thread exit.  If C{wait}
+        is true, wait until that happens.
+        """
+
+        self.__condition.acquire ()
+        try:
+            self.__shut_down = True
+            self.__calls     = []
+            thread           = self.__thread
+
+            self.__condition.notify ()
+        finally:
+            self.__condition.release ()
+
+        if wait and thread is not None and thread is not _current_thread ():
+            thread.join ()
+
+
+    def __work (self):
+        while True:
+            self.__condition.acquire ()
+            try:
+                while True:
+                    if self.__shut_down:
+                        return
+
+                    calls = self.__calls
+                    while calls and calls[0][2].is_cancelled ():
+                        heapq.heappop (calls)
+
+                    if calls:
+                        timeout = calls[0][0] - _clock ()
+                        if timeout <= 0:
+                            call = heapq.heappop (calls) [2]
+                            break
+
+                        self.__condition.wait (timeout)
+                    else:
+                        self.__condition.wait ()
+            finally:
+                self.__condition.release ()
+
+            call._run ()
+
+            # Don't keep references to call objects while idle.
+            call = None
+
+
+
+class AsyncioScheduler (AbstractScheduler):
+
+    """
+    Scheduler that uses C{call_later} of an C{asyncio} event loop.  Functions are called
+    in the loop’s thread, and C{L{call_later}} must be called from it too.  This
+    scheduler is available only on Python versions that have C{asyncio}.
+    """
+
+    def __init__(self, loop = None):
+        """
+        Create a scheduler for the given event C{loop}.  If it is C{None}, the loop
+        returned by C{asyncio.get_event_loop} at the time of each call is used.
+        """
+
+        self.__loop = loop
+
+
+    loop = property (lambda self: self.__loop)
+
+
+    def call_later (self, delay, function, *arguments):
+        return self.__get_loop ().call_later (delay, function, *arguments)
+
+
+    def __get_loop (self):
+        if self.__loop is not None:
+            return self.__loop
+
+        import asyncio
+        return asyncio.get_event_loop ()
+
+
+
+class ManualScheduler (AbstractScheduler):
+
+    """
+    Scheduler whose time only changes when C{L{advance}} is called.  Due calls are made
+    from C{advance}, in the calling thread.  This makes timing-dependent code fully
+    deterministic, so it is mostly useful in tests.
+    """
+
+    def __init__(self, start_time = 0.0):
+        self.__time     = start_time
+        self.__calls    = []
+        self.__sequence = 0
+
+
+    def time (self):
+        """
+        Return current time of the scheduler, in seconds.
+
+        @rtype: C{float}
+        """
+
+        return self.__time
+
+
+    def call_later (self, delay, function, *arguments):
+        call = ScheduledCall (self.__time + delay, function, arguments)
+
+        heapq.heappush (self.__calls, (call.deadline, self.__sequence, call))
+        self.__sequence += 1
+
+        return call
+
+
+    def advance (self, seconds):
+        """
+        Advance time by C{seconds} and make all calls that become due, in the order of
+        their deadlines.  Calls scheduled from within those calls are also made if they
+        are due before the new time.
+        """
+
+        target_time = self.__time + seconds
+        calls       = self.__calls
+
+        while calls and calls[0][0] <= target_time:
+            call = heapq.heappop (calls) [2]
+            if not call.is_cancelled ():
+                self.__time = max (self.__time, call.deadline)
+                call._run ()
+
+        self.__time = target_time
+
+
+    def count_pending_calls (self):
+        """
+        Return the number of calls that are scheduled, but not made or cancelled yet.
+
+        @rtype: C{int}
+        """
+
+        return len ([entry for entry in self.__calls if not entry[2].is_cancelled ()])
+
+
+
+AbstractScheduler.default = TimerThreadScheduler ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-import threading
 
 #--------------------------------------------------------------------#
 # This file is part of Py-notify.                                    #
@@ -89,9 +88,10 @@ Brief Comparison With GObject Signals
       - Py-notify signal handlers are not type-safe.  This is a result of native Pythonic
         implementation.  (PyGObject wraps C signals from U{GLib <http://gtk.org/>}.)
 
-      - There are no connection IDs, handlers can be disconnected only by passing the same
-        handler to C{L{disconnect <AbstractSignal.disconnect>}} method.  This is less
-        efficient, but easier to use.
+      - There are no connection IDs, handlers are normally disconnected by passing the
+        same handler to C{L{disconnect <AbstractSignal.disconnect>}} method.  This is less
+        efficient, but easier to use.  If efficiency matters, use C{L{connect_handle
+        <AbstractSignal.connect_handle>}} which returns a C{L{Connection}} object.
 
       - Py-notify signals are U{slower <http://home.gna.org/py-notify/benchmark.html>}.
         This may be important in time-critical code if you use signals heavily.
@@ -103,15 +103,22 @@ G{classtree AbstractSignal}
 """
 
 __docformat__ = 'epytext en'
-__all__ = ('AbstractSignal', 'Signal', 'CleanSignal')
+__all__ = ('AbstractSignal', 'Signal', 'CleanSignal',
+           'ThreadSafeSignal', 'ThreadSafeCleanSignal', 'KeyedSignal',
+           'QueuedSignal', 'DebouncedSignal', 'ThrottledSignal',
+           'Connection', 'HAVE_FAST_EMISSION')
 
 
 import sys
+import threading
 import weakref
 
-from notify.bind  import Binding, WeakBinding
-from notify.gc    import AbstractGCProtector
-from notify.utils import is_callable, raise_not_implemented_exception, DummyReference
+from notify.bind      import Binding, WeakBinding, _find_binding
+from notify.executor  import AbstractExecutor, Future, SerialExecutor
+from notify.gc        import AbstractGCProtector
+from notify.scheduler import AbstractScheduler
+from notify.utils     import _PYTHON_IMPLEMENTATION, is_callable, \
+                             raise_not_implemented_exception, DummyReference
 
 try:
     import contextlib
@@ -119,6 +126,16 @@ except ImportError:
     # Ignore, related features will not be provided.
     pass
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    from thread import get_ident as _get_thread_id
+except ImportError:
+    from _thread import get_ident as _get_thread_id
+
 
 
 #-- Signal interface classes -----------------------------------------
@@ -129,14 +146,15 @@ class AbstractSignal (object):
     Abstract interface all signal classes must implement.
 
     @group Connecting Handlers:
-    is_connected, connect, connect_safe, do_connect, do_connect_safe, disconnect,
-    disconnect_all, connecting, connecting_safely
+    is_connected, connect, connect_safe, connect_handle, connect_batch, do_connect,
+    do_connect_safe, disconnect, disconnect_all, connecting, connecting_safely
 
     @group Blocking Handlers:
     is_blocked, block, unblock, blocking
 
     @group Emission:
-    __call__, emit, stop_emission, emission_level, emission_stopped
+    __call__, emit, emit_many, emit_iter, emit_async, emit_in_processes, stop_emission,
+    emission_level, emission_stopped
 
     @group Handler List Maintenance:
     has_handlers, __nonzero__, count_handlers, collect_garbage
@@ -148,10 +166,11 @@ class AbstractSignal (object):
     _get_emission_level, _is_emission_stopped, __to_string
 
     @sort:
-    is_connected, connect, connect_safe, do_connect, do_connect_safe, disconnect,
-    disconnect_all, connecting, connecting_safely,
+    is_connected, connect, connect_safe, connect_handle, connect_batch, do_connect,
+    do_connect_safe, disconnect, disconnect_all, connecting, connecting_safely,
     is_blocked, block, unblock, blocking,
-    __call__, emit, stop_emission, emission_level, emission_stopped,
+    __call__, emit, emit_many, emit_iter, emit_async, emit_in_processes, stop_emission,
+    emission_level, emission_stopped,
     has_handlers, __nonzero__, count_handlers, collect_garbage,
     _wrap_handler, _additional_description
     """
@@ -410,6 +429,13 @@ class AbstractSignal (object):
         Note that it is legal to connect the same handler and with the same arguments
         several times and the handler will be called that many times on signal emission.
 
+        Handlers are called in the order of their I{priority}, which can be specified
+        with C{_priority} keyword argument.  It is not passed to the handler and defaults
+        to 0.  Handlers with larger priority are called first; handlers with equal
+        priority are called in the order of connection.  For instance, validating
+        handlers can be connected with a positive priority so that they run before all
+        the others, regardless of when they were connected.
+
         All standard implementations of C{AbstractSignal} interface will automatically
         disconnect method handlers of garbage-collected objects.  For details, please see
         C{L{WeakBinding}} class documentation.
@@ -419,7 +445,8 @@ class AbstractSignal (object):
         C{L{do_connect}} and/or C{L{_wrap_handler}} instead.
         """
 
-        self.do_connect (self._wrap_handler (handler, *arguments, **keywords))
+        priority = keywords.pop ('_priority', 0)
+        self.do_connect (self._wrap_handler (handler, *arguments, **keywords), priority)
 
     def connect_safe (self, handler, *arguments, **keywords):
         """
@@ -433,12 +460,51 @@ class AbstractSignal (object):
                   had been connected already.
         """
 
+        priority = keywords.pop ('_priority', 0)
+
         if not self.is_connected (handler, *arguments, **keywords):
-            self.do_connect (self._wrap_handler (handler, *arguments, **keywords))
+            self.do_connect (self._wrap_handler (handler, *arguments, **keywords), priority)
             return True
         else:
             return False
 
+    def connect_handle (self, handler, *arguments, **keywords):
+        """
+        Connect C{handler} with C{arguments} to the signal and return a C{L{Connection}}
+        object for the new connection.  Otherwise this method is identical to
+        C{L{connect}}.
+
+        Handle methods operate on the connection directly, without comparing handlers.
+        This is much more efficient than using C{L{disconnect}}, C{L{block}} or
+        C{L{unblock}}, especially on signals with many handlers.  It also makes it
+        possible to tell apart equal handlers connected several times.
+
+        @rtype: C{L{Connection}}
+        """
+
+        raise_not_implemented_exception (self)
+
+    def connect_batch (self, handler, *arguments, **keywords):
+        """
+        Connect C{handler} with C{arguments} to the signal as a I{batch handler}.  Such a
+        handler is called once per C{L{emit_many}} call with a list of emission argument
+        tuples as its last argument, rather than once per item.  Normal emission calls it
+        with a list of one tuple.  Keyword arguments of C{L{emit}}, if any, are passed to
+        batch handlers as they are.
+
+        If the signal has an accumulator, batch handler must return a sequence with one
+        value per item in the list it has been given.  These values are accumulated as if
+        they were returned by separate calls to an ordinary handler.
+
+        Batch handlers can be disconnected, blocked and unblocked just like ordinary
+        ones, by passing the same C{handler} and C{arguments}.  Handler L{priority
+        <connect>} can be specified as for ordinary handlers.
+        """
+
+        priority = keywords.pop ('_priority', 0)
+        self.do_connect (_BatchHandler (self._wrap_handler (handler, *arguments, **keywords)),
+                         priority)
+
 
     def _wrap_handler (self, handler, *arguments, **keywords):
         """
@@ -458,10 +524,10 @@ class AbstractSignal (object):
         return WeakBinding.wrap (handler, arguments, None, keywords)
 
 
-    def do_connect (self, handler):
+    def do_connect (self, handler, priority = 0):
         """
-        Connect C{handler} to the signal without any further modifications.  See
-        C{L{connect}} method for details.
+        Connect C{handler} with given C{priority} to the signal without any further
+        modifications.  See C{L{connect}} method for details.
 
         This method I{may} be called from outside, but most of the time you should use
         C{L{connect}} instead.  Note that since signal class will not do any handler
@@ -471,10 +537,10 @@ class AbstractSignal (object):
 
         raise_not_implemented_exception (self)
 
-    def do_connect_safe (self, handler):
+    def do_connect_safe (self, handler, priority = 0):
         """
-        Connect C{handler} to the signal unless it is connected already, without any
-        further modifications.  See C{L{connect}} method for details.
+        Connect C{handler} with given C{priority} to the signal unless it is connected
+        already, without any further modifications.  See C{L{connect}} method for details.
 
         This method I{may} be called from outside, but most of the time you should use
         C{L{connect_safe}} instead.  Note that since signal class will not do any handler
@@ -487,7 +553,7 @@ class AbstractSignal (object):
         """
 
         if not self.is_connected (handler):
-            self.do_connect (handler)
+            self.do_connect (handler, priority)
             return True
         else:
             return False
@@ -594,6 +660,17 @@ class AbstractSignal (object):
         del _2_5
 
 
+    if sys.version_info[:2] >= (3, 5):
+        # Same hacks as above, but for `async def' methods.
+
+        from notify._3_5 import signal as _3_5
+
+        emit_async = _3_5.abstract_emit_async
+        emit_async.__module__ = __module__
+
+        del _3_5
+
+
     def emit (self, *arguments, **keywords):
         """
         Invoke non-blocked handlers connected to C{self}, passing C{arguments} to them.
@@ -625,6 +702,95 @@ class AbstractSignal (object):
         """
         return self.emit (*arguments, **keywords)
 
+    def emit_many (self, argument_tuples, reduce = False):
+        """
+        Emit the signal once for each tuple in C{argument_tuples}, as a single batch.
+        This is semantically close to calling C{L{emit}} in a loop, but a signal can do
+        all the preparations only once per batch instead of once per item.  Besides,
+        L{batch handlers <connect_batch>} are called only once, with all the items.
+        Note that standard signals call each handler for all the items before moving on
+        to the next handler, so the order of calls differs from that of a loop.
+
+        If the signal has an accumulator, return value depends on C{reduce}.  If it is
+        false, the result is a list of values, each accumulated from handler results for
+        the corresponding item.  Otherwise, all values for all items are accumulated into
+        one and this method returns it.  Without an accumulator the return value is
+        C{None}.
+
+        Batch emission is always synchronous, regardless of C{asynchronous} attribute.
+
+        @param  argument_tuples: emission arguments, one tuple per item.
+        @type   argument_tuples: iterable of C{tuple}
+
+        @param  reduce:          whether to accumulate handler values of all items into
+                                 one value.
+        @type   reduce:          C{bool}
+
+        @rtype:   C{list} or C{object}
+        @returns: Value(s), determined by subclass and, possibly, by its
+                  L{accumulator <AbstractAccumulator>}.
+        """
+
+        raise_not_implemented_exception (self)
+
+    def emit_iter (self, *arguments, **keywords):
+        """
+        Return an iterator that invokes non-blocked handlers one by one, as the caller
+        advances it, and yields their return values in order.  This lets the caller
+        decide on the fly how many results it needs: once it stops iterating, remaining
+        handlers are not called at all.  Handlers that raise exceptions yield nothing;
+        exceptions go to C{L{exception_handler}} as usual.
+
+        Signal L{accumulator <AbstractAccumulator>}, if any, is ignored and emission is
+        always synchronous.  Handlers can still stop emission with C{L{stop_emission}},
+        which ends the iteration after the value of the stopping handler.
+
+        Returned iterator has a C{close} method, which ends the emission right away.  It
+        is also called when the iterator is exhausted.  While iteration is not finished,
+        the signal may hold garbage (i.e. handlers of garbage-collected objects) a little
+        longer than usual, but this has no other effects.
+
+        Example usage:
+            >>> for value in signal.emit_iter (document):
+            ...     if value is not None:
+            ...         break
+
+        @rtype:   iterator
+        @returns: Iterator over handler return values.
+        """
+
+        raise_not_implemented_exception (self)
+
+    def emit_in_processes (self, executor, *arguments, **keywords):
+        """
+        Emit the signal with all handlers running in other processes, through
+        C{executor}, which is normally a C{concurrent.futures.ProcessPoolExecutor}
+        instance.  Each handler is submitted as a separate task, so handlers run in
+        parallel and are not limited by the global interpreter lock.  This is only
+        worthwhile for handlers that do considerable computations.
+
+        Handlers, their connection-time arguments and emission arguments are pickled to be
+        sent to worker processes, so all of them must be picklable.  In particular,
+        handlers must be module-level functions or methods of picklable objects.  Note that
+        a handler works with a I{copy} of its object, so changes it makes are not visible
+        in this process.
+
+        Return value is a future for the accumulated result.  Values returned by handlers
+        are passed to the L{accumulator <AbstractAccumulator>} in this process, in the
+        order handlers are connected.  Once the accumulator tells to stop emission, calls
+        that have not started yet are cancelled.  Handlers cannot stop emission with
+        C{L{stop_emission}}.  Exceptions raised by handlers are passed to
+        C{L{exception_handler}} here as well.
+
+        @rtype:   future
+        @returns: Future for the value, determined by subclass and, possibly, by its
+                  L{accumulator <AbstractAccumulator>}.
+
+        @raises TypeError: if any handler or any of C{arguments} cannot be pickled.
+        """
+
+        raise_not_implemented_exception (self)
+
 
     def _get_emission_level (self):
         """
@@ -921,20 +1087,39 @@ class Signal (AbstractSignal):
     interested in C{L{CleanSignal}}.
     """
 
-    __slots__ = ('asynchronous', '_handlers', '_blocked_handlers', '__accumulator', '__emission_level')
+    __slots__ = ('asynchronous', '_handlers', '_handler_index', '_num_disconnected',
+                 '__accumulator', '__emission_level', '__executor')
 
 
-    def __init__(self, accumulator=None, asynchronous=False):
+    def __init__(self, accumulator=None, asynchronous=False, executor=None, ordered=False):
         """
         Create a new C{Signal} with specified C{accumulator}.  By default, the signal will
         not have any accumulator, so its C{L{emit}} method will always discard handlers’s
         return values and return C{None}.
 
-        @param  accumulator: optional accumulator for signal handlers’ return values.
-        @type   accumulator: C{L{AbstractAccumulator}} or C{None}
+        If C{asynchronous} is true, C{L{emit}} only schedules emission with C{executor}
+        and returns a L{future <executor.Future>} for its result.  Emission can also be
+        made asynchronous (or not) on per-call basis, by passing C{_async} keyword
+        argument to C{emit}.  If C{executor} is C{None}, value of
+        C{L{AbstractExecutor.default <executor.AbstractExecutor>}} at emission time is
+        used.  By default, asynchronous emissions are not ordered in any way and may run
+        in parallel.  If C{ordered} is true, they are run one by one in the order of
+        C{emit} calls instead.
+
+        @param  accumulator:  optional accumulator for signal handlers’ return values.
+        @type   accumulator:  C{L{AbstractAccumulator}} or C{None}
+
+        @param  asynchronous: whether to emit the signal asynchronously by default.
+        @type   asynchronous: C{bool}
 
-        @raises TypeError:   if C{accumulator} is not C{None} and not an instance of
-                             C{AbstractAccumulator}.
+        @param  executor:     optional executor for asynchronous emission.
+        @type   executor:     any object with C{submit} method or C{None}
+
+        @param  ordered:      whether asynchronous emissions must be serialized.
+        @type   ordered:      C{bool}
+
+        @raises TypeError:    if C{accumulator} is not C{None} and not an instance of
+                              C{AbstractAccumulator}.
         """
 
         if not (accumulator is None or isinstance (accumulator, Signal.AbstractAccumulator)):
@@ -944,10 +1129,16 @@ class Signal (AbstractSignal):
 
         self.asynchronous = asynchronous
         self._handlers = None
-        self._blocked_handlers = _EMPTY_TUPLE
+        self._handler_index = None
+        self._num_disconnected = 0
         self.__accumulator = accumulator
         self.__emission_level = 0
 
+        if ordered:
+            self.__executor = SerialExecutor (executor)
+        else:
+            self.__executor = executor
+
 
     accumulator = property (lambda self: self.__accumulator,
                             doc=("""
@@ -958,13 +1149,31 @@ class Signal (AbstractSignal):
                             @type: AbstractAccumulator
                             """))
 
+    executor = property (lambda self: self.__executor,
+                         doc=("""
+                         The executor for asynchronous emissions or C{None} if the signal
+                         uses the default one.  If the signal was created with C{ordered}
+                         set, this is a C{L{SerialExecutor <executor.SerialExecutor>}}.
+                         Like accumulator, executor can only be specified at signal
+                         creation time.
+                         """))
+
+    ordered  = property (lambda self: isinstance (self.__executor, SerialExecutor),
+                         doc=("""
+                         Whether asynchronous emissions of the signal are run one by one
+                         and in order.
+
+                         @type: bool
+                         """))
+
 
     def has_handlers (self):
         if self._handlers is None:
             return False
 
-        for handler in self._handlers:
-            if handler is not None and (not isinstance (handler, WeakBinding) or handler):
+        for connection in self._handlers:
+            handler = connection.handler
+            if handler is not None and (not isinstance (handler, _WEAK_HANDLERS) or handler):
                 return True
 
         return False
@@ -973,8 +1182,9 @@ class Signal (AbstractSignal):
         num_handlers = 0
 
         if self._handlers is not None:
-            for handler in self._handlers:
-                if handler is not None and (not isinstance (handler, WeakBinding) or handler):
+            for connection in self._handlers:
+                handler = connection.handler
+                if handler is not None and (not isinstance (handler, _WEAK_HANDLERS) or handler):
                     num_handlers += 1
 
         return num_handlers
@@ -983,73 +1193,98 @@ class Signal (AbstractSignal):
     def is_connected (self, handler, *arguments, **keywords):
         if self._handlers is not None and is_callable (handler):
             if arguments or keywords:
-                handler = Binding (handler, arguments, keywords)
+                handler = _find_binding (handler, arguments, keywords)
 
-            return handler in self._handlers
+            if self._find_connections (handler):
+                return True
 
-        else:
-            return False
+        return False
 
 
     def is_blocked (self, handler, *arguments, **keywords):
-        if self._blocked_handlers is not _EMPTY_TUPLE and is_callable (handler):
+        if self._handlers is not None and is_callable (handler):
             if arguments or keywords:
-                handler = Binding (handler, arguments, keywords)
+                handler = _find_binding (handler, arguments, keywords)
 
-            return handler in self._blocked_handlers
+            for connection in self._find_connections (handler):
+                if connection.blocked > 0:
+                    return True
 
-        else:
-            return False
+        return False
 
 
-    def do_connect (self, handler):
-        if self._handlers is not None:
-            self._handlers.append (handler)
+    def _find_connections (self, handler):
+        # Return connections with handlers equal to `handler', in the order they have in
+        # `_handlers', which must not be None.
+        index = self._handler_index
+        if index is not None:
+            connections = index.find (handler)
+            if connections is not None:
+                return connections
+
+        return [connection for connection in self._handlers if connection.handler == handler]
+
+
+    # Implementation note: `_handlers' is either None or a tuple of `_Connection' objects.
+    # A single connection is stored by itself, without a tuple; it then acts as a tuple
+    # of one element, see `_Connection'.
+    # The tuple is never modified, instead it is replaced with a new one on each change.
+    # This way emission can iterate over a snapshot that cannot be spoiled by handlers
+    # connecting to the signal.  Each connection keeps its own block counter, so checking
+    # if a handler is blocked doesn't require any searching.  Blocking by handler (rather
+    # than through a `Connection') affects all equal handlers' connections.
+    #
+    # Disconnected connections get their handler set to None and counter set to
+    # `_DISCONNECTED', but stay in the tuple until collect_garbage() is called.  This
+    # happens automatically once they make up more than a half of the tuple, so that
+    # disconnecting costs constant time on average.  As a result, the tuple is None if and
+    # only if there are no connected handlers (not counting garbage-collected ones.)
+    #
+    # Connections in the tuple are sorted by descending priority and, for equal priority,
+    # by connection time.  Emission simply walks the tuple.  Position of a new connection
+    # is found with binary search, and in the common case, when all priorities are equal,
+    # it is just appended.
+    #
+    # Signals with many handlers also keep `_handler_index' (see `_HandlerIndex'), so that
+    # finding connections of a given handler doesn't require scanning the tuple.  It is
+    # None for signals with few handlers.
+
+
+    def connect_handle (self, handler, *arguments, **keywords):
+        # Note that do_connect() must return the result of the superclass' method if it
+        # is overriden.
+        priority = keywords.pop ('_priority', 0)
+        return Connection (self, self.do_connect (self._wrap_handler (handler,
+                                                                      *arguments, **keywords),
+                                                  priority))
+
+
+    def do_connect (self, handler, priority = 0):
+        connection     = _Connection (handler, priority)
+        self._handlers = _add_connection (self._handlers, connection, self._handler_index)
+
+        if self._handler_index is not None:
+            self._handler_index.add (connection)
         else:
-            self._handlers = [handler]
+            self._handler_index = _create_handler_index (self._handlers)
 
-
-    # Implementation note: we set disconnected (or garbage-collected) handlers to None,
-    # instead of removing them right away.  This is done to prevent spoiling
-    # disconnections made when emission is in effect.
+        return connection
 
 
     def disconnect (self, handler, *arguments, **keywords):
-        handlers = self._handlers
-        if handlers is None or not is_callable (handler):
+        if self._handlers is None or not is_callable (handler):
             return False
 
         if arguments or keywords:
-            handler = Binding (handler, arguments, keywords)
+            handler = _find_binding (handler, arguments, keywords)
 
         # Note: we must disconnect _last_ of equal connected handlers, in order to make
-        # connect()/disconnect() a no-op.  We use a custom loop because of that (and since
-        # reversed() only appeared in 2.4.)
-
-        index = len (handlers) - 1
-        while index >= 0:
-            if handlers[index] != handler:
-                index -= 1
-            else:
-                if self.__emission_level == 0:
-                    del handlers[index]
-                else:
-                    handlers[index] = None
-
-                if (self._blocked_handlers is not _EMPTY_TUPLE
-                    and handler not in handlers[:index]):
-                    # This is the last handler, need to make sure it is not listed in
-                    # `_blocked_handlers'.
-                    self._blocked_handlers = [_handler for _handler in self._blocked_handlers
-                                              if _handler != handler]
-
-                    if not self._blocked_handlers:
-                        self._blocked_handlers = _EMPTY_TUPLE
+        # connect()/disconnect() a no-op.
 
-                if not handlers:
-                    self._handlers = None
-
-                return True
+        connections = self._find_connections (handler)
+        if connections:
+            self._disconnect (connections[-1])
+            return True
 
         return False
 
@@ -1061,80 +1296,167 @@ class Signal (AbstractSignal):
             return False
 
         if arguments or keywords:
-            handler = Binding (handler, arguments, keywords)
+            handler = _find_binding (handler, arguments, keywords)
 
-        if self.__emission_level == 0:
-            old_length = len (self._handlers)
-            self._handlers = [_handler for _handler in self._handlers if _handler != handler]
-            any_removed = (len (self._handlers) != old_length)
+        any_removed = False
 
-            if not self._handlers:
-                self._handlers = None
+        for connection in self._find_connections (handler):
+            self._disconnect (connection)
+            any_removed = True
+
+        return any_removed
 
-        else:
-            any_removed = False
 
-            for index, _handler in enumerate (self._handlers):
-                if _handler == handler:
-                    self._handlers[index] = None
-                    any_removed = True
+    # These three methods are for `Connection' objects, which must only call them for
+    # their own signal.
 
-        if any_removed and self._blocked_handlers is not _EMPTY_TUPLE:
-            self._blocked_handlers = [_handler for _handler in self._blocked_handlers
-                                      if _handler != handler]
+    def _disconnect (self, connection):
+        if connection.blocked == _DISCONNECTED:
+            return False
 
-            if not self._blocked_handlers:
-                self._blocked_handlers = _EMPTY_TUPLE
+        if self._handler_index is not None:
+            self._handler_index.remove (connection)
 
-        return any_removed
+        # Order matters for `ThreadSafeSignal': concurrent emission must never see None
+        # handler with zero counter.
+        connection.blocked = _DISCONNECTED
+        connection.handler = None
+
+        self._num_disconnected += 1
+        if self._num_disconnected * 2 > len (self._handlers):
+            self.collect_garbage ()
+
+        return True
+
+    def _disconnect_connections (self, connections):
+        # Like `_disconnect', but for several connections at once, so that garbage is
+        # collected at most once.  Returns the number of connections that have actually
+        # been disconnected.
+        index            = self._handler_index
+        num_disconnected = 0
+
+        for connection in connections:
+            if connection.blocked != _DISCONNECTED:
+                if index is not None:
+                    index.remove (connection)
 
+                connection.blocked = _DISCONNECTED
+                connection.handler = None
 
-    # Note: we rely on the way remove() works to fulfill our blocking obligations.
+                num_disconnected += 1
+
+        if num_disconnected:
+            self._num_disconnected += num_disconnected
+            if self._num_disconnected * 2 > len (self._handlers):
+                self.collect_garbage ()
+
+        return num_disconnected
+
+    def _block (self, connection):
+        if connection.blocked == _DISCONNECTED:
+            return False
+
+        connection.blocked += 1
+        return True
+
+    def _unblock (self, connection):
+        if connection.blocked <= 0:
+            return False
+
+        connection.blocked -= 1
+        return True
 
 
     def block (self, handler, *arguments, **keywords):
         if is_callable (handler) and self._handlers is not None:
             if arguments or keywords:
-                handler = Binding (handler, arguments, keywords)
+                handler = _find_binding (handler, arguments, keywords)
 
-            if handler in self._handlers:
-                if self._blocked_handlers is not _EMPTY_TUPLE:
-                    self._blocked_handlers.append (handler)
-                else:
-                    self._blocked_handlers = [handler]
+            any_blocked = False
 
-                return True
+            for connection in self._find_connections (handler):
+                connection.blocked += 1
+                any_blocked = True
+
+            return any_blocked
 
         return False
 
 
     def unblock (self, handler, *arguments, **keywords):
-        if self._blocked_handlers is _EMPTY_TUPLE or not is_callable (handler):
+        if self._handlers is None or not is_callable (handler):
             return False
 
         if arguments or keywords:
-            handler = Binding (handler, arguments, keywords)
+            handler = _find_binding (handler, arguments, keywords)
 
-        try:
-            self._blocked_handlers.remove (handler)
+        any_unblocked = False
 
-            if not self._blocked_handlers:
-                self._blocked_handlers = _EMPTY_TUPLE
+        for connection in self._find_connections (handler):
+            if connection.blocked > 0:
+                connection.blocked -= 1
+                any_unblocked = True
 
-            return True
+        return any_unblocked
 
-        except ValueError:
-            # It is not blocked to begin with.
-            return False
 
+    # NOTE: If, for some reason, you change emit() or _emit(), don't forget to adjust
+    #       their C implementations in `notify/_signal.c' accordingly.
 
-    def emit(self, *arguments, **keywords):
-        async = keywords.pop('_async', self.asynchronous)
-        if async:
-            t = threading.Thread(target=self._emit, args=arguments, kwargs=keywords)
-            t.start()
+    def emit (self, *arguments, **keywords):
+        asynchronous = keywords.pop ('_async', self.asynchronous)
+        if asynchronous:
+            return self._emit_asynchronously (*arguments, **keywords)
         else:
-            return self._emit(*arguments, **keywords)
+            return self._emit (*arguments, **keywords)
+
+    def _emit_asynchronously (self, *arguments, **keywords):
+        executor = self.__executor
+        if executor is None:
+            executor = AbstractExecutor.default
+
+        return executor.submit (self._emit, *arguments, **keywords)
+
+
+    def emit_iter (self, *arguments, **keywords):
+        return _EmissionIterator (self, self._get_emission_handlers (arguments),
+                                  arguments, keywords)
+
+
+    def emit_in_processes (self, executor, *arguments, **keywords):
+        handlers = self._get_emission_handlers (arguments)
+        calls    = []
+
+        if handlers is not None:
+            for connection in handlers:
+                handler = connection.handler
+                if connection.blocked:
+                    continue
+
+                if not handler and isinstance (handler, _WEAK_HANDLERS):
+                    continue
+
+                calls.append ((handler, _pickle_handler (handler)))
+
+        try:
+            argument_data = pickle.dumps ((arguments, keywords), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            raise TypeError ('emission arguments cannot be sent to other processes: %s'
+                             % sys.exc_info () [1])
+
+        # Pickling is done first, so that nothing is submitted if anything fails.
+        futures = [executor.submit (_call_in_process, handler_data, argument_data)
+                   for handler, handler_data in calls]
+
+        return _ProcessEmission (self, self.__accumulator,
+                                 [handler for handler, handler_data in calls], futures).result
+
+    def _get_emission_handlers (self, arguments):
+        # Return connections that an emission with given `arguments' would call.  Pure
+        # Python emission methods below don't use this for speed, but alternative
+        # emission methods (like emit_async()) and subclasses do.
+        return self._handlers
+
 
     def _emit (self, *arguments, **keywords):
         # Speed optimization.
@@ -1150,25 +1472,22 @@ class Signal (AbstractSignal):
                 self.__emission_level = abs (saved_emission_level) + 1
                 might_have_garbage = False
 
-                for handler in handlers:
-                    # Disconnected while in emission handlers are temporary set to None.
-                    if handler is None:
-                        might_have_garbage = True
-                        continue
-
+                for connection in handlers:
                     if self.__emission_level < 0:
                         might_have_garbage = True
                         break
 
-                    # We need to refetch that blocked handlers list before processing each
-                    # handler, because it may change during emission.
-                    if handler in self._blocked_handlers:
+                    # Handlers disconnected while in emission have non-zero counter too.
+                    # Handler is read first, since disconnection in another thread first
+                    # sets the counter and only then clears the handler.
+                    handler = connection.handler
+                    if connection.blocked:
                         continue
 
                     # This somewhat illogical transposition of terms is for speed
                     # optimization.  `not handler' must be side-effect free anyway, so it
                     # doesn't matter which term is evaluated first.
-                    if not handler and isinstance (handler, WeakBinding):
+                    if not handler and isinstance (handler, _WEAK_HANDLERS):
                         # Handler will be removed in collect_garbage(), don't bother now.
                         might_have_garbage = True
                         continue
@@ -1201,6 +1520,136 @@ class Signal (AbstractSignal):
             return accumulator.post_process_value (value)
 
 
+    def emit_many (self, argument_tuples, reduce = False):
+        handlers    = self._handlers
+        accumulator = self.__accumulator
+        batch       = list (argument_tuples)
+
+        if accumulator is None:
+            values = None
+        elif reduce:
+            value  = accumulator.get_initial_value ()
+        else:
+            values = [accumulator.get_initial_value () for arguments in batch]
+
+        if handlers is not None and batch:
+            # In non-reducing mode accumulator can stop emission for some items only.
+            # `indices' then lists items that are still being emitted.
+            indices = None
+
+            try:
+                saved_emission_level = self.__emission_level
+                self.__emission_level = abs (saved_emission_level) + 1
+                might_have_garbage = False
+
+                for connection in handlers:
+                    if self.__emission_level < 0:
+                        might_have_garbage = True
+                        break
+
+                    handler = connection.handler
+                    if connection.blocked:
+                        continue
+
+                    if not handler and isinstance (handler, _WEAK_HANDLERS):
+                        might_have_garbage = True
+                        continue
+
+                    if isinstance (handler, _BatchHandler):
+                        try:
+                            handler_values = handler.handler (batch)
+                        except:
+                            AbstractSignal.exception_handler (self, sys.exc_info () [1], handler)
+                            continue
+
+                        if accumulator is None:
+                            continue
+
+                        handler_values = enumerate (handler_values)
+                    else:
+                        if accumulator is None:
+                            for arguments in batch:
+                                try:
+                                    handler (*arguments)
+                                except:
+                                    AbstractSignal.exception_handler (self, sys.exc_info () [1],
+                                                                      handler)
+
+                                if self.__emission_level < 0:
+                                    break
+
+                            continue
+
+                        handler_values = self.__call_for_each (handler, batch)
+
+                    if reduce:
+                        for index, handler_value in handler_values:
+                            value = accumulator.accumulate_value (value, handler_value)
+                            if not accumulator.should_continue (value):
+                                self.__emission_level = -self.__emission_level
+                                break
+                    else:
+                        stopped_indices = None
+
+                        for index, handler_value in handler_values:
+                            if indices is not None:
+                                index = indices[index]
+
+                            values[index] = accumulator.accumulate_value (values[index],
+                                                                          handler_value)
+                            if not accumulator.should_continue (values[index]):
+                                if stopped_indices is None:
+                                    stopped_indices = {}
+                                stopped_indices[index] = True
+
+                        if stopped_indices is not None:
+                            if indices is None:
+                                indices = range (len (batch))
+
+                            remaining = [(indices[k], batch[k]) for k in range (len (batch))
+                                         if indices[k] not in stopped_indices]
+                            indices   = [item[0] for item in remaining]
+                            batch     = [item[1] for item in remaining]
+
+                            if not batch:
+                                might_have_garbage = True
+                                break
+            finally:
+                self.__emission_level = saved_emission_level
+                if might_have_garbage and saved_emission_level == 0:
+                    self.collect_garbage ()
+
+        if accumulator is None:
+            return None
+        elif reduce:
+            return accumulator.post_process_value (value)
+        else:
+            return [accumulator.post_process_value (value) for value in values]
+
+    def __call_for_each (self, handler, batch):
+        # Generate `(index, value)' pairs for all items `handler' doesn't fail on.  Stops
+        # early if emission is stopped.
+        for index in range (len (batch)):
+            try:
+                handler_value = handler (*batch[index])
+            except:
+                AbstractSignal.exception_handler (self, sys.exc_info () [1], handler)
+            else:
+                yield index, handler_value
+
+            if self.__emission_level < 0:
+                return
+
+
+    if sys.version_info[:2] >= (3, 5):
+        from notify._3_5 import signal as _3_5
+
+        emit_async = _3_5.emit_async
+        emit_async.__module__ = __module__
+
+        del _3_5
+
+
     def _get_emission_level (self):
         return abs (self.__emission_level)
 
@@ -1220,13 +1669,12 @@ class Signal (AbstractSignal):
         # NOTE: If, for some reason, you change this, don't forget to adjust
         #       `CleanSignal.collect_garbage' accordingly.
 
-        # Don't remove disconnected or garbage-collected handlers if in nested emission,
-        # it will spoil emit() calls completely.
-        if self._handlers is not None and self.__emission_level == 0:
-            self._handlers = ([handler for handler in self._handlers
-                               if handler is not None and (not isinstance (handler, WeakBinding)
-                                                           or handler)]
-                              or None)
+        # Since handler tuples are never modified, this is safe even during emission.
+        if self._handlers is not None:
+            self._handlers = _remove_garbage (self._handlers)
+            self._handler_index = _create_handler_index (self._handlers)
+
+        self._num_disconnected = 0
 
 
     def _additional_description (self, formatter):
@@ -1253,16 +1701,39 @@ class CleanSignal (Signal):
     least one handler.
 
     Also, unlike plain C{Signal}, C{CleanSignal} allows to weakly reference itself.
+
+    Clean signals share a registry of method handler connections, indexed by handler
+    object.  When an object is garbage-collected, all its handlers are disconnected from
+    every clean signal at once.  The same can be done for a live object with
+    C{L{disconnect_object}}, e.g. when it is torn down.  Either way, this takes time
+    proportional to the number of the object’s connections: like with C{L{disconnect}},
+    handler list is only compacted once at least half of it has been disconnected.
+
+    With I{deferred sweeping} a garbage-collected handler only marks the signal as
+    having garbage.  The handler list is then compacted once, either at the next
+    emission or when C{L{collect_garbage}} or C{L{collect_deferred_garbage}} is called,
+    e.g. at some idle point of the program.  Until then, the signal keeps protecting its
+    parent, even if all its handlers are garbage.
+
+    @cvar default_deferred_sweep:
+    Whether signals created without explicit C{deferred_sweep} argument use deferred
+    sweeping.  This lets you turn it on for signals created by other code, e.g. those of
+    L{variables <variable>}.
     """
 
-    __slots__ = ('__parent', '__weakref__')
+    __slots__ = ('__parent', '__deferred_sweep', '__num_sweeps', '__num_swept_handlers',
+                 '__weakref__')
 
+    default_deferred_sweep = False
 
-    def __init__(self, parent=None, accumulator=None):
+
+    def __init__(self, parent=None, accumulator=None, deferred_sweep=None):
         """
         Create a new C{CleanSignal} with specified C{parent} and C{accumulator}.  If
         C{parent} is not C{None}, it will be protected from garbage collection while the
-        signal has at least one handler (initially it doesn’t.)
+        signal has at least one handler (initially it doesn’t.)  If C{deferred_sweep}
+        is C{None}, value of C{L{default_deferred_sweep}} at the time of handler garbage
+        collection is used.
 
         @raises TypeError: if C{accumulator} is not C{None} and not an instance of
                            C{L{AbstractAccumulator}}.
@@ -1275,9 +1746,45 @@ class CleanSignal (Signal):
         else:
             self.__parent = _NONE_REFERENCE
 
+        self.__deferred_sweep     = deferred_sweep
+        self.__num_sweeps         = 0
+        self.__num_swept_handlers = 0
+
 
     parent = property (lambda self: self.__parent ())
 
+    def __get_deferred_sweep (self):
+        if self.__deferred_sweep is None:
+            return CleanSignal.default_deferred_sweep
+        else:
+            return self.__deferred_sweep
+
+    deferred_sweep = property (__get_deferred_sweep,
+                               doc = ("""
+                               Whether the signal uses deferred sweeping of garbage.
+
+                               @type: bool
+                               """))
+
+    num_sweeps = property (lambda self: self.__num_sweeps,
+                           doc = ("""
+                           The number of times garbage has been removed from the handler
+                           list.
+
+                           @type: int
+                           """))
+
+    num_swept_handlers = property (lambda self: self.__num_swept_handlers,
+                                   doc = ("""
+                                   The total number of connections removed from the
+                                   handler list as garbage.  This includes handlers of
+                                   garbage-collected objects and disconnected handlers
+                                   still kept in the list, e.g. because of emission in
+                                   progress.
+
+                                   @type: int
+                                   """))
+
 
     def orphan (self):
         """
@@ -1295,67 +1802,110 @@ class CleanSignal (Signal):
             AbstractGCProtector.default.unprotect (self)
 
 
-    def do_connect (self, handler):
+    def do_connect (self, handler, priority = 0):
         parent = self.__parent ()
         if self._handlers is None and parent is not None:
             AbstractGCProtector.default.protect (self)
 
-        super (CleanSignal, self).do_connect (handler)
+        connection = super (CleanSignal, self).do_connect (handler, priority)
+        _register_object_connection (self, connection)
 
+        return connection
 
-    def disconnect (self, handler, *arguments, **keywords):
-        if super (CleanSignal, self).disconnect (handler, *arguments, **keywords):
-            parent = self.__parent ()
-            if (self._get_emission_level () == 0
-                and self._handlers is None
-                and parent is not None):
-                AbstractGCProtector.default.unprotect (self)
-
-            return True
 
-        else:
-            return False
+    # Garbage-collected handlers are detected through the registry of object connections,
+    # so bindings don't need callbacks of their own and can be shared.
 
-    def disconnect_all (self, handler, *arguments, **keywords):
-        if super (CleanSignal, self).disconnect_all (handler, *arguments, **keywords):
-            parent = self.__parent ()
-            if (self._get_emission_level () == 0
-                and self._handlers is None
-                and parent is not None):
-                AbstractGCProtector.default.unprotect (self)
+    def _wrap_handler (self, handler, *arguments, **keywords):
+        return WeakBinding.wrap (handler, arguments, None, keywords)
 
-            return True
 
+    def _sweep_object_connections (self, connections, garbage_collected):
+        # Called by `_ObjectConnections' with all connections of one object to this signal.
+        # Note that when the object has been garbage-collected, its bindings might not yet
+        # know about that, since weak reference callbacks are called in no particular
+        # order.  This doesn't matter for deferred sweeping, which happens later.
+        if garbage_collected and self.__get_deferred_sweep ():
+            _signals_with_garbage[self] = True
         else:
-            return False
+            self._disconnect_connections (connections)
 
 
-    def _wrap_handler (self, handler, *arguments, **keywords):
-        return WeakBinding.wrap (handler,
-                                 arguments,
-                                 self.__handler_garbage_collected,
-                                 keywords)
+    def collect_garbage (self):
+        handlers = self._handlers
 
-    def __handler_garbage_collected (self, object):
-        self.collect_garbage ()
+        if handlers is not None:
+            self._handlers = _remove_garbage (handlers)
+            self._handler_index = _create_handler_index (self._handlers)
 
+            if self._handlers is None:
+                num_swept = len (handlers)
 
-    def collect_garbage (self):
-        if self._handlers is not None and self._get_emission_level () == 0:
-            # NOTE: This is essentially inlined method of the superclass.  While calling
-            #       that method would be more proper, inlining it gives significant speed
-            #       improvement.  Since it makes no difference for derivatives, we
-            #       sacrifice "do what is right" principle in this case.
-
-            self._handlers = [handler for handler in self._handlers
-                              if handler is not None and (not isinstance (handler, WeakBinding)
-                                                          or handler)]
-
-            if not self._handlers:
-                self._handlers = None
                 parent = self.__parent ()
                 if parent is not None:
                     AbstractGCProtector.default.unprotect (self)
+            else:
+                num_swept = len (handlers) - len (self._handlers)
+
+            if num_swept:
+                self.__num_sweeps         += 1
+                self.__num_swept_handlers += num_swept
+
+        self._num_disconnected = 0
+        _signals_with_garbage.pop (self, None)
+
+
+    def collect_deferred_garbage ():
+        """
+        Collect garbage in all signals that use deferred sweeping and have had a handler
+        garbage-collected since their last sweep.  Call this at idle points of your
+        program (e.g. once a request is handled) so that signals that are not emitted
+        often don’t keep garbage for long.
+
+        @rtype:   C{int}
+        @returns: Number of connections removed from all signals.
+        """
+
+        num_swept = 0
+
+        for signal in list (_signals_with_garbage.keys ()):
+            num_swept_before = signal.__num_swept_handlers
+            signal.collect_garbage ()
+            num_swept += signal.__num_swept_handlers - num_swept_before
+
+        return num_swept
+
+    collect_deferred_garbage = staticmethod (collect_deferred_garbage)
+
+
+    def disconnect_object (object):
+        """
+        Disconnect all handlers that are methods of C{object} (possibly with additional
+        arguments) from all clean signals.  Each affected signal collects its garbage
+        once, so this is much faster than disconnecting handlers one by one when there
+        are many of them.  Other handlers connected to the same signals are not affected,
+        even if they reference C{object} in some other way.
+
+        @rtype:   C{int}
+        @returns: Number of disconnected handlers.
+        """
+
+        key = id (object)
+
+        _object_connections_lock.acquire ()
+        try:
+            record = _object_connections.get (key)
+            if record is None or record () is not object:
+                return 0
+
+            del _object_connections[key]
+            connections = record.detach ()
+        finally:
+            _object_connections_lock.release ()
+
+        return _sweep_connections (connections, False)
+
+    disconnect_object = staticmethod (disconnect_object)
 
 
     def _additional_description (self, formatter):
@@ -1370,12 +1920,1871 @@ class CleanSignal (Signal):
 
 _NONE_REFERENCE = DummyReference (None)
 
+# Signals that use deferred sweeping and have had a handler garbage-collected since the
+# last sweep.  Values are meaningless.
+_signals_with_garbage = weakref.WeakKeyDictionary ()
+
+
+# Implementation note: `_object_connections' maps ids of objects to records of their
+# connections to clean signals.  Like the tables in `notify.named', it is indexed by ids,
+# so that objects need not be hashable, and records are weak references to the objects,
+# telling them from new ones with the same id.  Records reference signals weakly too.
+# Connections that have been disconnected in some other way, as well as connections to
+# garbage-collected signals, are dropped from records lazily, each time a record doubles
+# in size.
+#
+# The registry and the records are shared by all threads, so they are only accessed with
+# `_object_connections_lock' held.  Thread-safe signals register connections with their
+# own lock held, so signals are never called back with the registry lock held: sweeping
+# first detaches connections from a record and only then passes them to signals.  The
+# lock is reentrant, because garbage collection, and so weak reference callbacks, can
+# happen in any thread at any allocation, including while the lock is held.
+
+_object_connections      = {}
+_object_connections_lock = threading.RLock ()
+
+
+def _register_object_connection (signal, connection):
+    handler = connection.handler
+    if isinstance (handler, _BatchHandler):
+        handler = handler.handler
+
+    if not isinstance (handler, WeakBinding):
+        return
+
+    object = handler._get_object ()
+    if object is None:
+        return
+
+    key = id (object)
+
+    _object_connections_lock.acquire ()
+    try:
+        record = _object_connections.get (key)
+
+        if record is None or record () is not object:
+            record                   = _ObjectConnections (object, key)
+            _object_connections[key] = record
+
+        record.add (signal, connection)
+    finally:
+        _object_connections_lock.release ()
+
 
+class _ObjectConnections (weakref.ref):
+
+    """
+    Internal record of connections of one object’s methods to clean signals.  The record
+    is itself a weak reference to the object, like C{weakref.KeyedRef}, so that it costs
+    as little memory as possible.  Once the object is garbage-collected, the record
+    removes itself from C{_object_connections} and sweeps all the signals.
+    """
+
+    __slots__ = ('key', '__connections', '__num_live_connections')
+
+
+    def __new__(cls, object, key):
+        return weakref.ref.__new__(cls, object, _sweep_object_connections)
+
+    def __init__(self, object, key):
+        super (_ObjectConnections, self).__init__(object, _sweep_object_connections)
+
+        self.key                    = key
+        self.__connections          = []
+        self.__num_live_connections = 0
+
+
+    def add (self, signal, connection):
+        self.__connections.append ((weakref.ref (signal), connection))
+
+        if len (self.__connections) >= 2 * max (self.__num_live_connections, 8):
+            self.__connections = [(signal_reference, connection)
+                                  for signal_reference, connection in self.__connections
+                                  if (connection.blocked != _DISCONNECTED
+                                      and signal_reference () is not None)]
+            self.__num_live_connections = len (self.__connections)
+
+
+    def detach (self):
+        connections = self.__connections
+
+        self.__connections          = []
+        self.__num_live_connections = 0
+
+        return connections
+
+
+def _sweep_connections (connections, garbage_collected):
+    # Group connections by signal, preserving the order in which signals have been
+    # connected to, and let each signal get rid of them at once.
+    signals               = []
+    connections_by_signal = {}
+
+    for signal_reference, connection in connections:
+        signal = signal_reference ()
+        if signal is None or connection.blocked == _DISCONNECTED:
+            continue
+
+        signal_connections = connections_by_signal.get (id (signal))
+        if signal_connections is None:
+            signals.append (signal)
+            signal_connections = connections_by_signal[id (signal)] = []
+
+        signal_connections.append (connection)
+
+    num_swept = 0
+    for signal in signals:
+        signal_connections = connections_by_signal[id (signal)]
+        signal._sweep_object_connections (signal_connections, garbage_collected)
+        num_swept += len (signal_connections)
+
+    return num_swept
+
+
+def _sweep_object_connections (record):
+    _object_connections_lock.acquire ()
+    try:
+        if _object_connections.get (record.key) is not record:
+            return
+
+        del _object_connections[record.key]
+        connections = record.detach ()
+    finally:
+        _object_connections_lock.release ()
+
+    _sweep_connections (connections, True)
+
+
+
+#-- Thread-safe signal classes ---------------------------------------
+
+# Implementation note: handler tuples are never modified in place, so emission works on
+# a snapshot taken by reading `_handlers' once and needs no locking.  Only operations
+# that replace the tuple or change connection records take `_lock'.  Emission level is
+# kept per thread in `_emission_levels', keyed by thread identifier; threads that are not
+# emitting have no entry.  Property below shadows `Signal' slot for the level, so all
+# inherited pure Python code transparently works with the current thread's level.  C
+# emission methods access the slot directly, therefore the classes always use Python
+# emission.
+
+class _ThreadSafeSignalMixin (object):
+
+    __slots__ = ()
+
+
+    def __get_emission_level (self):
+        return self._emission_levels.get (_get_thread_id (), 0)
+
+    def __set_emission_level (self, level):
+        if level != 0:
+            self._emission_levels[_get_thread_id ()] = level
+        else:
+            self._emission_levels.pop (_get_thread_id (), None)
+
+    _Signal__emission_level = property (__get_emission_level, __set_emission_level)
+
+
+    emit  = Signal.__dict__['emit']
+    _emit = Signal.__dict__['_emit']
+
+
+    def do_connect (self, handler, priority = 0):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).do_connect (handler, priority)
+        finally:
+            self._lock.release ()
+
+    def connect_safe (self, handler, *arguments, **keywords):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).connect_safe (handler,
+                                                                      *arguments, **keywords)
+        finally:
+            self._lock.release ()
+
+    def do_connect_safe (self, handler, priority = 0):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).do_connect_safe (handler, priority)
+        finally:
+            self._lock.release ()
+
+
+    def is_connected (self, handler, *arguments, **keywords):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).is_connected (handler,
+                                                                      *arguments, **keywords)
+        finally:
+            self._lock.release ()
+
+
+    def disconnect (self, handler, *arguments, **keywords):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).disconnect (handler,
+                                                                    *arguments, **keywords)
+        finally:
+            self._lock.release ()
+
+    def disconnect_all (self, handler, *arguments, **keywords):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).disconnect_all (handler,
+                                                                        *arguments,
+                                                                        **keywords)
+        finally:
+            self._lock.release ()
+
+
+    def block (self, handler, *arguments, **keywords):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).block (handler, *arguments, **keywords)
+        finally:
+            self._lock.release ()
+
+    def unblock (self, handler, *arguments, **keywords):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self).unblock (handler,
+                                                                 *arguments, **keywords)
+        finally:
+            self._lock.release ()
+
+
+    def _disconnect (self, connection):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self)._disconnect (connection)
+        finally:
+            self._lock.release ()
+
+    def _disconnect_connections (self, connections):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self)._disconnect_connections (connections)
+        finally:
+            self._lock.release ()
+
+    def _block (self, connection):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self)._block (connection)
+        finally:
+            self._lock.release ()
+
+    def _unblock (self, connection):
+        self._lock.acquire ()
+        try:
+            return super (_ThreadSafeSignalMixin, self)._unblock (connection)
+        finally:
+            self._lock.release ()
+
+
+    def collect_garbage (self):
+        self._lock.acquire ()
+        try:
+            super (_ThreadSafeSignalMixin, self).collect_garbage ()
+        finally:
+            self._lock.release ()
+
+
+
+class ThreadSafeSignal (_ThreadSafeSignalMixin, Signal):
+
+    """
+    Subclass of C{L{Signal}} that can be emitted, connected to and disconnected from in
+    several threads at once.  Emission doesn’t lock anything: it iterates over a snapshot
+    of handler list, so handlers connected from another thread during an emission are
+    only called in the next one, while disconnected or blocked handlers might still be
+    called by emissions already in progress.  Emission level, and therefore
+    C{L{stop_emission}}, is tracked separately for each thread.
+
+    Operations that change handler list or blocking state are serialized with a
+    reentrant lock.  Handlers are always called without holding it, so they are free to
+    connect or disconnect handlers of the same signal.
+
+    Thread-safe signals always use pure Python emission, so they are slower than plain
+    C{Signal} instances if C implementation is L{available <HAVE_FAST_EMISSION>}.  Unlike
+    plain C{Signal}, they allow to weakly reference themselves.
+    """
+
+    __slots__ = ('_lock', '_emission_levels', '__weakref__')
+
+
+    def __init__(self, accumulator=None, asynchronous=False, executor=None, ordered=False):
+        """
+        Create a new C{ThreadSafeSignal}.  Arguments have the same meaning as for
+        C{L{Signal}}.
+        """
+
+        self._lock            = threading.RLock ()
+        self._emission_levels = {}
+
+        super (ThreadSafeSignal, self).__init__(accumulator, asynchronous, executor, ordered)
+
+
+
+class ThreadSafeCleanSignal (_ThreadSafeSignalMixin, CleanSignal):
+
+    """
+    Thread-safe variant of C{L{CleanSignal}}.  It has the same emission and locking
+    semantics as C{L{ThreadSafeSignal}}.
+    """
+
+    __slots__ = ('_lock', '_emission_levels')
+
+
+    def __init__(self, parent=None, accumulator=None, deferred_sweep=None):
+        """
+        Create a new C{ThreadSafeCleanSignal}.  Arguments have the same meaning as for
+        C{L{CleanSignal}}.
+        """
+
+        self._lock            = threading.RLock ()
+        self._emission_levels = {}
+
+        super (ThreadSafeCleanSignal, self).__init__(parent, accumulator, deferred_sweep)
+
+
+
+#-- Keyed signal class -----------------------------------------------
+
+# Implementation note: `__keyed_handlers' maps keys to tuples of `_KeyedConnection'
+# objects.  These tuples are managed like `_handlers': sorted by priority, never modified,
+# only replaced.  Unlike with `_handlers', disconnected connections are removed from their
+# key's tuple at once, since per-key tuples are normally short.  Keys without handlers
+# are removed from the dictionary.  `_handlers' holds wildcard connections, as in
+# `Signal'.
+
+class KeyedSignal (Signal):
+
+    """
+    Signal that dispatches emissions by a key, which is the first emission argument.
+    Handlers connected with C{L{connect_key}} are only called when the signal is emitted
+    with their key, while handlers connected with C{L{connect}} and similar methods
+    (I{wildcard} handlers) are called for any key.  Keyed handlers are found with a
+    dictionary lookup, so emission cost doesn’t depend on the number of handlers of other
+    keys.  All handlers receive all emission arguments, including the key.
+
+    Keyed and wildcard handlers are called in the order of their L{priority
+    <AbstractSignal.connect>}; with equal priority, keyed handlers come first.  Values of
+    both kinds of handlers are accumulated together, as usual.  Emissions without
+    arguments or with an unhashable first argument only call wildcard handlers.
+
+    Methods of C{L{AbstractSignal}} interface, like C{L{disconnect}} or C{L{block}},
+    operate on wildcard handlers only; use their C{_key} counterparts for keyed ones.
+    Keyed handlers can also be managed through L{handles <Connection>}.  However,
+    C{L{has_handlers}} and C{L{count_handlers}} take all handlers into account.
+
+    Keyed signals always use pure Python emission.
+
+    @group Keyed Handlers:
+    connect_key, connect_key_handle, do_connect_key, disconnect_key, block_key,
+    unblock_key, is_connected_key, count_key_handlers, get_keys
+    """
+
+    __slots__ = ('__keyed_handlers',)
+
+
+    def __init__(self, accumulator=None, asynchronous=False, executor=None, ordered=False):
+        """
+        Create a new C{KeyedSignal}.  Arguments have the same meaning as for
+        C{L{Signal}}.
+        """
+
+        super (KeyedSignal, self).__init__(accumulator, asynchronous, executor, ordered)
+        self.__keyed_handlers = {}
+
+
+    def has_handlers (self):
+        if super (KeyedSignal, self).has_handlers ():
+            return True
+
+        for key in self.__keyed_handlers:
+            if self.count_key_handlers (key):
+                return True
+
+        return False
+
+    def count_handlers (self):
+        num_handlers = super (KeyedSignal, self).count_handlers ()
+
+        for key in self.__keyed_handlers:
+            num_handlers += self.count_key_handlers (key)
+
+        return num_handlers
+
+
+    def count_key_handlers (self, key):
+        """
+        Return the number of handlers connected for C{key}, not counting wildcard ones.
+
+        @rtype: C{int}
+        """
+
+        handlers     = self.__keyed_handlers.get (key)
+        num_handlers = 0
+
+        if handlers is not None:
+            for connection in handlers:
+                handler = connection.handler
+                if handler is not None and (not isinstance (handler, _WEAK_HANDLERS) or handler):
+                    num_handlers += 1
+
+        return num_handlers
+
+    def get_keys (self):
+        """
+        Return all keys that have handlers, in no particular order.  Keys whose handlers
+        have all been garbage-collected may be listed until C{L{collect_garbage}} is
+        called.
+
+        @rtype: C{list}
+        """
+
+        return list (self.__keyed_handlers.keys ())
+
+
+    def is_connected_key (self, key, handler, *arguments, **keywords):
+        """
+        Determine if C{handler} with C{arguments} is connected to the signal for C{key}.
+        Wildcard handlers are not considered.
+
+        @rtype: C{bool}
+        """
+
+        handlers = self.__keyed_handlers.get (key)
+
+        if handlers is not None and is_callable (handler):
+            if arguments or keywords:
+                handler = _find_binding (handler, arguments, keywords)
+
+            for connection in handlers:
+                if connection.handler == handler:
+                    return True
+
+        return False
+
+
+    def connect_key (self, key, handler, *arguments, **keywords):
+        """
+        Connect C{handler} with C{arguments} to the signal, so that it is only called
+        when the signal is emitted with C{key} as the first argument.  Otherwise, this is
+        the same as C{L{connect}}, including C{_priority} keyword argument.
+        """
+
+        priority = keywords.pop ('_priority', 0)
+        self.do_connect_key (key, self._wrap_handler (handler, *arguments, **keywords),
+                             priority)
+
+    def connect_key_handle (self, key, handler, *arguments, **keywords):
+        """
+        Same as C{L{connect_key}}, but return a C{L{Connection}} object for the new
+        connection.
+
+        @rtype: C{L{Connection}}
+        """
+
+        priority = keywords.pop ('_priority', 0)
+        return Connection (self, self.do_connect_key (key,
+                                                      self._wrap_handler (handler,
+                                                                          *arguments,
+                                                                          **keywords),
+                                                      priority))
+
+    def do_connect_key (self, key, handler, priority = 0):
+        """
+        Connect C{handler} for C{key} without any further modifications.  This is the
+        keyed counterpart of C{L{do_connect}}.
+        """
+
+        connection                 = _KeyedConnection (handler, priority, key)
+        self.__keyed_handlers[key] = _add_connection (self.__keyed_handlers.get (key),
+                                                      connection)
+
+        return connection
+
+
+    def disconnect_key (self, key, handler, *arguments, **keywords):
+        """
+        Disconnect C{handler} with C{arguments}, connected for C{key}.  If it is
+        connected several times, only the last connection is cancelled.
+
+        @rtype:   C{bool}
+        @returns: Whether C{handler} has been disconnected.
+        """
+
+        handlers = self.__keyed_handlers.get (key)
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = _find_binding (handler, arguments, keywords)
+
+        index = len (handlers) - 1
+        while index >= 0:
+            connection = handlers[index]
+            if connection.handler != handler:
+                index -= 1
+            else:
+                return self._disconnect (connection)
+
+        return False
+
+
+    def block_key (self, key, handler, *arguments, **keywords):
+        """
+        Block C{handler} with C{arguments}, connected for C{key}.  This is the keyed
+        counterpart of C{L{block}}.
+
+        @rtype:   C{bool}
+        @returns: Whether C{handler} is connected for C{key}.
+        """
+
+        handlers = self.__keyed_handlers.get (key)
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = _find_binding (handler, arguments, keywords)
+
+        any_blocked = False
+
+        for connection in handlers:
+            if connection.handler == handler:
+                connection.blocked += 1
+                any_blocked = True
+
+        return any_blocked
+
+    def unblock_key (self, key, handler, *arguments, **keywords):
+        """
+        Unblock C{handler} with C{arguments}, connected for C{key}.  This is the keyed
+        counterpart of C{L{unblock}}.
+
+        @rtype:   C{bool}
+        @returns: Whether C{handler} is connected for C{key} and has been blocked.
+        """
+
+        handlers = self.__keyed_handlers.get (key)
+        if handlers is None or not is_callable (handler):
+            return False
+
+        if arguments or keywords:
+            handler = _find_binding (handler, arguments, keywords)
+
+        any_unblocked = False
+
+        for connection in handlers:
+            if connection.blocked > 0 and connection.handler == handler:
+                connection.blocked -= 1
+                any_unblocked = True
+
+        return any_unblocked
+
+
+    def _disconnect (self, connection):
+        if not isinstance (connection, _KeyedConnection):
+            return super (KeyedSignal, self)._disconnect (connection)
+
+        if connection.blocked == _DISCONNECTED:
+            return False
+
+        connection.blocked = _DISCONNECTED
+        connection.handler = None
+
+        self.__collect_key_garbage (connection.key)
+        return True
+
+
+    def _get_emission_handlers (self, arguments):
+        handlers = self._handlers
+
+        if arguments:
+            try:
+                keyed_handlers = self.__keyed_handlers.get (arguments[0])
+            except TypeError:
+                # Unhashable first argument.
+                return handlers
+
+            if keyed_handlers is not None:
+                if handlers is None:
+                    return keyed_handlers
+                else:
+                    return _merge_connections (keyed_handlers, handlers)
+
+        return handlers
+
+
+    def _emit (self, *arguments, **keywords):
+        accumulator = self.accumulator
+
+        if accumulator is None:
+            self.__emit (arguments, keywords, None, None)
+            return None
+        else:
+            value = self.__emit (arguments, keywords,
+                                 accumulator, accumulator.get_initial_value ()) [0]
+            return accumulator.post_process_value (value)
+
+
+    def emit_many (self, argument_tuples, reduce = False):
+        # Items may have different keys, so there is no common handler list to walk.
+        # Batch handlers are therefore called once per item.
+        accumulator = self.accumulator
+
+        if accumulator is None:
+            for arguments in argument_tuples:
+                self.__emit (tuple (arguments), {}, None, None)
+
+            return None
+
+        elif reduce:
+            value = accumulator.get_initial_value ()
+
+            for arguments in argument_tuples:
+                value, stopped = self.__emit (tuple (arguments), {}, accumulator, value)
+                if stopped:
+                    break
+
+            return accumulator.post_process_value (value)
+
+        else:
+            return [self._emit (*arguments) for arguments in argument_tuples]
+
+
+    # NOTE: This must behave like `Signal._emit', except for the way handlers are found.
+    #       Returns accumulated value and whether the accumulator stopped emission.
+
+    def __emit (self, arguments, keywords, accumulator, value):
+        handlers = self._get_emission_handlers (arguments)
+        stopped  = False
+
+        if handlers is not None:
+            try:
+                saved_emission_level = self._Signal__emission_level
+                self._Signal__emission_level = abs (saved_emission_level) + 1
+                might_have_garbage = False
+
+                for connection in handlers:
+                    if self._Signal__emission_level < 0:
+                        might_have_garbage = True
+                        break
+
+                    handler = connection.handler
+                    if connection.blocked:
+                        continue
+
+                    if not handler and isinstance (handler, _WEAK_HANDLERS):
+                        might_have_garbage = True
+                        continue
+
+                    try:
+                        handler_value = handler (*arguments, **keywords)
+                    except:
+                        AbstractSignal.exception_handler (self, sys.exc_info () [1], handler)
+                        continue
+
+                    if accumulator is not None:
+                        value = accumulator.accumulate_value (value, handler_value)
+                        if not accumulator.should_continue (value):
+                            might_have_garbage = True
+                            stopped            = True
+                            break
+            finally:
+                self._Signal__emission_level = saved_emission_level
+
+                if might_have_garbage and saved_emission_level == 0:
+                    # Collect garbage of wildcard handlers and this key's handlers, not
+                    # of all keys.
+                    super (KeyedSignal, self).collect_garbage ()
+
+                    try:
+                        self.__collect_key_garbage (arguments[0])
+                    except (IndexError, TypeError):
+                        pass
+
+        return value, stopped
+
+
+    def collect_garbage (self):
+        super (KeyedSignal, self).collect_garbage ()
+
+        for key in list (self.__keyed_handlers.keys ()):
+            self.__collect_key_garbage (key)
+
+    def __collect_key_garbage (self, key):
+        handlers = self.__keyed_handlers.get (key)
+
+        if handlers is not None:
+            handlers = _remove_garbage (handlers)
+
+            if handlers is not None:
+                self.__keyed_handlers[key] = handlers
+            else:
+                del self.__keyed_handlers[key]
+
+
+    def _additional_description (self, formatter):
+        if self.__keyed_handlers:
+            descriptions = ['keys: %d' % len (self.__keyed_handlers)]
+        else:
+            descriptions = []
+
+        return descriptions + super (KeyedSignal, self)._additional_description (formatter)
+
+
+
+#-- Queued signal class ----------------------------------------------
+
+# Implementation note: `__queue' is None when the signal is not being emitted.  The
+# outermost emission sets it to an empty tuple and replaces that with a list when the
+# first re-entrant emission is queued.  The list is consumed by index rather than popped,
+# so that draining a long queue stays linear.
+
+class QueuedSignal (Signal):
+
+    """
+    Signal that doesn’t recurse when emitted from its own handlers.  With a plain
+    C{L{Signal}}, a handler that emits the same signal again starts a nested emission,
+    which calls all handlers before the outer emission continues.  A long chain of such
+    re-entrant emissions can exhaust the stack, and handlers see emissions interleaved in
+    an order that is hard to predict.
+
+    C{QueuedSignal} instead queues emissions made while the signal is being emitted.  The
+    outermost C{L{emit}} call delivers them, in first in, first out order, once its own
+    emission is finished, including emissions queued by handlers of queued emissions.
+    This way the stack stays flat and every handler finishes processing one emission
+    before it is called for the next.
+
+    Some consequences of queuing:
+
+      - A queued C{emit} call returns C{None} immediately, regardless of the
+        L{accumulator <accumulator>}: its handlers have not been called yet.  The
+        outermost call returns the value of its own emission only.
+
+      - Handlers of an outermost C{emit} call and of emissions it delivers from the
+        queue always see L{emission level <emission_level>} 1.
+
+      - C{L{stop_emission}} only stops the emission in progress; queued emissions are
+        still delivered.  Use C{L{discard_queued_emissions}} to drop them as well.
+
+      - If a handler raises an exception that propagates out of the emission, all
+        queued emissions are discarded and the exception propagates out of the outermost
+        C{emit} call.
+
+    Only C{emit} (and calling the signal) is queued.  Other emission methods, like
+    C{L{emit_many}} or C{L{emit_iter}}, behave as with C{L{Signal}}: their emissions
+    are never queued, and an C{emit} call from their handlers becomes an outermost one.
+    Like C{Signal}, this class is not thread-safe; in particular, the queue is shared by
+    all threads.
+
+    Queued signals always use pure Python emission.
+    """
+
+    __slots__ = ('__queue',)
+
+
+    def __init__(self, accumulator=None, asynchronous=False, executor=None, ordered=False):
+        """
+        Create a new C{QueuedSignal}.  Arguments have the same meaning as for
+        C{L{Signal}}.
+        """
+
+        super (QueuedSignal, self).__init__(accumulator, asynchronous, executor, ordered)
+        self.__queue = None
+
+
+    def count_queued_emissions (self):
+        """
+        Count emissions that are queued, but not delivered yet.  This is always 0 unless
+        the signal is being emitted.
+
+        @rtype: C{int}
+        """
+
+        queue = self.__queue
+        if queue:
+            return len (queue) - queue.count (None)
+        else:
+            return 0
+
+    def discard_queued_emissions (self):
+        """
+        Drop all emissions that are queued, but not delivered yet.  Emission in progress,
+        if any, is not affected; use C{L{stop_emission}} for that.
+
+        @rtype:   C{bool}
+        @returns: Whether there were any queued emissions.
+        """
+
+        queue = self.__queue
+        if queue:
+            any_queued = False
+
+            for index in range (0, len (queue)):
+                if queue[index] is not None:
+                    queue[index] = None
+                    any_queued   = True
+
+            return any_queued
+        else:
+            return False
+
+
+    def _emit (self, *arguments, **keywords):
+        queue = self.__queue
+
+        if queue is not None:
+            if not queue:
+                queue = self.__queue = []
+
+            queue.append ((arguments, keywords))
+            return None
+
+        self.__queue = ()
+
+        try:
+            value = super (QueuedSignal, self)._emit (*arguments, **keywords)
+
+            index = 0
+            while index < len (self.__queue):
+                queue = self.__queue
+
+                if queue[index] is not None:
+                    arguments, keywords = queue[index]
+                    queue[index]        = None
+                    super (QueuedSignal, self)._emit (*arguments, **keywords)
+
+                index += 1
+        finally:
+            self.__queue = None
+
+        return value
+
+
+    def _additional_description (self, formatter):
+        num_queued = self.count_queued_emissions ()
+        if num_queued:
+            descriptions = ['queued emissions: %d' % num_queued]
+        else:
+            descriptions = []
+
+        return descriptions + super (QueuedSignal, self)._additional_description (formatter)
+
+
+
+#-- Rate-limiting signal classes -------------------------------------
+
+# Implementation note: `_pending' is either None or an `(arguments, keywords)' tuple of
+# the coalesced emission not delivered yet.  `_call' is the scheduled call object or
+# None.  Both are only accessed with `_lock' held, since scheduled calls may come from a
+# different thread.  Handlers are always invoked without holding the lock.
+#
+# A call can start running just before `emit' cancels it and schedules another one.
+# Therefore, scheduled functions receive a one-element list with their own call object
+# and do nothing if it is no longer `_call'.  The list is filled before the lock is
+# released, so a scheduled function (which takes the lock first) always sees the call.
+
+class _CoalescingSignal (Signal):
+
+    """
+    Common base of C{L{DebouncedSignal}} and C{L{ThrottledSignal}}.  Calls to C{L{emit}}
+    only record arguments; handlers are invoked later, from a L{scheduled <scheduler>}
+    call, with the arguments of the latest emission or with those combined by C{merge}
+    function.
+    """
+
+    __slots__ = ('_lock', '_pending', '_call', '__delay', '__scheduler', '__merge',
+                 '__weakref__')
+
+
+    def __init__(self, delay, scheduler = None, merge = None, source = None):
+        if not delay >= 0:
+            raise ValueError ("'delay' must be a non-negative number")
+        if merge is not None and not is_callable (merge):
+            raise TypeError ("'merge' must be callable or None")
+
+        super (_CoalescingSignal, self).__init__()
+
+        self.__delay     = delay
+        self.__scheduler = scheduler
+        self.__merge     = merge
+        self._lock       = threading.Lock ()
+        self._pending    = None
+        self._call       = None
+
+        if source is not None:
+            source.connect (self.emit)
+
+
+    delay     = property (lambda self: self.__delay)
+    scheduler = property (lambda self: self.__scheduler,
+                          doc = ("""
+                          The scheduler for delivering emissions or C{None} if the signal
+                          uses the default one.
+                          """))
+
+
+    def has_pending_emission (self):
+        """
+        Determine if there is an emission recorded, but not delivered yet.
+
+        @rtype: C{bool}
+        """
+
+        return self._pending is not None
+
+
+    def flush (self):
+        """
+        Deliver pending emission, if any, right away.
+
+        @rtype:   C{bool}
+        @returns: C{True} if there was a pending emission.
+        """
+
+        self._lock.acquire ()
+        try:
+            pending       = self._pending
+            self._pending = None
+        finally:
+            self._lock.release ()
+
+        if pending is None:
+            return False
+
+        self._emit (*pending[0], **pending[1])
+        return True
+
+
+    def discard_pending_emission (self):
+        """
+        Forget pending emission, if any, without invoking handlers.
+
+        @rtype:   C{bool}
+        @returns: C{True} if there was a pending emission.
+        """
+
+        self._lock.acquire ()
+        try:
+            pending       = self._pending
+            self._pending = None
+        finally:
+            self._lock.release ()
+
+        return pending is not None
+
+
+    def emit_many (self, argument_tuples, reduce = False):
+        for arguments in argument_tuples:
+            self.emit (*arguments)
+
+
+    def _record_emission (self, arguments, keywords):
+        # Must be called with the lock held.
+        pending = self._pending
+
+        if pending is None or self.__merge is None:
+            self._pending = (arguments, keywords)
+        else:
+            merged_keywords = dict (pending[1])
+            merged_keywords.update (keywords)
+
+            self._pending = (tuple (self.__merge (pending[0], arguments)), merged_keywords)
+
+
+    def _schedule (self, function):
+        # Must be called with the lock held.
+        scheduler = self.__scheduler
+        if scheduler is None:
+            scheduler = AbstractScheduler.default
+
+        holder     = []
+        self._call = scheduler.call_later (self.__delay, function, holder)
+        holder.append (self._call)
+
+
+    def _additional_description (self, formatter):
+        return (['delay: %s' % self.__delay]
+                + super (_CoalescingSignal, self)._additional_description (formatter))
+
+
+
+class DebouncedSignal (_CoalescingSignal):
+
+    """
+    Signal that delivers emissions only once they stop coming for C{delay} seconds.  Each
+    call to C{L{emit}} postpones delivery, so a burst of emissions results in one call of
+    each handler, after the burst ends.
+
+    Handlers receive arguments of the latest emission in the burst.  Alternatively, you
+    can pass C{merge} function to the constructor: it is called with pending and new
+    argument tuples and must return combined arguments.  Keyword arguments are combined
+    as with C{dict.update}.
+
+    Handlers are invoked from the L{scheduler <scheduler>}, so, depending on it, possibly
+    in a different thread.  Debounced signals cannot have accumulators and C{emit}
+    always returns C{None}.  C{_async} keyword argument of C{emit} is accepted, but
+    ignored: delivery is always left to the scheduler.
+    """
+
+    __slots__ = ()
+
+
+    def __init__(self, delay, scheduler = None, merge = None, source = None):
+        """
+        Create a new signal that delivers emissions once there were none for C{delay}
+        seconds.  If C{source} is not C{None}, the new signal is connected to it, so that
+        its emissions are debounced.  It is disconnected automatically once the new signal
+        is garbage-collected.
+
+        @param  delay:      quiet period in seconds.
+        @type   delay:      C{float}
+
+        @param  scheduler:  scheduler for delivering emissions or C{None} to use the
+                            value of C{L{AbstractScheduler.default
+                            <scheduler.AbstractScheduler>}} at emission time.
+
+        @param  merge:      optional function to combine arguments of coalesced emissions.
+        @type   merge:      callable or C{None}
+
+        @param  source:     optional signal to debounce.
+        @type   source:     C{L{AbstractSignal}} or C{None}
+
+        @raises ValueError: if C{delay} is negative.
+        @raises TypeError:  if C{merge} is not callable and not C{None}.
+        """
+
+        super (DebouncedSignal, self).__init__(delay, scheduler, merge, source)
+
+
+    def emit (self, *arguments, **keywords):
+        keywords.pop ('_async', None)
+
+        self._lock.acquire ()
+        try:
+            self._record_emission (arguments, keywords)
+
+            call = self._call
+            if call is not None:
+                call.cancel ()
+
+            self._schedule (self.__deliver)
+        finally:
+            self._lock.release ()
+
+
+    def __deliver (self, holder):
+        self._lock.acquire ()
+        try:
+            if holder.pop () is not self._call:
+                # Superseded by a later emission.
+                return
+
+            pending       = self._pending
+            self._pending = None
+            self._call    = None
+        finally:
+            self._lock.release ()
+
+        if pending is not None:
+            self._emit (*pending[0], **pending[1])
+
+
+
+class ThrottledSignal (_CoalescingSignal):
+
+    """
+    Signal that delivers at most one emission per C{interval} seconds.  The first
+    emission is delivered immediately and starts an interval.  Emissions that come during
+    the interval are coalesced and delivered when it ends, starting the next interval.
+    If there are none, the signal becomes idle again.
+
+    Coalescing and threading concerns are the same as for C{L{DebouncedSignal}}, except
+    that emissions that don’t need waiting are delivered by C{L{emit}} itself.
+    """
+
+    __slots__ = ()
+
+
+    def __init__(self, interval, scheduler = None, merge = None, source = None):
+        """
+        Create a new signal that delivers at most one emission per C{interval} seconds.
+        Other arguments are the same as for C{L{DebouncedSignal}}.
+
+        @raises ValueError: if C{interval} is negative.
+        @raises TypeError:  if C{merge} is not callable and not C{None}.
+        """
+
+        super (ThrottledSignal, self).__init__(interval, scheduler, merge, source)
+
+
+    interval = property (lambda self: self.delay)
+
+
+    def emit (self, *arguments, **keywords):
+        keywords.pop ('_async', None)
+
+        self._lock.acquire ()
+        try:
+            if self._call is not None:
+                self._record_emission (arguments, keywords)
+                return
+
+            self._schedule (self.__end_interval)
+        finally:
+            self._lock.release ()
+
+        self._emit (*arguments, **keywords)
+
+
+    def __end_interval (self, holder):
+        self._lock.acquire ()
+        try:
+            if holder.pop () is not self._call:
+                return
+
+            pending = self._pending
+            self._pending = None
+
+            if pending is not None:
+                self._schedule (self.__end_interval)
+            else:
+                self._call = None
+        finally:
+            self._lock.release ()
+
+        if pending is not None:
+            self._emit (*pending[0], **pending[1])
+
+
+
+#-- Connection handles -----------------------------------------------
+
+class Connection (object):
+
+    """
+    Handle for a single connection of a handler to a signal, as returned by
+    C{L{connect_handle <AbstractSignal.connect_handle>}}.  Handle methods take constant time
+    regardless of the number of signal handlers and never compare handlers.
+
+    Unlike C{L{AbstractSignal.block}} and C{L{AbstractSignal.unblock}}, C{L{block}} and
+    C{L{unblock}} methods of a handle affect only the connection in question, even if
+    there are several equal handlers connected to the signal.
+
+    Note that a handle references its signal and so prevents it from being
+    garbage-collected.  You should never create instances of this class directly.
+    """
+
+    __slots__ = ('__signal', '__connection')
+
+
+    def __init__(self, signal, connection):
+        self.__signal     = signal
+        self.__connection = connection
+
+
+    signal  = property (lambda self: self.__signal,
+                        doc = ("""
+                               The signal this is a connection to.
+
+                               @type: C{L{Signal}}
+                               """))
+
+    handler = property (lambda self: self.__connection.handler,
+                        doc = ("""
+                               The connected handler (possibly wrapped in a
+                               C{L{Binding}}) or C{None} if the handler has been
+                               disconnected already.
+
+                               @type: C{object}
+                               """))
+
+    priority = property (lambda self: self.__connection.priority,
+                         doc = ("""
+                                The L{priority <AbstractSignal.connect>} the handler was
+                                connected with.
+
+                                @type: C{object}
+                                """))
+
+
+    def is_connected (self):
+        """
+        Determine if the handler is still connected, i.e. the connection has not been
+        cancelled in any way and the handler has not been garbage-collected.
+
+        @rtype: C{bool}
+        """
+
+        handler = self.__connection.handler
+        return handler is not None and (not isinstance (handler, _WEAK_HANDLERS) or handler)
+
+    def is_blocked (self):
+        """
+        Determine if the handler is connected and blocked.
+
+        @rtype: C{bool}
+        """
+
+        return self.__connection.blocked > 0
+
+
+    def disconnect (self):
+        """
+        Disconnect the handler.  This is the same as calling C{L{AbstractSignal.disconnect}}
+        for the handler, except that this specific connection is cancelled.
+
+        @rtype:   C{bool}
+        @returns: C{True} if the handler has been disconnected; C{False} if it had been
+                  disconnected already.
+        """
+
+        return self.__signal._disconnect (self.__connection)
+
+
+    def block (self):
+        """
+        Block the handler from being called during subsequent emissions.  You need to
+        call C{L{unblock}} exactly the same number of times for the handler to become
+        non-blocked.
+
+        @rtype:   C{bool}
+        @returns: C{True} if the handler has been blocked; C{False} if it is disconnected.
+        """
+
+        return self.__signal._block (self.__connection)
+
+    def unblock (self):
+        """
+        Decrement the handler’s ‘block counter’.
+
+        @rtype:   C{bool}
+        @returns: C{True} if the handler had been blocked; C{False} if it is not blocked
+                  or is disconnected.
+        """
+
+        return self.__signal._unblock (self.__connection)
+
+
+    def __repr__(self):
+        return ('<%s.%s at 0x%x: %r to %r>'
+                % (self.__module__, self.__class__.__name__, id (self),
+                   self.__connection.handler, self.__signal))
+
+    def __str__(self):
+        return ('<%s at 0x%x: %s to %s>'
+                % (self.__class__.__name__, id (self), self.__connection.handler, self.__signal))
+
+
+
+#-- Internal classes and functions ----------------------------------
+
+class _Connection (object):
+
+    """
+    Internal record of a single handler connection to a C{L{Signal}}.  C{blocked} is the
+    number of times the handler has been blocked or C{_DISCONNECTED} for connections that
+    no longer belong to the signal (then C{handler} is C{None} too.)  C{priority} never
+    changes.
+
+    Signals with one handler store its connection instead of a one-element tuple, which
+    saves memory, since most signals have at most one handler.  To keep code that reads
+    handler lists simple, a connection also acts as a read-only sequence consisting of
+    itself.
+    """
+
+    __slots__ = ('handler', 'blocked', 'priority')
+
+
+    def __init__(self, handler, priority = 0):
+        self.handler  = handler
+        self.blocked  = 0
+        self.priority = priority
+
+
+    def __len__(self):
+        return 1
+
+    def __iter__(self):
+        return iter ((self,))
+
+    def __getitem__(self, index):
+        return (self,) [index]
+
+
+    def __repr__(self):
+        return ('<%s: %r; blocked: %d; priority: %r>'
+                % (self.__class__.__name__, self.handler, self.blocked, self.priority))
+
+
+_DISCONNECTED = -1
+
+
+class _KeyedConnection (_Connection):
+
+    """
+    Connection of a handler to a C{L{KeyedSignal}} for a specific C{key}.
+    """
+
+    __slots__ = ('key',)
+
+
+    def __init__(self, handler, priority, key):
+        super (_KeyedConnection, self).__init__(handler, priority)
+        self.key = key
+
+
+def _add_connection (handlers, connection, index = None):
+    # Return `handlers' (possibly None) with `connection' inserted according to its
+    # priority.  New connection inherits block counter of an equal blocked handler, which
+    # is looked up in `index' (a `_HandlerIndex' of `handlers') if it is given.
+    if handlers is None:
+        return connection
+
+    if isinstance (handlers, _Connection):
+        handlers = (handlers,)
+
+    handler = connection.handler
+
+    if index is not None:
+        equal_connections = index.find (handler)
+    else:
+        equal_connections = None
+
+    if equal_connections is not None:
+        for _connection in equal_connections:
+            if _connection.blocked > 0:
+                connection.blocked = _connection.blocked
+                break
+    else:
+        for _connection in handlers:
+            if _connection.blocked > 0 and _connection.handler == handler:
+                connection.blocked = _connection.blocked
+                break
+
+    priority = connection.priority
+    if priority <= handlers[-1].priority:
+        return handlers + (connection,)
+    else:
+        index = _find_insertion_index (handlers, priority)
+        return handlers[:index] + (connection,) + handlers[index:]
+
+
+def _merge_connections (first, second):
+    # Merge two tuples of connections (or single connections), each sorted by priority,
+    # into one tuple.  Of connections with equal priority, those from `first' come first.
+    if isinstance (first, _Connection):
+        first = (first,)
+    if isinstance (second, _Connection):
+        second = (second,)
+
+    if first[-1].priority >= second[0].priority:
+        return first + second
+
+    merged      = []
+    first_size  = len (first)
+    second_size = len (second)
+    i           = 0
+    j           = 0
+
+    while i < first_size and j < second_size:
+        if first[i].priority >= second[j].priority:
+            merged.append (first[i])
+            i += 1
+        else:
+            merged.append (second[j])
+            j += 1
+
+    merged.extend (first[i:])
+    merged.extend (second[j:])
+
+    return tuple (merged)
+
+
+def _find_insertion_index (handlers, priority):
+    # Return index of the first connection in `handlers' with priority smaller than
+    # `priority', i.e. where a new connection must be inserted to come after all those
+    # with the same or larger priority.
+    low  = 0
+    high = len (handlers)
+
+    while low < high:
+        middle = (low + high) // 2
+        if handlers[middle].priority < priority:
+            high = middle
+        else:
+            low  = middle + 1
+
+    return low
+
+
+
+# Signals with fewer connections don't have an index, since scanning a short tuple is
+# fast anyway, while the index costs memory and slows connecting down.
+_INDEX_THRESHOLD = 16
+
+
+def _create_handler_index (handlers):
+    if handlers is not None and len (handlers) >= _INDEX_THRESHOLD:
+        return _HandlerIndex (handlers)
+    else:
+        return None
+
+
+class _HandlerIndex (object):
+
+    """
+    Secondary index of a signal’s connections, mapping handlers to tuples of connections
+    with equal handlers.  Such tuples are ordered like the signal’s handler tuple and, as
+    that, are replaced rather than modified.  Unhashable handlers cannot be indexed, so
+    while there are any, an index lookup that finds nothing is not conclusive.
+
+    Disconnected connections are removed from the index immediately.  Connections of
+    garbage-collected handlers stay until the signal collects garbage and rebuilds the
+    index, but that is harmless, since such handlers are not equal to anything alive.
+    """
+
+    __slots__ = ('__connections', '__num_unhashable')
+
+
+    def __init__(self, handlers):
+        self.__connections    = {}
+        self.__num_unhashable = 0
+
+        for connection in handlers:
+            if connection.blocked != _DISCONNECTED:
+                self.add (connection)
+
+
+    def add (self, connection):
+        handler = connection.handler
+
+        try:
+            connections = self.__connections.get (handler)
+        except TypeError:
+            self.__num_unhashable += 1
+            return
+
+        if connections is None:
+            self.__connections[handler] = (connection,)
+        else:
+            # Same position rule as in `_add_connection'.
+            index = _find_insertion_index (connections, connection.priority)
+            self.__connections[handler] = (connections[:index] + (connection,)
+                                           + connections[index:])
+
+    def remove (self, connection):
+        handler = connection.handler
+
+        try:
+            connections = self.__connections.get (handler)
+        except TypeError:
+            self.__num_unhashable -= 1
+            return
+
+        if connections is not None:
+            connections = tuple ([_connection for _connection in connections
+                                  if _connection is not connection])
+            if connections:
+                self.__connections[handler] = connections
+            else:
+                del self.__connections[handler]
+
+
+    def find (self, handler):
+        # Return connections with handlers equal to `handler' or None if the index cannot
+        # tell and the caller has to scan all handlers.
+        try:
+            connections = self.__connections.get (handler)
+        except TypeError:
+            return None
+
+        if connections is not None:
+            return connections
+        elif self.__num_unhashable:
+            return None
+        else:
+            return ()
+
+
+
+class _BatchHandler (object):
+
+    """
+    Internal wrapper for handlers connected with C{L{AbstractSignal.connect_batch}}.  It
+    compares equal to the wrapped handler, so that equality-based methods of signals work
+    as usual.  Normal emission calls it just like any other handler, while
+    C{L{Signal.emit_many}} calls the wrapped C{handler} directly.
+    """
+
+    __slots__ = ('handler',)
+
+
+    def __init__(self, handler):
+        self.handler = handler
+
+
+    def __call__(self, *arguments, **keywords):
+        values = self.handler ([arguments], **keywords)
+        if values is not None:
+            return values[0]
+
+
+    def __eq__(self, other):
+        if isinstance (other, _BatchHandler):
+            other = other.handler
+
+        return self.handler == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash (self.handler)
+
+
+    def __nonzero__(self):
+        return bool (self.handler)
+
+    __bool__ = __nonzero__
+
+
+    def __repr__(self):
+        return '<%s: %r>' % (self.__class__.__name__, self.handler)
+
+
+# Handlers that can become garbage while still connected; they evaluate to false then.
+_WEAK_HANDLERS = (WeakBinding, _BatchHandler)
+
+
+
+class _EmissionIterator (object):
+
+    """
+    Iterator returned by C{L{Signal.emit_iter}}.  Emission level of the signal is raised
+    only while a handler runs, not while the iterator is suspended, because iterators can
+    be advanced and abandoned in any order, unlike nested calls to C{emit}.
+    """
+
+    __slots__ = ('__signal', '__handlers', '__arguments', '__keywords', '__index',
+                 '__might_have_garbage')
+
+
+    def __init__(self, signal, handlers, arguments, keywords):
+        self.__signal             = signal
+        self.__handlers           = handlers
+        self.__arguments          = arguments
+        self.__keywords           = keywords
+        self.__index              = 0
+        self.__might_have_garbage = False
+
+
+    def __iter__(self):
+        return self
+
+
+    def next (self):
+        handlers = self.__handlers
+        if handlers is None:
+            raise StopIteration
+
+        signal = self.__signal
+
+        while self.__index < len (handlers):
+            connection    = handlers[self.__index]
+            self.__index += 1
+
+            handler = connection.handler
+            if connection.blocked:
+                continue
+
+            if not handler and isinstance (handler, _WEAK_HANDLERS):
+                self.__might_have_garbage = True
+                continue
+
+            saved_emission_level = signal._Signal__emission_level
+            signal._Signal__emission_level = abs (saved_emission_level) + 1
+            succeeded = False
+
+            try:
+                try:
+                    handler_value = handler (*self.__arguments, **self.__keywords)
+                    succeeded     = True
+                except:
+                    AbstractSignal.exception_handler (signal, sys.exc_info () [1], handler)
+            finally:
+                stopped = (signal._Signal__emission_level < 0)
+                signal._Signal__emission_level = saved_emission_level
+
+            if stopped:
+                # Remaining handlers are skipped, but the value is still yielded.
+                self.__index = len (handlers)
+
+            if succeeded:
+                return handler_value
+
+        self.close ()
+        raise StopIteration
+
+    __next__ = next
+
+
+    def close (self):
+        handlers        = self.__handlers
+        self.__handlers = None
+
+        if (handlers is not None and self.__might_have_garbage
+            and self.__signal._Signal__emission_level == 0):
+            self.__signal.collect_garbage ()
+
+
+
+class _ProcessEmission (object):
+
+    """
+    State of an emission started by C{L{Signal.emit_in_processes}}.  Results of handler
+    calls are accumulated in connection order as they become available, so that the
+    calls not needed anymore can be cancelled early.
+    """
+
+    __slots__ = ('result', '__signal', '__accumulator', '__handlers', '__futures', '__lock',
+                 '__next_index', '__value', '__exception')
+
+
+    def __init__(self, signal, accumulator, handlers, futures):
+        self.result        = Future ()
+        self.__signal      = signal
+        self.__accumulator = accumulator
+        self.__handlers    = handlers
+        self.__futures     = futures
+        self.__lock        = threading.Lock ()
+        self.__next_index  = 0
+        self.__exception   = None
+
+        if accumulator is not None:
+            self.__value = accumulator.get_initial_value ()
+        else:
+            self.__value = None
+
+        if futures:
+            for future in futures:
+                future.add_done_callback (self.__call_finished)
+        else:
+            self.__finish ()
+
+
+    def __call_finished (self, future):
+        # Callbacks come from different threads and in any order, so whichever of them
+        # finds the next future done advances over all consecutive done ones.  Once the
+        # emission is over, `__futures' is set to None and remaining callbacks do
+        # nothing.  Cancelling may call callbacks synchronously, so it is done without
+        # holding the lock.
+        self.__lock.acquire ()
+        try:
+            futures = self.__futures
+            if futures is None:
+                return
+
+            while self.__next_index < len (futures) and futures[self.__next_index].done ():
+                index              = self.__next_index
+                self.__next_index += 1
+
+                if not self.__accumulate (self.__handlers[index], futures[index]):
+                    break
+            else:
+                if self.__next_index < len (futures):
+                    return
+
+            self.__futures = None
+        finally:
+            self.__lock.release ()
+
+        for future in futures[self.__next_index:]:
+            cancel = getattr (future, 'cancel', None)
+            if cancel is not None:
+                cancel ()
+
+        self.__finish ()
+
+
+    def __accumulate (self, handler, future):
+        # Must be called with the lock held.  Return false if the emission is over.
+        try:
+            exception = future.exception ()
+            if exception is None:
+                handler_value = future.result ()
+        except Exception:
+            # Cancelled, which can only happen if somebody else cancels the call.
+            exception = sys.exc_info () [1]
+
+        if exception is not None:
+            try:
+                try:
+                    raise exception
+                except:
+                    AbstractSignal.exception_handler (self.__signal, sys.exc_info () [1],
+                                                      handler)
+            except:
+                self.__exception = sys.exc_info () [1]
+                return False
+
+            return True
+
+        accumulator = self.__accumulator
+        if accumulator is not None:
+            try:
+                self.__value = accumulator.accumulate_value (self.__value, handler_value)
+                if not accumulator.should_continue (self.__value):
+                    return False
+            except:
+                self.__exception = sys.exc_info () [1]
+                return False
+
+        return True
+
+
+    def __finish (self):
+        accumulator = self.__accumulator
+
+        if self.__exception is not None:
+            self.result.set_exception (self.__exception)
+        elif accumulator is None:
+            self.result.set_result (None)
+        else:
+            try:
+                value = accumulator.post_process_value (self.__value)
+            except:
+                self.result.set_exception (sys.exc_info () [1])
+            else:
+                self.result.set_result (value)
+
+
+def _pickle_handler (handler):
+    # Return pickled description of a handler call for _call_in_process().  Bindings are
+    # not pickled themselves: weak ones cannot be, so we pickle what they reference.
+    if isinstance (handler, _BatchHandler):
+        handler  = handler.handler
+        is_batch = True
+    else:
+        is_batch = False
+
+    if isinstance (handler, Binding):
+        function  = handler._get_function ()
+        arguments = handler._get_arguments ()
+        keywords  = dict (handler._get_keywords ())
+
+        if handler._get_class () is not None:
+            # Functions of methods are not picklable in Python 2, so we prefer to pickle
+            # the object and method name.  This doesn't work for private methods.
+            object = handler._get_object ()
+            method = getattr (object, function.__name__, None)
+
+            if getattr (method, '__func__', None) is function:
+                function  = (object, function.__name__)
+            else:
+                arguments = (object,) + arguments
+    else:
+        function  = handler
+        arguments = ()
+        keywords  = {}
+
+    try:
+        return pickle.dumps ((function, arguments, keywords, is_batch),
+                             pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        raise TypeError ('handler %r cannot be sent to other processes: %s'
+                         % (handler, sys.exc_info () [1]))
+
+
+def _call_in_process (handler_data, argument_data):
+    function, fixed_arguments, fixed_keywords, is_batch = pickle.loads (handler_data)
+    arguments, keywords                                 = pickle.loads (argument_data)
+
+    if isinstance (function, tuple):
+        function = getattr (*function)
+
+    if fixed_keywords:
+        all_keywords = fixed_keywords
+        all_keywords.update (keywords)
+    else:
+        all_keywords = keywords
+
+    if is_batch:
+        values = function (*(fixed_arguments + ([arguments],)), **all_keywords)
+        if values is not None:
+            return values[0]
+    else:
+        return function (*(fixed_arguments + arguments), **all_keywords)
+
+
+def _remove_garbage (handlers):
+    # Return `handlers' without disconnected connections and those of garbage-collected
+    # handlers: a tuple, a single connection or None if nothing remains.  If there is
+    # nothing to remove, `handlers' is returned as is, so that we don't create a new tuple
+    # for nothing.
+    for connection in handlers:
+        handler = connection.handler
+        if handler is None or (not handler and isinstance (handler, _WEAK_HANDLERS)):
+            break
+    else:
+        return handlers
+
+    remaining_handlers = []
+
+    for connection in handlers:
+        handler = connection.handler
+        if handler is None:
+            continue
+
+        if not handler and isinstance (handler, _WEAK_HANDLERS):
+            # Mark it as disconnected for the sake of `Connection' objects.
+            connection.blocked = _DISCONNECTED
+            connection.handler = None
+        else:
+            remaining_handlers.append (connection)
+
+    if len (remaining_handlers) > 1:
+        return tuple (remaining_handlers)
+    elif remaining_handlers:
+        return remaining_handlers[0]
+    else:
+        return None
+
+
+
+#-- Optional C implementation of emission ----------------------------
+
+# The extension provides faster emit() and _emit() methods for `Signal' (and so for all
+# its subclasses that don't override these.)  Pure Python implementations above are
+# the fallback for other Python implementations or if the extension is not built.
+
+_signal = None
+
+if _PYTHON_IMPLEMENTATION == 'CPython':
+    try:
+        from notify import _signal
+    except ImportError:
+        pass
+
+HAVE_FAST_EMISSION = (_signal is not None)
+"""
+Whether C{L{Signal}} uses C implementation of its emission methods.  Semantics are exactly
+the same in both cases, but C implementation is considerably faster.
+"""
 
-#-- Internal variables -----------------------------------------------
+# Kept around mainly for benchmarking and testing: this way it is possible to create a
+# signal class that uses pure Python emission even when C implementation is available.
+_PYTHON_EMISSION_METHODS = { 'emit':  Signal.__dict__['emit'],
+                             '_emit': Signal.__dict__['_emit'] }
 
-# It is not guaranteed to be a singleton, although it probably always is.
-_EMPTY_TUPLE = ()
+if HAVE_FAST_EMISSION:
+    Signal.emit  = _signal.emit
+    Signal._emit = _signal._emit
 
 
 
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+"""
+Tracing of signal emissions.  An enabled C{L{EmissionTracer}} records a timeline of
+emissions of all C{L{Signal <signal.Signal>}} instances, including those of
+L{variables <variable>} and L{conditions <condition>}, and handler calls in them.  The
+timeline is written in Chrome trace-event format, which can be loaded into
+C{chrome://tracing} or U{Perfetto <https://ui.perfetto.dev/>}:
+
+    >>> from notify.tracing import EmissionTracer
+    ...
+    ... tracer = EmissionTracer ()
+    ... tracer.enable ()
+    ... variable.value = 42
+    ... tracer.disable ()
+    ...
+    ... tracer.write ('emissions.json')
+
+Each emission becomes a slice spanning its handler calls, which are slices themselves.
+Emissions started from handlers are nested inside them, so propagation through a graph
+of variables and conditions is visible as a tree.  Iterators from C{L{emit_iter
+<signal.Signal.emit_iter>}} can be suspended between handlers, so each handler call they
+make becomes a separate emission slice.  To reduce overhead and trace size for
+long runs, tracer can record only one in C{N} outermost emissions together with all
+emissions nested in them, see C{sample_every} argument of C{L{EmissionTracer}}.
+
+Tracers use the same mechanism as L{profilers <profiling>}, so when no tracer or
+profiler is enabled, there is no overhead at all, and emission goes through pure Python
+code while any of them is.
+"""
+
+__docformat__ = 'epytext en'
+__all__       = ('EmissionTracer',)
+
+
+import os
+
+try:
+    import json
+except ImportError:
+    json = None
+
+from notify.profiling import _activate, _deactivate, _get_handler_key
+from notify.signal    import _get_thread_id
+from notify.utils     import StringType
+
+
+
+#-- Tracer -----------------------------------------------------------
+
+class EmissionTracer (object):
+
+    """
+    Recorder of emission timeline.  Tracer only records emissions while it is L{enabled
+    <enable>}.  Several tracers and profilers may be enabled at the same time.
+
+    Recorded events are dictionaries in Chrome trace-event format, with time in
+    microseconds.  Emissions are recorded as C{'B'} (begin) and C{'E'} (end) event pairs,
+    with C{args} containing signal identifier and nesting depth, counting from 1 for
+    emissions not started from a handler.  Handler calls are recorded as C{'X'} (complete)
+    events.
+    """
+
+    def __init__(self, sample_every = 1):
+        """
+        Create a new tracer.
+
+        @param  sample_every: record only one in this many emissions that are not nested
+                              in other emissions; nested emissions are recorded if the
+                              outermost one is.
+        @type   sample_every: C{int}
+
+        @raises ValueError: if C{sample_every} is less than 1.
+        """
+
+        if sample_every < 1:
+            raise ValueError ("'sample_every' must be at least 1")
+
+        self.__sample_every   = sample_every
+        self.__enabled        = False
+        self.__events         = []
+        self.__num_emissions  = 0
+        self.__process_id     = None
+
+        # Map thread identifiers to `[depth, recording]' lists for emissions currently
+        # in progress in that thread.  Nested emissions are recorded if and only if the
+        # outermost one is.
+        self.__threads        = {}
+
+
+    sample_every = property (lambda self: self.__sample_every)
+
+
+    def enable (self):
+        """
+        Start recording.  If the tracer is enabled already, do nothing.
+        """
+
+        if not self.__enabled:
+            self.__enabled    = True
+            self.__process_id = os.getpid ()
+            _activate (self)
+
+    def disable (self):
+        """
+        Stop recording.  Already recorded events are retained.  If the tracer is not
+        enabled, do nothing.  Emissions in progress still record their end.
+        """
+
+        if self.__enabled:
+            self.__enabled = False
+            _deactivate (self)
+
+    def is_enabled (self):
+        """
+        Determine if the tracer currently records emissions.
+
+        @rtype: C{bool}
+        """
+
+        return self.__enabled
+
+
+    def __enter__(self):
+        self.enable ()
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.disable ()
+
+
+    def clear (self):
+        """
+        Forget all recorded events.
+        """
+
+        self.__events        = []
+        self.__num_emissions = 0
+
+
+    def get_events (self):
+        """
+        Return all recorded events, in the order they were recorded.
+
+        @rtype: C{list} of C{dict}
+        """
+
+        return list (self.__events)
+
+
+    def write (self, file):
+        """
+        Write recorded events as a JSON trace file.  C{file} is either a file name or a
+        stream opened for writing text.
+
+        @raises ImportError: if C{json} module is not available.
+        """
+
+        if json is None:
+            raise ImportError ("writing traces requires 'json' module (Python 2.6 or later)")
+
+        data = json.dumps ({ 'traceEvents': self.get_events () })
+
+        if isinstance (file, StringType):
+            stream = open (file, 'w')
+            try:
+                stream.write (data)
+            finally:
+                stream.close ()
+        else:
+            file.write (data)
+
+
+    # Emission observer protocol, see `notify.profiling'.
+
+    def _begin_emission (self, signal, start_time):
+        thread_id = _get_thread_id ()
+        state     = self.__threads.get (thread_id)
+
+        if state is None:
+            self.__num_emissions += 1
+            state = self.__threads[thread_id] = [0, (self.__num_emissions - 1)
+                                                    % self.__sample_every == 0]
+
+        state[0] += 1
+
+        if state[1]:
+            # Not cached: signal ids can be reused by different signals.
+            self.__events.append ({ 'name': _describe_signal (signal),
+                                    'cat':  'emission',
+                                    'ph':   'B',
+                                    'ts':   start_time * 1e6,
+                                    'pid':  self.__process_id,
+                                    'tid':  thread_id,
+                                    'args': { 'signal': '0x%x' % id (signal),
+                                              'depth':  state[0] } })
+
+        # Unrecorded emissions are still needed to track nesting.
+        return True
+
+    def _end_emission (self, signal, end_time):
+        thread_id = _get_thread_id ()
+        state     = self.__threads[thread_id]
+
+        state[0] -= 1
+        if state[0] == 0:
+            del self.__threads[thread_id]
+
+        if state[1]:
+            self.__events.append ({ 'ph':   'E',
+                                    'ts':   end_time * 1e6,
+                                    'pid':  self.__process_id,
+                                    'tid':  thread_id })
+
+    def _add_call (self, signal, handler, start_time, call_time):
+        thread_id = _get_thread_id ()
+
+        if self.__threads[thread_id][1]:
+            self.__events.append ({ 'name': _describe_handler (handler),
+                                    'cat':  'handler',
+                                    'ph':   'X',
+                                    'ts':   start_time * 1e6,
+                                    'dur':  call_time * 1e6,
+                                    'pid':  self.__process_id,
+                                    'tid':  thread_id })
+
+
+
+#-- Internals --------------------------------------------------------
+
+def _describe_signal (signal):
+    parent = getattr (signal, 'parent', None)
+    if parent is not None:
+        return '%s of %s' % (signal.__class__.__name__, parent.__class__.__name__)
+    else:
+        return signal.__class__.__name__
+
+
+def _describe_handler (handler):
+    function, object_class = _get_handler_key (handler)
+    name = getattr (function, '__name__', None) or repr (function)
+
+    if object_class is not None:
+        return '%s.%s' % (object_class.__name__, name)
+    else:
+        return name
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
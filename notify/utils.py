@@ -61,6 +61,7 @@ __all__       = ('is_callable', 'is_valid_identifier', 'mangle_identifier',
 
 import re
 import sys
+import threading
 import types
 import weakref
 from keyword import iskeyword
@@ -68,20 +69,53 @@ from keyword import iskeyword
 
 # Not public because it's an unreliable guess in common case.
 
-if hasattr (sys, 'subversion'):
-    _PYTHON_IMPLEMENTATION = sys.subversion[0]
-elif sys.version_info[:2] < (2, 5):
-    try:
-        weakref.ref (object ())
-    except TypeError:
-        # This is a guess, yeah.
-        _PYTHON_IMPLEMENTATION = 'CPython'
+try:
+    import platform
+    _PYTHON_IMPLEMENTATION = platform.python_implementation ()
+except (ImportError, AttributeError):
+    # Python versions before 2.6 don't have the function.
+    if hasattr (sys, 'subversion'):
+        _PYTHON_IMPLEMENTATION = sys.subversion[0]
+    elif sys.version_info[:2] < (2, 5):
+        try:
+            weakref.ref (object ())
+        except TypeError:
+            # This is a guess, yeah.
+            _PYTHON_IMPLEMENTATION = 'CPython'
 
 if '_PYTHON_IMPLEMENTATION' not in globals ():
     _PYTHON_IMPLEMENTATION = '?'
 
 
 
+# Not public, these only hide names deprecated in Python 3.10.
+
+if sys.version_info[:3] < (2, 6, 0):
+    _current_thread = threading.currentThread
+
+    def _notify_all (condition):
+        condition.notifyAll ()
+
+    def _start_daemon_thread (target):
+        thread = threading.Thread (target = target)
+        thread.setDaemon (True)
+        thread.start ()
+        return thread
+
+else:
+    _current_thread = threading.current_thread
+
+    def _notify_all (condition):
+        condition.notify_all ()
+
+    def _start_daemon_thread (target):
+        thread = threading.Thread (target = target)
+        thread.daemon = True
+        thread.start ()
+        return thread
+
+
+
 if sys.version_info[:3] < (2, 6, 0):
     is_callable = callable
 
@@ -304,6 +338,11 @@ class frozendict (dict):
         return _hash
 
 
+    def __reduce__(self):
+        # Default implementation for dictionaries would restore items with __setitem__().
+        return (type (self), (dict (self),))
+
+
     def __repr__(self):
         return '%s (%s)' % (type (self).__name__, super (frozendict, self).__repr__())
 
@@ -365,6 +404,13 @@ else:
     StringType = basestring
 
 
+# Not public.  Python versions before 2.6 have neither `bytes' nor `b' string prefix.
+if sys.version_info[0] >= 3:
+    _BytesType = bytes
+else:
+    _BytesType = str
+
+
 
 # Local variables:
 # mode: python
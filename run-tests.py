@@ -50,7 +50,8 @@ def _build_extensions ():
 
 
 
-_TEST_MODULES = ('all', 'base', 'bind', 'condition', '_gc', 'mediator', 'signal',
+_TEST_MODULES = ('all', 'base', 'bind', 'bridge', 'condition', 'executor', 'failure',
+                 '_gc', 'mediator', 'named', 'profiling', 'scheduler', 'signal', 'tracing',
                  'utils', 'variable')
 
 def _import_module (module_name):
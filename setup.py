@@ -193,13 +193,19 @@ class build_ext (_build_ext):
 # Note: the goal of the below function and manipulation of distuils.util module contents
 # is to not byte-compile files that use 2.5 features on earlier Python versions.  Python
 # 2.3 will be baffled by function decorators already, 2.4 --- by `yield' inside `try
-# ... finally'.
+# ... finally'.  Likewise, files in `_3_5' packages use `async def' and `await'.
 
 import __future__
 
 def should_be_byte_compiled (filename):
     package_name = os.path.basename (os.path.split (filename) [0])
-    return package_name != '_2_5' or 'with_statement' in __future__.all_feature_names
+
+    if package_name == '_2_5':
+        return 'with_statement' in __future__.all_feature_names
+    elif package_name == '_3_5':
+        return sys.version_info[:2] >= (3, 5)
+    else:
+        return True
 
 def custom_byte_compile (filenames, *arguments, **keywords):
     original_byte_compile ([filename for filename in filenames
@@ -211,8 +217,14 @@ distutils.util.byte_compile = custom_byte_compile
 
 
 
-gc_extension = Extension (name    = 'notify._gc',
-                          sources = [os.path.join ('notify', '_gc.c')])
+gc_extension     = Extension (name    = 'notify._gc',
+                              sources = [os.path.join ('notify', '_gc.c')])
+
+bind_extension   = Extension (name    = 'notify._bind',
+                              sources = [os.path.join ('notify', '_bind.c')])
+
+signal_extension = Extension (name    = 'notify._signal',
+                              sources = [os.path.join ('notify', '_signal.c')])
 
 
 
@@ -226,8 +238,8 @@ setup (name             = 'py-notify',
        download_url     = 'http://download.gna.org/py-notify/',
        license          = "GNU Lesser General Public License v2.1",
        classifiers      = classifiers,
-       packages         = ['notify', 'notify._2_5'],
-       ext_modules      = [gc_extension],
+       packages         = ['notify', 'notify._2_5', 'notify._3_5'],
+       ext_modules      = [gc_extension, bind_extension, signal_extension],
        cmdclass         = { 'build_ext': build_ext })
 
 
@@ -69,6 +69,20 @@ class SignalContextManagerTestCase (NotifyTestCase):
         test.assert_results (2)
 
 
+    def test_connecting_with_priority (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, 'a')
+
+        with signal.connecting (test.simple_handler, 'b', _priority = 1):
+            signal.emit ()
+
+        signal.emit ()
+
+        test.assert_results ('b', 'a', 'a')
+
+
     def test_connecting_safely_1 (self):
         test   = NotifyTestObject ()
         signal = Signal ()
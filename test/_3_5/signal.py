@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+# TODO: Merge this file into `test/signal.py' when Py-notify relies on Python 3.5 or
+#       later.
+
+
+import asyncio
+
+from notify.signal import AbstractSignal, Signal
+from test.__common import NotifyTestCase, NotifyTestObject
+
+
+__all__ = ('AsyncEmissionTestCase',)
+
+
+
+class AsyncEmissionTestCase (NotifyTestCase):
+
+    def run_coroutine (self, coroutine):
+        loop = asyncio.new_event_loop ()
+
+        try:
+            return loop.run_until_complete (coroutine)
+        finally:
+            loop.close ()
+
+
+    def test_plain_handlers (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_keywords_handler, a = 1)
+
+        self.assertEqual (self.run_coroutine (signal.emit_async (1)), None)
+        test.assert_results (1, (1, { 'a': 1 }))
+
+
+    def test_coroutine_handlers (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        async def handler (x):
+            await asyncio.sleep (0)
+            test.simple_handler (x)
+
+        signal.connect (handler)
+        signal.connect (test.simple_handler_100)
+        signal.connect (handler)
+
+        self.run_coroutine (signal.emit_async (1))
+
+        test.assert_results (1, 101, 1)
+
+
+    def test_accumulators (self):
+        async def negate (x):
+            await asyncio.sleep (0)
+            return not x
+
+        async def identity (x):
+            return x
+
+        for accumulator, argument, expected_value in ((AbstractSignal.ANY_ACCEPTS, True,  True),
+                                                      (AbstractSignal.ANY_ACCEPTS, False, True),
+                                                      (AbstractSignal.ALL_ACCEPT,  True,  False),
+                                                      (AbstractSignal.LAST_VALUE,  True,  True),
+                                                      (AbstractSignal.VALUE_LIST,  1,     [False, 1])):
+            signal = Signal (accumulator)
+            signal.connect (negate)
+            signal.connect (identity)
+
+            self.assertEqual (self.run_coroutine (signal.emit_async (argument)), expected_value)
+
+
+    def test_should_continue (self):
+        test   = NotifyTestObject ()
+        signal = Signal (AbstractSignal.ANY_ACCEPTS)
+
+        async def accepting_handler ():
+            return 'accepted'
+
+        signal.connect (lambda: None)
+        signal.connect (accepting_handler)
+        signal.connect (test.simple_handler, 'not called')
+
+        self.assertEqual (self.run_coroutine (signal.emit_async ()), 'accepted')
+        test.assert_results ()
+
+
+    def test_stop_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def stopping_handler ():
+            signal.stop_emission ()
+            return asyncio.sleep (0)
+
+        signal.connect (stopping_handler)
+        signal.connect (test.simple_handler, 'not called')
+
+        self.run_coroutine (signal.emit_async ())
+
+        self.assertEqual (signal.emission_level, 0)
+        test.assert_results ()
+
+
+    def test_exception (self):
+        test   = NotifyTestObject ()
+        signal = Signal (AbstractSignal.VALUE_LIST)
+
+        async def raising_handler ():
+            await asyncio.sleep (0)
+            raise ValueError
+
+        def exception_handler (signal, exception, handler):
+            test.results.append (type (exception))
+
+        signal.connect (raising_handler)
+        signal.connect (lambda: 1)
+
+        original_handler = AbstractSignal.__dict__['exception_handler']
+        AbstractSignal.exception_handler = staticmethod (exception_handler)
+
+        try:
+            self.assertEqual (self.run_coroutine (signal.emit_async ()), [1])
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        test.assert_results (ValueError)
+
+
+    def test_concurrency (self):
+        signal  = Signal (AbstractSignal.VALUE_LIST)
+        running = [0, 0]
+
+        async def handler (x):
+            running[0] += 1
+            running[1]  = max (running[0], running[1])
+            await asyncio.sleep (0.01)
+            running[0] -= 1
+            return x
+
+        for k in range (0, 6):
+            signal.connect (handler, k)
+
+        self.assertEqual (self.run_coroutine (signal.emit_async (_concurrency = 2)),
+                          list (range (0, 6)))
+        self.assertEqual (running, [0, 2])
+
+        running[1] = 0
+
+        self.assertEqual (self.run_coroutine (signal.emit_async (_concurrency = None)),
+                          list (range (0, 6)))
+        self.assertEqual (running, [0, 6])
+
+
+    def test_concurrent_should_continue (self):
+        signal    = Signal (AbstractSignal.ANY_ACCEPTS)
+        cancelled = []
+
+        async def accepting_handler ():
+            return 'accepted'
+
+        async def slow_handler ():
+            try:
+                await asyncio.sleep (10)
+            except asyncio.CancelledError:
+                cancelled.append (True)
+                raise
+
+        signal.connect (accepting_handler)
+        signal.connect (slow_handler)
+
+        self.assertEqual (self.run_coroutine (signal.emit_async (_concurrency = None)),
+                          'accepted')
+        self.assertEqual (cancelled, [True])
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -92,6 +92,11 @@ class AllTestCase (NotifyTestCase):
         self.assert_is_class       (GarbageCollectedError)
 
 
+    def test_bridge (self):
+        self.assert_is_class (SignalBridge,    False)
+        self.assert_is_class (QueueConnection)
+
+
     def test_condition (self):
         self.assert_is_class (AbstractCondition)
         self.assert_is_class (AbstractStateTrackingCondition)
@@ -100,6 +105,14 @@ class AllTestCase (NotifyTestCase):
         self.assert_is_class (WatcherCondition)
 
 
+    def test_executor (self):
+        self.assert_is_class (Future)
+        self.assert_is_class (TimeoutError)
+        self.assert_is_class (AbstractExecutor,   False)
+        self.assert_is_class (ThreadPoolExecutor, False)
+        self.assert_is_class (SerialExecutor,     False)
+
+
     def test_gc (self):
         self.assert_is_class (AbstractGCProtector, False)
         self.assert_is_class (StandardGCProtector, False)
@@ -117,10 +130,44 @@ class AllTestCase (NotifyTestCase):
         self.assert_is_class (FunctionalMediator)
 
 
+    def test_named (self):
+        self.assert_is_class (DeclaredSignal)
+        self.assert_is_class (SignalCollection)
+
+
+    def test_failure (self):
+        self.assert_is_class (FailureBudget, False)
+        self.assert_is_class (FailureStatistics)
+
+
+    def test_profiling (self):
+        self.assert_is_class (EmissionProfiler, False)
+        self.assert_is_class (HandlerStatistics)
+
+
+    def test_tracing (self):
+        self.assert_is_class (EmissionTracer, False)
+
+
+    def test_scheduler (self):
+        self.assert_is_class (AbstractScheduler,    False)
+        self.assert_is_class (ScheduledCall)
+        self.assert_is_class (TimerThreadScheduler, False)
+        self.assert_is_class (AsyncioScheduler,     False)
+        self.assert_is_class (ManualScheduler,      False)
+
+
     def test_signal (self):
         self.assert_is_class (AbstractSignal)
         self.assert_is_class (Signal)
         self.assert_is_class (CleanSignal)
+        self.assert_is_class (ThreadSafeSignal)
+        self.assert_is_class (ThreadSafeCleanSignal)
+        self.assert_is_class (KeyedSignal)
+        self.assert_is_class (QueuedSignal)
+        self.assert_is_class (DebouncedSignal)
+        self.assert_is_class (ThrottledSignal)
+        self.assert_is_class (Connection)
 
 
     def test_util (self):
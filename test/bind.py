@@ -29,11 +29,15 @@ if __name__ == '__main__':
     sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
 
 
+import copy
+import pickle
 import sys
 import unittest
 
 from notify.bind   import Binding, WeakBinding, RaisingWeakBinding, \
-                          CannotWeakReferenceError, GarbageCollectedError
+                          CannotWeakReferenceError, GarbageCollectedError, \
+                          HAVE_FAST_CALLS, _PYTHON_CALL_METHODS
+from notify.utils  import frozendict
 from test.__common import NotifyTestCase
 
 
@@ -249,6 +253,86 @@ class BindingTestCase (NotifyTestCase):
         self.assertRaises (GarbageCollectedError, method)
 
 
+    def test_garbage_collection_3 (self):
+        object  = Dummy ()
+        results = []
+        method  = WeakBinding (object.identity_function,
+                               callback = lambda reference: results.append (bool (method)))
+
+        del object
+        self.collect_garbage ()
+
+        self.assertEqual (results, [False])
+
+
+    def test_copying (self):
+        object = Dummy ()
+
+        for binding_type in (Binding, WeakBinding, RaisingWeakBinding):
+            for binding in (binding_type (object.identity_function),
+                            binding_type (object.identity_function, (1,)),
+                            binding_type (object.keyword_dict_function,
+                                          keywords = { 'a': 2 })):
+                copied = copy.copy (binding)
+
+                self.assert_(type (copied) is binding_type)
+                self.assertEqual (copied, binding)
+                self.assertEqual (copied (), binding ())
+
+
+    def test_fixed_argument_shapes (self):
+        def collect (*arguments, **keywords):
+            return arguments, keywords
+
+        for binding_type in (Binding, WeakBinding, RaisingWeakBinding):
+            for arguments, keywords in (((), None), ((1,), None), ((), { 'a': 2 }),
+                                        ((1,), { 'a': 2 }), ((1, frozendict (a = 2)), None),
+                                        ((frozendict (),), { 'a': 2 })):
+                binding = binding_type (collect, arguments, keywords = keywords)
+
+                self.assert_(type (binding) is binding_type)
+                self.assertEqual (binding._get_arguments (), arguments)
+                self.assertEqual (binding._get_keywords (),  keywords or {})
+                self.assertEqual (binding (3, b = 4),
+                                  (arguments + (3,), dict (keywords or {}, b = 4)))
+
+
+    def test_pickling (self):
+        for binding in (Binding (max), Binding (max, (1,)),
+                        Binding (max, (1,), { 'key': abs })):
+            # Objects with slots can only be pickled with protocol 2 and later.
+            for protocol in range (2, pickle.HIGHEST_PROTOCOL + 1):
+                copied = pickle.loads (pickle.dumps (binding, protocol))
+
+                self.assert_(type (copied) is Binding)
+                self.assertEqual (copied, binding)
+                self.assertEqual (copied (-5, 3), binding (-5, 3))
+
+
+    def test_subclassing (self):
+        class ArgumentsFirstBinding (Binding):
+            __slots__ = ()
+
+            def __init__(self, arguments, callable_object):
+                super (ArgumentsFirstBinding, self).__init__(callable_object, arguments)
+
+        binding = ArgumentsFirstBinding ((1,), max)
+
+        self.assert_(type (binding) is ArgumentsFirstBinding)
+        self.assertEqual (binding._get_arguments (), (1,))
+        self.assertEqual (binding (-5), 1)
+
+
+    def test_shared_reference (self):
+        object = Dummy ()
+
+        self.assert_(WeakBinding (object.identity_function)._object
+                     is WeakBinding (object.keyword_dict_function, (1,))._object)
+        self.assert_(WeakBinding (object.identity_function)._object
+                     is not WeakBinding (object.identity_function,
+                                         callback = lambda reference: None)._object)
+
+
 
 class BindingWrapTestCase (NotifyTestCase):
 
@@ -327,6 +411,148 @@ class BindingWrapTestCase (NotifyTestCase):
 
 
 
+class BindingCallTestCase (NotifyTestCase):
+
+    def test_fast_calls (self):
+        # The extension is optional, only check that it is used if it is available.
+        for class_name, binding_class in (('Binding', Binding), ('WeakBinding', WeakBinding)):
+            python_call = _PYTHON_CALL_METHODS[class_name]
+
+            if HAVE_FAST_CALLS:
+                self.assert_(binding_class.__dict__['__call__'] is not python_call)
+            else:
+                self.assert_(binding_class.__dict__['__call__'] is python_call)
+
+
+    def test_keywords (self):
+        keywords = { 'a': 1, 'b': 2 }
+        binding  = Binding (DUMMY.keyword_dict_function, (), keywords)
+
+        self.assertEqual (binding (b = 3, c = 4), { 'a': 1, 'b': 3, 'c': 4 })
+        self.assertEqual (keywords, { 'a': 1, 'b': 2 })
+
+
+    def test_many_arguments (self):
+        arguments = tuple (range (0, 20))
+
+        self.assertEqual (Binding (DUMMY.identity_function, arguments[:10]) (*arguments[10:]),
+                          arguments)
+        self.assertEqual (WeakBinding (Dummy.static_identity, arguments[:10]) (*arguments[10:]),
+                          arguments)
+
+
+    def test_overridden_getters (self):
+        class ArgumentBinding (Binding):
+            __slots__ = ()
+            def _get_arguments (self):
+                return ('overridden',)
+
+        class ObjectBinding (WeakBinding):
+            __slots__ = ()
+            def _get_object (self):
+                return 'overridden'
+
+        class Test (object):
+            def method (self, *arguments):
+                return (self,) + arguments
+
+        test = Test ()
+
+        self.assertEqual (ArgumentBinding (test.method, (1,)) (2),
+                          (test, 'overridden', 2))
+        self.assertEqual (ObjectBinding (test.method, (1,)) (2),
+                          ('overridden', 1, 2))
+
+
+    def test_python_implementation (self):
+        object   = Dummy ()
+        keywords = { 'a': 1 }
+
+        for binding, arguments, call_keywords in \
+                ((Binding     (object.identity_function, (1,)),                 (3, 4), {}),
+                 (Binding     (Dummy.static_identity, (1, 2)),                  (3, 4), {}),
+                 (WeakBinding (object.identity_function),                       (3, 4), {}),
+                 (WeakBinding (object.keyword_dict_function, (), None, keywords), (), { 'b': 2 }),
+                 (Binding     (object.keyword_dict_function, (), keywords),     (), { 'a': 2 }),
+                 (Binding     (Dummy.static_keyword_dict, (), keywords),        (), {}),
+                 (Binding     (dict, ([('b', 2)],), keywords),                  (), { 'c': 3 })):
+            if isinstance (binding, WeakBinding):
+                python_call = _PYTHON_CALL_METHODS['WeakBinding']
+            else:
+                python_call = _PYTHON_CALL_METHODS['Binding']
+
+            self.assertEqual (binding (*arguments, **call_keywords),
+                              python_call (binding, *arguments, **call_keywords))
+
+
+
+class BindingInterningTestCase (NotifyTestCase):
+
+    def test_interning (self):
+        object = Dummy ()
+
+        self.assert_(WeakBinding.wrap (object.identity_function, (1,))
+                     is WeakBinding.wrap (object.identity_function, (1,)))
+        self.assert_(WeakBinding.wrap (object.identity_function)
+                     is WeakBinding.wrap (object.identity_function))
+        self.assert_(WeakBinding.wrap (Dummy.static_identity, (1,), keywords = { 'a': 2 })
+                     is WeakBinding.wrap (Dummy.static_identity, (1,), keywords = { 'a': 2 }))
+
+
+    def test_not_interned (self):
+        object   = Dummy ()
+        callback = lambda reference: None
+
+        self.assert_(WeakBinding.wrap (object.identity_function, (1,))
+                     is not WeakBinding.wrap (object.identity_function, (2,)))
+        self.assert_(WeakBinding.wrap (object.identity_function, (1,))
+                     is not RaisingWeakBinding.wrap (object.identity_function, (1,)))
+        self.assert_(WeakBinding.wrap (object.identity_function, (1,), callback)
+                     is not WeakBinding.wrap (object.identity_function, (1,), callback))
+
+        # Unhashable arguments.
+        self.assert_(WeakBinding.wrap (object.identity_function, ([],))
+                     is not WeakBinding.wrap (object.identity_function, ([],)))
+        self.assertEqual (WeakBinding.wrap (object.identity_function, ([],)) (), [])
+
+        # Fixed arguments ending in a `frozendict' are not fixed keywords.
+        keywords = frozendict (a = 2)
+        self.assert_(WeakBinding.wrap (Dummy.static_keyword_dict, (1, keywords))
+                     is not WeakBinding.wrap (Dummy.static_keyword_dict, (1,), keywords = keywords))
+
+
+    def test_garbage_collection (self):
+        object  = Dummy ()
+        binding = WeakBinding.wrap (object.identity_function, (1,))
+
+        del object
+        self.collect_garbage ()
+
+        # Even if the new object gets the same id, it must get a new binding.
+        object = Dummy ()
+        self.assert_(not binding)
+        self.assert_(WeakBinding.wrap (object.identity_function, (1,)) is not binding)
+        self.assertEqual (WeakBinding.wrap (object.identity_function, (1,)) (2), (1, 2))
+
+
+    def test_hash (self):
+        object = Dummy ()
+
+        self.assertEqual (hash (Binding (object.identity_function)),
+                          hash (object.identity_function))
+        self.assertEqual (hash (WeakBinding (object.identity_function)),
+                          hash (object.identity_function))
+
+        binding = WeakBinding (object.identity_function, (1,))
+        _hash   = hash (binding)
+
+        del object
+        self.collect_garbage ()
+
+        self.assertEqual (hash (binding), _hash)
+
+
+
 if __name__ == '__main__':
     unittest.main ()
 
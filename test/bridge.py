@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+from multiprocessing.connection import Client, Listener
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from notify.bridge   import SignalBridge, QueueConnection
+from notify.signal   import AbstractSignal, Signal
+from notify.variable import Variable
+from test.__common   import NotifyTestCase, NotifyTestObject
+
+
+
+class SignalBridgeTestCase (NotifyTestCase):
+
+    def setUp (self):
+        super (SignalBridgeTestCase, self).setUp ()
+        self.here, self.there = multiprocessing.Pipe ()
+
+    def tearDown (self):
+        self.here.close ()
+        self.there.close ()
+        del self.here, self.there
+        super (SignalBridgeTestCase, self).tearDown ()
+
+
+    def test_signal (self):
+        test   = NotifyTestObject ()
+        local  = Signal ()
+        source = SignalBridge (self.here)
+        target = SignalBridge (self.there)
+
+        source.export_signal ('signal', local)
+        target.import_signal ('signal').connect (test.simple_keywords_handler)
+
+        local.emit (1, 'a')
+        local.emit (2, b = 3)
+
+        self.assertEqual (target.receive (5), 2)
+        self.assertEqual (target.receive (),  0)
+
+        self.assert_(source.unexport_signal ('signal', local))
+        self.assert_(not local.has_handlers ())
+
+        test.assert_results ((1, 'a', {}), (2, { 'b': 3 }))
+
+
+    def test_json_serializer (self):
+        test   = NotifyTestObject ()
+        local  = Signal ()
+        source = SignalBridge (self.here,  json)
+        target = SignalBridge (self.there, json)
+
+        source.export_signal ('signal', local)
+        target.import_signal ('signal').connect (test.simple_keywords_handler)
+
+        local.emit ([1, 2], b = 'x')
+        target.receive (5)
+
+        test.assert_results (([1, 2], { 'b': 'x' }))
+
+
+    def test_unserializable_arguments (self):
+        local  = Signal ()
+        source = SignalBridge (self.here)
+
+        source.export_signal ('signal', local)
+
+        original_handler = AbstractSignal.__dict__['exception_handler']
+        AbstractSignal.exception_handler = \
+            staticmethod (AbstractSignal.reraising_exception_handler)
+
+        try:
+            self.assertRaises (Exception, local.emit, lambda: None)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        self.assert_(not self.there.poll ())
+
+
+    def test_batching (self):
+        test   = NotifyTestObject ()
+        local  = Signal ()
+        source = SignalBridge (self.here, batch_size = 3)
+        target = SignalBridge (self.there)
+
+        self.assertRaises (ValueError, lambda: SignalBridge (self.here, batch_size = 0))
+
+        source.export_signal ('signal', local)
+        target.import_signal ('signal').connect (test.simple_handler)
+
+        local.emit (1)
+        local.emit (2)
+        self.assertEqual (target.receive (), 0)
+
+        local.emit (3)
+        local.emit (4)
+        self.assertEqual (target.receive (5), 3)
+
+        source.flush ()
+        self.assertEqual (target.receive (5), 1)
+
+        test.assert_results (1, 2, 3, 4)
+
+
+    def test_variable (self):
+        test     = NotifyTestObject ()
+        variable = Variable (1)
+        source   = SignalBridge (self.here)
+        target   = SignalBridge (self.there)
+
+        source.export_variable ('variable', variable)
+        variable.value = 2
+
+        target.receive (5)
+
+        # Importing after values have been received.
+        proxy = target.import_variable ('variable')
+        self.assertEqual (proxy.value, 2)
+
+        proxy.changed.connect (test.simple_handler)
+        variable.value = 3
+        variable.value = 4
+
+        target.receive (5)
+        self.assertEqual (proxy.value, 4)
+
+        self.assert_(source.unexport_variable ('variable', variable))
+        variable.value = 5
+
+        self.assertEqual (target.receive (), 0)
+        test.assert_results (3, 4)
+
+
+    def test_unknown_names (self):
+        local  = Signal ()
+        source = SignalBridge (self.here)
+        target = SignalBridge (self.there)
+
+        source.export_signal ('signal', local)
+        local.emit (1)
+
+        self.assertEqual (target.receive (5), 1)
+
+
+    def test_thread (self):
+        test     = NotifyTestObject ()
+        local    = Signal ()
+        received = threading.Event ()
+        source   = SignalBridge (self.here)
+        target   = SignalBridge (self.there)
+
+        source.export_signal ('signal', local)
+        remote = target.import_signal ('signal')
+        remote.connect (test.simple_handler)
+        remote.connect (lambda *arguments: received.set ())
+
+        target.start ()
+
+        local.emit (1)
+        received.wait (5)
+
+        target.close ()
+        source.close ()
+
+        test.assert_results (1)
+
+
+
+class BridgeConnectionTestCase (NotifyTestCase):
+
+    def test_queues (self):
+        test   = NotifyTestObject ()
+        local  = Signal ()
+        queue1 = queue.Queue ()
+        queue2 = queue.Queue ()
+        source = SignalBridge (QueueConnection (queue1, queue2))
+        target = SignalBridge (QueueConnection (queue2, queue1))
+
+        source.export_signal ('signal', local)
+        target.import_signal ('signal').connect (test.simple_handler)
+
+        local.emit (1)
+        self.assertEqual (target.receive (5), 1)
+
+        source.close ()
+        self.assertRaises (EOFError, target.receive, 5)
+
+        test.assert_results (1)
+
+
+    if NotifyTestCase.note_skipped_tests (hasattr (os, 'fork'),
+                                          NotifyTestCase.REASON_INVALID_FOR_IMPLEMENTATION):
+
+        def test_unix_socket (self):
+            test      = NotifyTestObject ()
+            local     = Signal ()
+            directory = tempfile.mkdtemp ()
+
+            try:
+                address  = os.path.join (directory, 'bridge')
+                listener = Listener (address, 'AF_UNIX')
+                client   = Client (address, 'AF_UNIX')
+                server   = listener.accept ()
+
+                try:
+                    source = SignalBridge (client)
+                    target = SignalBridge (server)
+
+                    source.export_signal ('signal', local)
+                    target.import_signal ('signal').connect (test.simple_handler)
+
+                    local.emit (1)
+                    local.emit (2)
+
+                    self.assertEqual (target.receive (5), 2)
+                finally:
+                    client.close ()
+                    server.close ()
+                    listener.close ()
+            finally:
+                shutil.rmtree (directory)
+
+            test.assert_results (1, 2)
+
+
+        def test_other_process (self):
+            here, there = multiprocessing.Pipe ()
+            process     = multiprocessing.Process (target = _double_requests,
+                                                   args   = (there, here))
+            process.start ()
+
+            # Otherwise the child would never see end of file.
+            there.close ()
+
+            try:
+                results = []
+                request = Signal ()
+                bridge  = SignalBridge (here)
+
+                bridge.export_signal ('request', request)
+                bridge.import_signal ('reply').connect (results.append)
+
+                request.emit (1)
+                request.emit (10)
+
+                while len (results) < 2 and bridge.receive (5):
+                    pass
+
+                bridge.close ()
+                self.assertEqual (results, [2, 20])
+            finally:
+                process.join (5)
+
+
+
+def _double_requests (connection, other_end):
+    other_end.close ()
+
+    bridge = SignalBridge (connection)
+    reply  = Signal ()
+
+    bridge.export_signal ('reply', reply)
+    bridge.import_signal ('request').connect (lambda value: reply.emit (value * 2))
+
+    try:
+        while True:
+            bridge.receive (None)
+    except EOFError:
+        pass
+
+
+
+if __name__ == '__main__':
+    unittest.main ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+import threading
+import unittest
+
+from notify.executor import AbstractExecutor, Future, SerialExecutor, ThreadPoolExecutor, \
+                            TimeoutError
+from test.__common   import NotifyTestCase
+
+
+
+class FutureTestCase (NotifyTestCase):
+
+    def test_result (self):
+        future = Future ()
+        self.assert_(not future.done ())
+
+        future.set_result (42)
+
+        self.assert_(future.done ())
+        self.assertEqual (future.result (), 42)
+        self.assertEqual (future.exception (), None)
+
+
+    def test_exception (self):
+        future = Future ()
+        future.set_exception (ValueError ('test'))
+
+        self.assert_(future.done ())
+        self.assertRaises (ValueError, future.result)
+        self.assert_(isinstance (future.exception (), ValueError))
+
+
+    def test_timeout (self):
+        future = Future ()
+        self.assertRaises (TimeoutError, future.result, 0.01)
+
+
+    def test_done_callback (self):
+        future  = Future ()
+        results = []
+
+        future.add_done_callback (lambda future: results.append (future.result ()))
+        self.assertEqual (results, [])
+
+        future.set_result (1)
+        self.assertEqual (results, [1])
+
+        future.add_done_callback (lambda future: results.append (future.result () + 1))
+        self.assertEqual (results, [1, 2])
+
+
+    def test_double_set (self):
+        future = Future ()
+        future.set_result (None)
+
+        self.assertRaises (ValueError, future.set_result, None)
+
+
+
+class ThreadPoolExecutorTestCase (NotifyTestCase):
+
+    def test_submit (self):
+        executor = ThreadPoolExecutor (2)
+
+        try:
+            futures = [executor.submit (pow, 2, k) for k in range (0, 10)]
+            self.assertEqual ([future.result (5) for future in futures],
+                              [2 ** k for k in range (0, 10)])
+        finally:
+            executor.shutdown ()
+
+
+    def test_exception (self):
+        executor = ThreadPoolExecutor (1)
+
+        try:
+            future = executor.submit (int, 'not a number')
+            self.assertRaises (ValueError, future.result, 5)
+        finally:
+            executor.shutdown ()
+
+
+    def test_bounded (self):
+        executor = ThreadPoolExecutor (3)
+        threads  = { }
+        lock     = threading.Lock ()
+
+        def note_thread ():
+            lock.acquire ()
+            threads[threading.currentThread ()] = True
+            lock.release ()
+
+        try:
+            for future in [executor.submit (note_thread) for k in range (0, 100)]:
+                future.result (5)
+
+            self.assert_(1 <= len (threads) <= 3)
+        finally:
+            executor.shutdown ()
+
+
+    def test_shutdown (self):
+        executor = ThreadPoolExecutor ()
+        executor.submit (pow, 2, 2).result (5)
+        executor.shutdown ()
+
+        self.assertRaises (RuntimeError, executor.submit, pow, 2, 2)
+
+
+    def test_invalid_max_workers (self):
+        self.assertRaises (ValueError, ThreadPoolExecutor, 0)
+
+
+
+class SerialExecutorTestCase (NotifyTestCase):
+
+    def test_order (self):
+        pool     = ThreadPoolExecutor (4)
+        executor = SerialExecutor (pool)
+        results  = []
+
+        try:
+            futures = [executor.submit (results.append, k) for k in range (0, 50)]
+            for future in futures:
+                future.result (5)
+
+            self.assertEqual (results, list (range (0, 50)))
+        finally:
+            pool.shutdown ()
+
+
+    def test_default_executor (self):
+        executor = SerialExecutor ()
+        self.assert_(executor.executor is None)
+
+        original_default         = AbstractExecutor.default
+        AbstractExecutor.default = ThreadPoolExecutor (1)
+
+        try:
+            self.assertEqual (executor.submit (pow, 2, 3).result (5), 8)
+        finally:
+            AbstractExecutor.default.shutdown ()
+            AbstractExecutor.default = original_default
+
+
+    def test_failing_executor (self):
+        pool = ThreadPoolExecutor (1)
+        pool.shutdown ()
+
+        executor = SerialExecutor (pool)
+        self.assertRaises (RuntimeError, executor.submit, pow, 2, 2)
+
+
+
+if __name__ == '__main__':
+    unittest.main ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+import unittest
+
+from notify.failure   import FailureBudget, FailureStatistics
+from notify.scheduler import ManualScheduler
+from notify.signal    import AbstractSignal, Signal, KeyedSignal
+from test.__common    import NotifyTestCase, NotifyTestObject
+
+
+
+def _failing_handler (*arguments):
+    raise ValueError
+
+
+
+class FailureBudgetTestCase (NotifyTestCase):
+
+    def setUp (self):
+        self.reports          = []
+        self.clock            = ManualScheduler ()
+        self.original_handler = AbstractSignal.__dict__['exception_handler']
+
+        super (FailureBudgetTestCase, self).setUp ()
+
+    def tearDown (self):
+        AbstractSignal.exception_handler = self.original_handler
+        super (FailureBudgetTestCase, self).tearDown ()
+
+
+    def install_budget (self, *arguments, **keywords):
+        def reporter (signal, exception, handler):
+            self.reports.append (handler)
+
+        budget = FailureBudget (reporter = reporter, timer = self.clock.time,
+                                *arguments, **keywords)
+
+        AbstractSignal.exception_handler = budget
+        return budget
+
+
+    def test_quarantine (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+        budget = self.install_budget (3, report_interval = None)
+
+        signal.connect (_failing_handler)
+        signal.connect (test.simple_handler)
+
+        for k in range (5):
+            signal.emit (k)
+
+        self.assert_(signal.is_blocked (_failing_handler))
+        self.assertEqual (budget.get_quarantined_handlers (signal), [_failing_handler])
+
+        statistics = budget.get_statistics (signal)
+        self.assertEqual (len (statistics), 1)
+        self.assertEqual ((statistics[0].num_failures, statistics[0].total_failures,
+                           statistics[0].num_reports, statistics[0].num_suppressed_reports),
+                          (3, 3, 2, 1))
+        self.assert_(statistics[0].quarantined)
+
+        # First failure and quarantining are reported.
+        self.assertEqual (self.reports, [_failing_handler] * 2)
+        test.assert_results (0, 1, 2, 3, 4)
+
+        self.assert_(budget.release (signal, _failing_handler))
+        self.assert_(not budget.release (signal, _failing_handler))
+        self.assert_(not signal.is_blocked (_failing_handler))
+        self.assertEqual (budget.get_statistics (), [])
+
+
+    def test_rate_limited_reports (self):
+        signal = Signal ()
+        budget = self.install_budget (None, report_interval = 10.0)
+
+        signal.connect (_failing_handler)
+
+        for k in range (20):
+            signal.emit ()
+            self.clock.advance (1.0)
+
+        statistics = budget.get_statistics (signal)[0]
+        self.assertEqual ((statistics.num_failures, statistics.num_reports,
+                           statistics.num_suppressed_reports, statistics.quarantined),
+                          (0, 2, 18, False))
+        self.assertEqual (len (self.reports), 2)
+
+
+    def test_failure_window (self):
+        signal = Signal ()
+        budget = self.install_budget (3, failure_window = 5.0)
+
+        signal.connect (_failing_handler)
+
+        for k in range (10):
+            signal.emit ()
+            signal.emit ()
+            self.clock.advance (10.0)
+
+        self.assert_(not signal.is_blocked (_failing_handler))
+        self.assertEqual (budget.get_statistics (signal)[0].total_failures, 20)
+
+        for k in range (3):
+            signal.emit ()
+
+        self.assert_(signal.is_blocked (_failing_handler))
+
+
+    def test_sliding_failure_window (self):
+        signal = Signal ()
+        budget = self.install_budget (3, failure_window = 10.0)
+
+        signal.connect (_failing_handler)
+
+        # There is never a long pause between failures, but there are at most two within
+        # any 10 seconds.
+        for k in range (20):
+            signal.emit ()
+            self.clock.advance (6.0)
+
+        self.assert_(not signal.is_blocked (_failing_handler))
+        self.assertEqual (budget.get_statistics (signal)[0].num_failures, 2)
+
+        signal.emit ()
+        signal.emit ()
+
+        self.assert_(signal.is_blocked (_failing_handler))
+        self.assertEqual (budget.get_statistics (signal)[0].num_failures, 3)
+
+
+    def test_signal_budget (self):
+        signal1 = Signal ()
+        signal2 = Signal ()
+        budget  = self.install_budget (5)
+
+        budget.set_max_failures (signal1, 1)
+        self.assertEqual (budget.get_max_failures (signal1), 1)
+        self.assertEqual (budget.get_max_failures (signal2), 5)
+        self.assertRaises (ValueError, budget.set_max_failures, signal2, 0)
+
+        signal1.connect (_failing_handler)
+        signal2.connect (_failing_handler)
+
+        signal1.emit ()
+        signal2.emit ()
+
+        self.assert_(signal1.is_blocked (_failing_handler))
+        self.assert_(not signal2.is_blocked (_failing_handler))
+
+        self.assertEqual (len (budget.get_statistics ()), 2)
+        budget.clear ()
+        self.assertEqual (budget.get_statistics (), [])
+
+
+    def test_keyed_signal (self):
+        signal = KeyedSignal ()
+        budget = self.install_budget (2)
+
+        signal.connect_key ('a', _failing_handler)
+
+        for k in range (3):
+            signal.emit ('a')
+
+        self.assertEqual (budget.get_statistics (signal)[0].total_failures, 2)
+        self.assertEqual (len (self.reports), 2)
+
+        self.assert_(budget.release (signal, _failing_handler))
+
+        signal.emit ('a')
+        self.assertEqual (budget.get_statistics (signal)[0].total_failures, 1)
+
+
+    def test_keyed_signal_release (self):
+        signal = KeyedSignal ()
+        budget = self.install_budget (1)
+
+        signal.connect_key ('a', _failing_handler)
+        signal.emit ('a')
+
+        # Blocked by the user, not by the budget: releasing must not undo this.
+        signal.connect_key ('b', _failing_handler)
+        signal.block_key ('b', _failing_handler)
+
+        self.assert_(budget.release (signal, _failing_handler))
+
+        signal.emit ('b')
+        self.assertEqual (budget.get_statistics (signal), [])
+
+        signal.emit ('a')
+        self.assertEqual (budget.get_statistics (signal)[0].total_failures, 1)
+
+
+    def test_non_errors (self):
+        signal = Signal ()
+        budget = self.install_budget (1)
+
+        def exiting_handler ():
+            raise SystemExit
+
+        signal.connect (exiting_handler)
+
+        self.assertRaises (SystemExit, signal.emit)
+        self.assertEqual (budget.get_statistics (), [])
+
+
+    def test_invalid_budget (self):
+        self.assertRaises (ValueError, FailureBudget, 0)
+        self.assertRaises (ValueError, FailureBudget, 1, failure_window = None)
+        self.assertRaises (ValueError, FailureBudget, 1, failure_window = 0)
+
+
+
+if __name__ == '__main__':
+    unittest.main ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+import copy
+import gc
+import pickle
+import unittest
+import weakref
+
+from notify.named  import DeclaredSignal, SignalCollection, _all_signals, \
+                          _connected_signals, _get_connected_signals
+from notify.signal import AbstractSignal, Signal
+from test.__common import NotifyTestCase, NotifyTestObject
+
+
+
+class _Document (object):
+
+    saved  = DeclaredSignal ('saved')
+    closed = DeclaredSignal ('closed', AbstractSignal.VALUE_LIST)
+
+
+class _SlottedDocument (object):
+
+    __slots__ = ('__weakref__',)
+
+    saved  = DeclaredSignal ('saved')
+
+
+def _count_connected_signals (owner):
+    signals = _get_connected_signals (owner, False)
+    if signals is None:
+        return 0
+    else:
+        return len (signals)
+
+
+
+class DeclaredSignalTestCase (NotifyTestCase):
+
+    def test_declaration (self):
+        self.assert_(isinstance (_Document.saved, DeclaredSignal))
+        self.assertEqual (_Document.saved.name, 'saved')
+
+        document = _Document ()
+
+        self.assert_(isinstance (document.saved, Signal))
+        self.assert_(document.saved.owner is document)
+        self.assert_(document.closed.accumulator is AbstractSignal.VALUE_LIST)
+        self.assertRaises (AttributeError, lambda: setattr (document, 'saved', Signal ()))
+
+
+    def test_emission (self):
+        test      = NotifyTestObject ()
+        document1 = _Document ()
+        document2 = _Document ()
+
+        document1.saved.connect (test.simple_handler, 1)
+        document2.saved.connect (test.simple_handler, 2)
+        document1.closed.connect (lambda: 'closed')
+
+        document1.saved ()
+        document2.saved ()
+        document1.saved.emit ()
+        document2.closed ()
+
+        test.assert_results (1, 2, 1)
+        self.assertEqual (document1.closed (), ['closed'])
+
+
+    def test_lazy_creation (self):
+        num_signals = len (_connected_signals)
+        document    = _Document ()
+
+        document.saved ()
+        self.assertEqual (_count_connected_signals (document), 0)
+        self.assertEqual (len ([key for key in _all_signals.keys () if key[0] == id (document)]),
+                          0)
+
+        signal = document.saved
+        self.assert_(document.saved is signal)
+
+        handler = lambda: None
+        signal.connect (handler)
+        self.assertEqual (_count_connected_signals (document), 1)
+
+        del signal
+        self.assert_(document.saved.has_handlers ())
+
+        document.saved.disconnect (handler)
+        self.assertEqual (_count_connected_signals (document), 0)
+        self.assertEqual (vars (document), {})
+        self.assertEqual (len (_connected_signals), num_signals)
+
+
+    def test_owner_garbage_collection (self):
+        document = _Document ()
+
+        document.saved.connect (lambda: None)
+        document.closed.connect (lambda: None)
+        self.assertEqual (_count_connected_signals (document), 2)
+
+        signal = document.saved
+
+        del document
+        self.collect_garbage ()
+
+        self.assert_(signal.owner is None)
+
+        # The signal must not be returned for a new object that may get the same id.
+        self.assert_(_Document ().saved is not signal)
+
+
+    def test_owner_reference_cycle (self):
+        def create_document ():
+            document = _Document ()
+            document.saved.connect (lambda: document.closed ())
+
+            return weakref.ref (document)
+
+        reference = create_document ()
+        gc.collect ()
+
+        self.assert_(reference () is None)
+
+
+    def test_owner_copy (self):
+        test     = NotifyTestObject ()
+        document = _Document ()
+        document.saved.connect (test.simple_handler, 1)
+
+        document_copy = copy.copy (document)
+        document_copy.saved.connect (test.simple_handler, 2)
+
+        document.saved ()
+        document_copy.saved ()
+
+        test.assert_results (1, 2)
+        self.assertEqual (_count_connected_signals (document),      1)
+        self.assertEqual (_count_connected_signals (document_copy), 1)
+
+
+    def test_owner_deep_copy (self):
+        test     = NotifyTestObject ()
+        document = _Document ()
+        document.saved.connect (test.simple_handler, 1)
+
+        document_copy = copy.deepcopy (document)
+        self.assertEqual (_count_connected_signals (document_copy), 0)
+
+        document_copy.saved.connect (test.simple_handler, 2)
+
+        document.saved ()
+        document_copy.saved ()
+
+        test.assert_results (1, 2)
+        self.assertEqual (_count_connected_signals (document),      1)
+        self.assertEqual (_count_connected_signals (document_copy), 1)
+
+
+    def test_owner_pickling (self):
+        document = _Document ()
+        document.saved.connect (lambda: None)
+
+        document_copy = pickle.loads (pickle.dumps (document, pickle.HIGHEST_PROTOCOL))
+
+        self.assert_(not document_copy.saved.has_handlers ())
+        self.assertEqual (_count_connected_signals (document_copy), 0)
+
+        document_copy.saved.connect (lambda: None)
+        self.assertEqual (_count_connected_signals (document_copy), 1)
+
+
+    def test_owner_without_dictionary (self):
+        num_signals = len (_connected_signals)
+        document    = _SlottedDocument ()
+
+        handler = lambda: None
+        document.saved.connect (handler)
+        self.assertEqual (len (_connected_signals), num_signals + 1)
+
+        document.saved.disconnect (handler)
+        self.assertEqual (len (_connected_signals), num_signals)
+
+        document.saved.connect (handler)
+        self.assertEqual (len (_connected_signals), num_signals + 1)
+
+        del document
+        self.collect_garbage ()
+
+        self.assertEqual (len (_connected_signals), num_signals)
+
+
+
+class SignalCollectionTestCase (NotifyTestCase):
+
+    def test_collection (self):
+        test       = NotifyTestObject ()
+        collection = SignalCollection ()
+
+        collection['create'].connect (test.simple_handler)
+        collection['create'] (1, 2)
+        collection['delete'] ()
+
+        signal = collection['create']
+        self.assert_(collection['create'] is signal)
+        self.assert_(signal.owner is collection)
+
+        signal (3)
+
+        test.assert_results ((1, 2), 3)
+        self.assertEqual (collection.get_connected_names (), ['create'])
+
+
+    def test_restricted_names (self):
+        collection = SignalCollection (['create', 'delete'])
+
+        self.assert_('create' in collection)
+        self.assert_('update' not in collection)
+        self.assert_(isinstance (collection['delete'], Signal))
+        self.assertRaises (KeyError, lambda: collection['update'])
+
+
+
+if __name__ == '__main__':
+    unittest.main ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+import time
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from notify.profiling import EmissionProfiler, HandlerStatistics
+from notify.signal    import AbstractSignal, Signal, CleanSignal, ThreadSafeSignal, \
+                             ThreadSafeCleanSignal, KeyedSignal, QueuedSignal
+from test.__common    import NotifyTestCase, NotifyTestObject
+
+
+
+def _slow_handler ():
+    time.sleep (0.01)
+
+def _fast_handler ():
+    pass
+
+
+
+class EmissionProfilerTestCase (NotifyTestCase):
+
+    def test_statistics (self):
+        test1    = NotifyTestObject ()
+        test2    = NotifyTestObject ()
+        signal   = Signal ()
+        profiler = EmissionProfiler ()
+
+        signal.connect (_fast_handler)
+        signal.connect (_slow_handler)
+        signal.connect (test1.simple_handler, 1)
+        signal.connect (test2.simple_handler, 2)
+
+        signal.emit ()
+
+        profiler.enable ()
+        self.assert_(profiler.is_enabled ())
+
+        signal.emit ()
+        signal.emit ()
+
+        profiler.disable ()
+        signal.emit ()
+
+        slowest = profiler.get_slowest_handlers (signal, 2)
+        self.assertEqual (len (slowest), 2)
+        self.assert_(slowest[0].function is _slow_handler)
+        self.assertEqual (slowest[0].num_calls, 2)
+        self.assert_(slowest[0].average_time >= 0.005)
+        self.assertEqual (sum (slowest[0].histogram), 2)
+
+        # Both method handlers share statistics, since their objects are of the same class.
+        statistics = [entry for entry in profiler.get_statistics (signal)
+                      if entry.object_class is NotifyTestObject]
+        self.assertEqual (len (statistics), 1)
+        self.assertEqual (statistics[0].num_calls, 4)
+
+        self.assertEqual (profiler.get_profiled_signals (), [signal])
+        test1.assert_results (1, 1, 1, 1)
+        test2.assert_results (2, 2, 2, 2)
+
+
+    def test_emission_semantics (self):
+        signal   = Signal (AbstractSignal.VALUE_LIST)
+        profiler = EmissionProfiler ()
+
+        def stopping_handler ():
+            signal.stop_emission ()
+            return 2
+
+        signal.connect (lambda: 1)
+        signal.connect (stopping_handler)
+        signal.connect (lambda: self.fail ())
+
+        profiler.enable ()
+
+        try:
+            self.assertEqual (signal.emit (), [1, 2])
+            self.assertEqual (signal.emission_level, 0)
+        finally:
+            profiler.disable ()
+
+        self.assertEqual (len (profiler.get_statistics (signal)), 2)
+
+
+    def test_keyed_signal (self):
+        test     = NotifyTestObject ()
+        signal   = KeyedSignal (AbstractSignal.VALUE_LIST)
+        profiler = EmissionProfiler ()
+
+        signal.connect_key ('a', test.simple_handler, 1)
+        signal.connect_key ('b', test.simple_handler, 2)
+        signal.connect (lambda key: key)
+
+        profiler.enable ()
+
+        try:
+            self.assertEqual (signal.emit ('a'), [None, 'a'])
+            self.assertEqual (signal.emit ('c'), ['c'])
+        finally:
+            profiler.disable ()
+
+        statistics = profiler.get_statistics (signal)
+        self.assertEqual (sorted ([entry.num_calls for entry in statistics]), [1, 2])
+        test.assert_results ((1, 'a'))
+
+
+    def test_batch (self):
+        test     = NotifyTestObject ()
+        signal   = Signal (AbstractSignal.VALUE_LIST)
+        profiler = EmissionProfiler ()
+
+        signal.connect (test.simple_handler)
+        signal.connect_batch (lambda batch: [len (batch)] * len (batch))
+
+        profiler.enable ()
+
+        try:
+            signal.emit_many ([(1,), (2,), (3,)])
+            self.assertEqual (signal.emit_many ([(4,), (5,)], reduce = True),
+                              [None, None, 2, 2])
+            signal.emit (6)
+        finally:
+            profiler.disable ()
+
+        # The batch handler is called once per batch, including single emission.
+        statistics = profiler.get_statistics (signal)
+        self.assertEqual (sorted ([entry.num_calls for entry in statistics]), [3, 6])
+        test.assert_results (1, 2, 3, 4, 5, 6)
+
+
+    def test_emit_iter (self):
+        signal   = Signal ()
+        profiler = EmissionProfiler ()
+
+        signal.connect (lambda: 1)
+        signal.connect (_fast_handler)
+        signal.connect (lambda: 3)
+
+        profiler.enable ()
+
+        try:
+            iterator = signal.emit_iter ()
+            self.assertEqual (next (iterator), 1)
+            iterator.close ()
+
+            self.assertEqual (list (signal.emit_iter ()), [1, None, 3])
+        finally:
+            profiler.disable ()
+
+        statistics = profiler.get_statistics (signal)
+        self.assertEqual (sorted ([entry.num_calls for entry in statistics]), [1, 1, 2])
+
+
+    def test_keyed_signal_batch (self):
+        test     = NotifyTestObject ()
+        signal   = KeyedSignal (AbstractSignal.VALUE_LIST)
+        profiler = EmissionProfiler ()
+
+        signal.connect_key ('a', test.simple_handler, 1)
+        signal.connect (lambda key: key)
+
+        profiler.enable ()
+
+        try:
+            signal.emit_many ([('a',), ('b',)])
+            self.assertEqual (signal.emit_many ([('a',), ('b',)], reduce = True),
+                              [None, 'a', 'b'])
+        finally:
+            profiler.disable ()
+
+        statistics = profiler.get_statistics (signal)
+        self.assertEqual (sorted ([entry.num_calls for entry in statistics]), [2, 4])
+        test.assert_results ((1, 'a'), (1, 'a'))
+
+
+    def test_signal_classes (self):
+        signals  = [signal_class () for signal_class in (Signal, CleanSignal, QueuedSignal,
+                                                         ThreadSafeSignal, ThreadSafeCleanSignal)]
+        profiler = EmissionProfiler ()
+
+        for signal in signals:
+            signal.connect (_fast_handler)
+
+        profiler.enable ()
+
+        try:
+            for signal in signals:
+                signal.emit ()
+        finally:
+            profiler.disable ()
+
+        for signal in signals:
+            statistics = profiler.get_statistics (signal)
+            self.assertEqual ([entry.num_calls for entry in statistics], [1])
+
+
+    def test_restoring_methods (self):
+        emit      = Signal.__dict__['emit']
+        _emit     = Signal.__dict__['_emit']
+        emit_many = Signal.__dict__['emit_many']
+        profiler1 = EmissionProfiler ()
+        profiler2 = EmissionProfiler ()
+
+        profiler1.enable ()
+        profiler2.enable ()
+        profiler1.disable ()
+
+        try:
+            self.assert_(Signal.__dict__['_emit'] is not _emit)
+        finally:
+            profiler2.disable ()
+
+        self.assert_(Signal.__dict__['emit'] is emit)
+        self.assert_(Signal.__dict__['_emit'] is _emit)
+        self.assert_(Signal.__dict__['emit_many'] is emit_many)
+
+
+    def test_dump (self):
+        signal   = Signal ()
+        profiler = EmissionProfiler ()
+        stream   = StringIO ()
+
+        signal.connect (_fast_handler)
+
+        profiler.enable ()
+        signal.emit ()
+        profiler.disable ()
+
+        profiler.dump (stream = stream)
+        self.assert_('_fast_handler' in stream.getvalue ())
+
+        profiler.clear ()
+        self.assertEqual (profiler.get_statistics (signal), [])
+
+
+    def test_histogram (self):
+        statistics = HandlerStatistics (_fast_handler, None)
+
+        statistics._add_call (0.0)
+        statistics._add_call (0.005)
+        statistics._add_call (100.0)
+
+        self.assertEqual (statistics.histogram, [1, 0, 0, 0, 1, 0, 0, 1])
+        self.assertEqual (statistics.max_time, 100.0)
+
+
+
+if __name__ == '__main__':
+    unittest.main ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+import threading
+import unittest
+
+from notify.scheduler import ManualScheduler, TimerThreadScheduler
+from test.__common    import NotifyTestCase
+
+
+
+class ManualSchedulerTestCase (NotifyTestCase):
+
+    def test_advance (self):
+        scheduler = ManualScheduler ()
+        results   = []
+
+        scheduler.call_later (2, results.append, 2)
+        scheduler.call_later (1, results.append, 1)
+        scheduler.call_later (1, results.append, 'also 1')
+
+        scheduler.advance (0.5)
+        self.assertEqual (results, [])
+
+        scheduler.advance (1)
+        self.assertEqual (results, [1, 'also 1'])
+        self.assertEqual (scheduler.time (), 1.5)
+
+        scheduler.advance (1)
+        self.assertEqual (results, [1, 'also 1', 2])
+        self.assertEqual (scheduler.count_pending_calls (), 0)
+
+
+    def test_cancel (self):
+        scheduler = ManualScheduler ()
+        results   = []
+
+        call = scheduler.call_later (1, results.append, 1)
+        scheduler.call_later (2, results.append, 2)
+
+        call.cancel ()
+        self.assert_(call.is_cancelled ())
+        self.assertEqual (scheduler.count_pending_calls (), 1)
+
+        scheduler.advance (5)
+        self.assertEqual (results, [2])
+
+
+    def test_nested_scheduling (self):
+        scheduler = ManualScheduler ()
+        results   = []
+
+        def reschedule (k):
+            results.append ((k, scheduler.time ()))
+            if k < 3:
+                scheduler.call_later (1, reschedule, k + 1)
+
+        scheduler.call_later (1, reschedule, 1)
+        scheduler.advance (10)
+
+        self.assertEqual (results, [(1, 1), (2, 2), (3, 3)])
+        self.assertEqual (scheduler.time (), 10)
+
+
+
+class TimerThreadSchedulerTestCase (NotifyTestCase):
+
+    def test_call_later (self):
+        scheduler = TimerThreadScheduler ()
+        results   = []
+        done      = threading.Event ()
+
+        def finish ():
+            results.append ('finish')
+            done.set ()
+
+        try:
+            scheduler.call_later (0.02, finish)
+            scheduler.call_later (0.01, results.append, 1)
+            scheduler.call_later (0,    results.append, 0)
+            scheduler.call_later (0.01, results.append, 2).cancel ()
+
+            done.wait (5)
+            self.assertEqual (results, [0, 1, 'finish'])
+        finally:
+            scheduler.shutdown ()
+
+
+    def test_shutdown (self):
+        scheduler = TimerThreadScheduler ()
+        results   = []
+
+        scheduler.call_later (10, results.append, 1)
+        scheduler.shutdown ()
+
+        self.assertEqual (results, [])
+        self.assertRaises (RuntimeError, scheduler.call_later, 0, results.append, 2)
+
+
+
+if __name__ == '__main__':
+    unittest.main ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
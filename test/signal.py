@@ -29,10 +29,24 @@ if __name__ == '__main__':
     sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
 
 
+import sys
+import threading
+import time
 import unittest
 
-from notify.signal import AbstractSignal, Signal
-from test.__common import NotifyTestCase, NotifyTestObject
+from notify.executor  import AbstractExecutor, ThreadPoolExecutor
+from notify.scheduler import ManualScheduler
+from notify.signal    import AbstractSignal, Signal, CleanSignal, ThreadSafeSignal, \
+                             ThreadSafeCleanSignal, KeyedSignal, QueuedSignal, Connection, \
+                             DebouncedSignal, ThrottledSignal, HAVE_FAST_EMISSION, \
+                             _PYTHON_EMISSION_METHODS, _object_connections
+from notify.variable  import Variable
+from test.__common    import NotifyTestCase, NotifyTestObject
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
 
 
 
@@ -333,12 +347,11 @@ class RecursiveEmissionSignalTestCase (NotifyTestCase):
         test.signal.connect (test.connecting_recursive_handler)
         test.signal.emit (0)
 
+        # Handlers connected during an emission are not called by it, only by emissions
+        # started afterwards.
         test.assert_results (0, 1, 2, 3, 4,
-                             104, 104, 104,
-                             103, 103, 103,
-                             102, 102, 102,
-                             101, 101, 101,
-                             100, 100, 100)
+                             104, 104,
+                             103)
 
 
     def test_connect_in_recursive_emission_2 (self):
@@ -348,7 +361,7 @@ class RecursiveEmissionSignalTestCase (NotifyTestCase):
         test.signal.emit (0)
 
         test.assert_results (0, 1, 2, 3, 4,
-                             104, 103, 102, 101, 100)
+                             104, 103)
 
 
     def test_disconnect_in_recursive_emission_1 (self):
@@ -635,6 +648,30 @@ class HandlerGarbageCollectionTestCase (NotifyTestCase):
         test.assert_results (1)
 
 
+    def test_batch_handler_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        signal.connect_batch (handler.simple_handler)
+
+        connection = Connection (signal, signal._handlers)
+        signal.emit (1)
+
+        self.assert_(connection.is_connected ())
+
+        del handler
+        self.collect_garbage ()
+
+        self.assert_(not connection.is_connected ())
+        self.assert_(signal._handlers is not None)
+
+        signal.emit (2)
+
+        self.assert_(signal._handlers is None)
+        test.assert_results ([(1,)])
+
+
     def test_handler_garbage_collection_2 (self):
         test   = NotifyTestObject ()
         signal = Signal ()
@@ -691,6 +728,215 @@ class HandlerGarbageCollectionTestCase (NotifyTestCase):
         test.assert_results (101, 102)
 
 
+    def test_handler_garbage_collection_4 (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (test.simple_handler)
+        signal.connect (handler.simple_handler)
+
+        handlers = signal._handlers
+
+        signal.emit (1)
+        signal.collect_garbage ()
+
+        # Nothing has been garbage-collected, so handlers must be left alone.
+        self.assert_(signal._handlers is handlers)
+
+        del handler
+        self.collect_garbage ()
+
+        signal.collect_garbage ()
+
+        self.assertEqual (len (signal._handlers), 1)
+        test.assert_results (1, 1)
+
+
+    def test_clean_signal_sweeping (self):
+        test   = NotifyTestObject ()
+        signal = CleanSignal ()
+
+        handlers = [HandlerGarbageCollectionTestCase.HandlerObject (test) for k in range (3)]
+        for handler in handlers:
+            signal.connect (handler.simple_handler)
+
+        self.assert_(not signal.deferred_sweep)
+        self.assertEqual ((signal.num_sweeps, signal.num_swept_handlers), (0, 0))
+
+        del handler
+        del handlers[:2]
+        self.collect_garbage ()
+
+        # The first garbage-collected handler is not worth a sweep on its own.
+        self.assertEqual (len (signal._handlers), 1)
+        self.assertEqual ((signal.num_sweeps, signal.num_swept_handlers), (1, 2))
+
+
+    def test_deferred_sweep_1 (self):
+        test   = NotifyTestObject ()
+        signal = CleanSignal (deferred_sweep = True)
+
+        handlers = [HandlerGarbageCollectionTestCase.HandlerObject (test) for k in range (3)]
+        for handler in handlers:
+            signal.connect (handler.simple_handler)
+
+        del handler
+        del handlers[:2]
+        self.collect_garbage ()
+
+        self.assertEqual (len (signal._handlers), 3)
+
+        signal.emit (1)
+
+        self.assertEqual (len (signal._handlers), 1)
+        self.assertEqual ((signal.num_sweeps, signal.num_swept_handlers), (1, 2))
+        test.assert_results (1)
+
+
+    def test_deferred_sweep_2 (self):
+        test    = NotifyTestObject ()
+        signal1 = CleanSignal (deferred_sweep = True)
+        signal2 = ThreadSafeCleanSignal (deferred_sweep = True)
+        signal3 = CleanSignal (deferred_sweep = True)
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal1.connect (handler.simple_handler)
+        signal1.connect (test.simple_handler)
+        signal2.connect (handler.simple_handler)
+        signal3.connect (test.simple_handler)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assertEqual (CleanSignal.collect_deferred_garbage (), 2)
+        self.assertEqual (CleanSignal.collect_deferred_garbage (), 0)
+
+        self.assertEqual (len (signal1._handlers), 1)
+        self.assert_(signal2._handlers is None)
+        self.assertEqual (signal3.num_sweeps, 0)
+
+
+    def test_default_deferred_sweep (self):
+        test    = NotifyTestObject ()
+        signal1 = CleanSignal ()
+        signal2 = CleanSignal (deferred_sweep = False)
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal1.connect (handler.simple_handler)
+        signal2.connect (handler.simple_handler)
+
+        CleanSignal.default_deferred_sweep = True
+
+        try:
+            self.assert_(signal1.deferred_sweep)
+            self.assert_(not signal2.deferred_sweep)
+
+            del handler
+            self.collect_garbage ()
+
+            self.assert_(signal1._handlers is not None)
+            self.assert_(signal2._handlers is None)
+        finally:
+            CleanSignal.default_deferred_sweep = False
+
+        signal1.collect_garbage ()
+        self.assert_(signal1._handlers is None)
+
+
+    def test_disconnect_object_1 (self):
+        test    = NotifyTestObject ()
+        signal1 = CleanSignal ()
+        signal2 = ThreadSafeCleanSignal ()
+        signal3 = Signal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal1.connect (handler.simple_handler)
+        signal1.connect (test.simple_handler)
+        signal1.connect (handler.simple_handler, 'a')
+        signal2.connect_batch (handler.simple_handler)
+        signal3.connect (handler.simple_handler)
+
+        self.assertEqual (CleanSignal.disconnect_object (handler), 3)
+        self.assertEqual (CleanSignal.disconnect_object (handler), 0)
+        self.assertEqual (CleanSignal.disconnect_object (test),    1)
+
+        self.assert_(signal1._handlers is None)
+        self.assert_(signal2._handlers is None)
+
+        # Only clean signals are affected.
+        self.assert_(signal3.is_connected (handler.simple_handler))
+
+
+    def test_disconnect_object_2 (self):
+        test    = NotifyTestObject ()
+        signal  = CleanSignal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (test.simple_handler)
+        for k in range (20):
+            signal.connect (handler.simple_handler, k)
+
+        signal.disconnect (handler.simple_handler, 5)
+
+        self.assertEqual (CleanSignal.disconnect_object (handler), 19)
+        self.assertEqual (len (signal._handlers), 1)
+        self.assertEqual ((signal.num_sweeps, signal.num_swept_handlers), (1, 20))
+        self.assert_(not signal.is_connected (handler.simple_handler, 10))
+
+        signal.emit (1)
+        test.assert_results (1)
+
+        # The object is not forgotten, it can be connected again.
+        signal.connect (handler.simple_handler)
+        signal.emit (2)
+        test.assert_results (1, 2, 2)
+
+
+    def test_object_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = CleanSignal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (test.simple_handler)
+        for k in range (20):
+            signal.connect (handler.simple_handler)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assertEqual (len (signal._handlers), 1)
+        self.assertEqual ((signal.num_sweeps, signal.num_swept_handlers), (1, 20))
+
+
+    def test_object_connection_pruning (self):
+        test    = NotifyTestObject ()
+        signal  = CleanSignal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        for k in range (100):
+            signal.connect (handler.simple_handler)
+            signal.disconnect (handler.simple_handler)
+
+        for k in range (100):
+            CleanSignal ().connect (handler.simple_handler)
+
+        signal.connect (handler.simple_handler)
+
+        record = _object_connections[id (handler)]
+        self.assert_(len (record._ObjectConnections__connections) < 20)
+
+        self.assertEqual (CleanSignal.disconnect_object (handler), 1)
+        self.assert_(signal._handlers is None)
+
+
 
 class ExoticSignalTestCase (NotifyTestCase):
 
@@ -759,11 +1005,1591 @@ class ExoticSignalTestCase (NotifyTestCase):
         test.assert_results (1, 1, 4, 5)
 
 
+    def test_disconnect_in_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
 
-import __future__
+        signal.connect (lambda *ignored: signal.disconnect (test.simple_handler))
+        signal.connect (test.simple_handler)
 
-if NotifyTestCase.note_skipped_tests ('with_statement' in __future__.all_feature_names):
-    from test._2_5.signal import SignalContextManagerTestCase
+        signal.emit (1)
+        signal.emit (2)
+
+        test.assert_results ()
+
+
+    def test_block_many_handlers (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        for k in range (0, 10):
+            signal.connect (test.simple_handler, k)
+
+        for k in range (0, 10, 2):
+            signal.block (test.simple_handler, k)
+
+        signal.emit ('a')
+
+        signal.unblock (test.simple_handler, 4)
+        signal.emit ('b')
+
+        test.assert_results ((1, 'a'), (3, 'a'), (5, 'a'), (7, 'a'), (9, 'a'),
+                             (1, 'b'), (3, 'b'), (4, 'b'), (5, 'b'), (7, 'b'), (9, 'b'))
+
+
+    def test_overridden_emission (self):
+        class LoggingSignal (Signal):
+            __slots__ = ()
+
+            def _emit (self, *arguments, **keywords):
+                emitted.append (arguments)
+                return super (LoggingSignal, self)._emit (*arguments, **keywords)
+
+        test    = NotifyTestObject ()
+        signal  = LoggingSignal ()
+        emitted = []
+
+        signal.connect (test.simple_handler)
+        signal.emit (1)
+        signal (2)
+
+        self.assertEqual    (emitted, [(1,), (2,)])
+        test.assert_results (1, 2)
+
+
+
+class HandlerStorageTestCase (NotifyTestCase):
+
+    def test_single_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, 'a')
+        self.assert_(not isinstance (signal._handlers, tuple))
+        self.assertEqual (len (signal._handlers), 1)
+
+        signal.connect (test.simple_handler, 'b', _priority = 1)
+        self.assert_(isinstance (signal._handlers, tuple))
+
+        signal.emit (1)
+
+        self.assert_(signal.disconnect (test.simple_handler, 'b'))
+        signal.collect_garbage ()
+        self.assert_(not isinstance (signal._handlers, tuple))
+
+        self.assert_(signal.block (test.simple_handler, 'a'))
+        signal.emit (2)
+        self.assert_(signal.unblock (test.simple_handler, 'a'))
+        signal.emit (3)
+
+        self.assert_(signal.disconnect (test.simple_handler, 'a'))
+        self.assert_(signal._handlers is None)
+
+        test.assert_results (('b', 1), ('a', 1), ('a', 3))
+
+
+    def test_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (test.simple_handler)
+        signal.connect (handler.simple_handler)
+
+        del handler
+        self.collect_garbage ()
+
+        signal.emit (1)
+
+        self.assert_(not isinstance (signal._handlers, tuple))
+        test.assert_results (1)
+
+
+    def test_handler_index (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        for k in range (0, 20):
+            signal.connect (test.simple_handler, k)
+
+        self.assert_(signal._handler_index is not None)
+
+        self.assert_(signal.is_connected (test.simple_handler, 5))
+        self.assert_(not signal.is_connected (test.simple_handler, 20))
+        self.assert_(not signal.is_connected (test.simple_handler))
+
+        self.assert_(not signal.connect_safe (test.simple_handler, 5))
+        self.assert_(signal.connect_safe (test.simple_handler, 20))
+
+        self.assert_(signal.block (test.simple_handler, 5))
+        self.assert_(signal.is_blocked (test.simple_handler, 5))
+        self.assert_(signal.disconnect (test.simple_handler, 6))
+        self.assert_(not signal.is_connected (test.simple_handler, 6))
+
+        signal.emit ()
+        self.assertEqual (test.results, [k for k in range (0, 21) if k not in (5, 6)])
+
+        for k in range (0, 21):
+            signal.disconnect_all (test.simple_handler, k)
+
+        self.assert_(signal._handlers is None)
+        self.assert_(signal._handler_index is None)
+
+
+    def test_handler_index_priority (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        for k in range (0, 20):
+            signal.connect (test.simple_handler, k)
+
+        signal.connect (test.simple_handler, 'a', _priority = 1)
+        signal.connect (test.simple_handler, 'a', _priority = -1)
+        signal.connect (test.simple_handler, 'a')
+
+        # Must disconnect the last one in emission order, i.e. with priority -1.
+        self.assert_(signal.disconnect (test.simple_handler, 'a'))
+
+        signal.emit ()
+        self.assertEqual (test.results, ['a'] + list (range (0, 20)) + ['a'])
+
+
+    def test_handler_index_blocking (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        for k in range (0, 20):
+            signal.connect (test.simple_handler, k)
+
+        signal.block (test.simple_handler, 5)
+        signal.block (test.simple_handler, 5)
+        signal.connect (test.simple_handler, 5)
+
+        signal.emit ()
+        signal.unblock (test.simple_handler, 5)
+        signal.emit ()
+        signal.unblock (test.simple_handler, 5)
+        signal.emit ()
+
+        numbers = [k for k in range (0, 20) if k != 5]
+        self.assertEqual (test.results, numbers + numbers + list (range (0, 20)) + [5])
+
+
+    def test_handler_index_connection_cost (self):
+        class ComparedHandler (object):
+            def __call__(self):
+                pass
+            def __eq__(self, other):
+                num_comparisons[0] += 1
+                return self is other
+            def __ne__(self, other):
+                return not self.__eq__(other)
+            def __hash__(self):
+                return id (self)
+
+        signal          = Signal ()
+        handlers        = [ComparedHandler () for k in range (0, 50)]
+        num_comparisons = [0]
+
+        for handler in handlers:
+            signal.connect (handler)
+            signal.block (handler)
+
+        num_comparisons[0] = 0
+        signal.connect (handlers[-1])
+
+        # Connecting must not compare the handler with all connected ones.
+        self.assert_(num_comparisons[0] <= 2)
+        self.assertEqual (signal.count_handlers (), 51)
+
+
+    def test_handler_index_unhashable (self):
+        class UnhashableHandler (object):
+            __hash__ = None
+            def __call__(self):
+                pass
+
+        test      = NotifyTestObject ()
+        signal    = Signal ()
+        handler   = UnhashableHandler ()
+
+        for k in range (0, 20):
+            signal.connect (test.simple_handler, k)
+
+        signal.connect (handler)
+        signal.connect (test.simple_handler, [])
+
+        self.assert_(signal.is_connected (handler))
+        self.assert_(signal.is_connected (test.simple_handler, []))
+        self.assert_(not signal.is_connected (test.simple_handler, 20))
+
+        self.assert_(signal.disconnect (handler))
+        self.assert_(signal.disconnect (test.simple_handler, []))
+        self.assert_(not signal.is_connected (handler))
+
+
+    def test_handler_index_garbage_collection (self):
+        test    = NotifyTestObject ()
+        signal  = Signal ()
+        objects = [HandlerGarbageCollectionTestCase.HandlerObject (test)
+                   for k in range (0, 20)]
+
+        for object in objects:
+            signal.connect (object.simple_handler)
+
+        self.assert_(signal._handler_index is not None)
+
+        del object
+        del objects[10:]
+        self.collect_garbage ()
+
+        signal.collect_garbage ()
+        self.assertEqual (signal.count_handlers (), 10)
+        self.assert_(signal._handler_index is None)
+
+        for object in objects:
+            self.assert_(signal.is_connected (object.simple_handler))
+
+
+    def test_python_emission (self):
+        signal = PythonEmissionSignalTestCase.PythonSignal (AbstractSignal.VALUE_LIST)
+        signal.connect (lambda: 1)
+
+        self.assertEqual (signal.emit (), [1])
+        self.assertEqual (list (signal.emit_iter ()), [1])
+
+
+
+class ConnectionHandleTestCase (NotifyTestCase):
+
+    def test_disconnect (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        connection1 = signal.connect_handle (test.simple_handler, 'a')
+        connection2 = signal.connect_handle (test.simple_handler, 'a')
+
+        self.assert_(connection1.signal is signal)
+        self.assert_(connection1.is_connected ())
+
+        signal.emit (1)
+
+        self.assert_(connection1.disconnect ())
+        self.assert_(not connection1.disconnect ())
+        self.assert_(not connection1.is_connected ())
+        self.assert_(connection1.handler is None)
+        self.assert_(connection2.is_connected ())
+
+        signal.emit (2)
+
+        self.assert_(connection2.disconnect ())
+        self.assert_(not signal.has_handlers ())
+
+        signal.emit (3)
+
+        test.assert_results (('a', 1), ('a', 1), ('a', 2))
+
+
+    def test_block (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        connection1 = signal.connect_handle (test.simple_handler)
+        connection2 = signal.connect_handle (test.simple_handler)
+
+        self.assert_(connection1.block ())
+        self.assert_(connection1.block ())
+        self.assert_(connection1.is_blocked ())
+        self.assert_(not connection2.is_blocked ())
+
+        signal.emit (1)
+
+        self.assert_(connection1.unblock ())
+        signal.emit (2)
+
+        self.assert_(connection1.unblock ())
+        self.assert_(not connection1.unblock ())
+        signal.emit (3)
+
+        test.assert_results (1, 2, 3, 3)
+
+
+    def test_equality_based_methods (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        connection = signal.connect_handle (test.simple_handler)
+
+        self.assert_(signal.is_connected (test.simple_handler))
+        self.assert_(signal.block (test.simple_handler))
+        self.assert_(connection.is_blocked ())
+
+        self.assert_(signal.disconnect (test.simple_handler))
+        self.assert_(not connection.is_connected ())
+        self.assert_(not connection.block ())
+
+
+    def test_disconnect_in_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (lambda *ignored: connection.disconnect ())
+        connection = signal.connect_handle (test.simple_handler)
+
+        signal.emit (1)
+        signal.emit (2)
+
+        test.assert_results ()
+
+
+    def test_many_disconnections (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        connections = [signal.connect_handle (test.simple_handler, k) for k in range (0, 100)]
+
+        for connection in connections[:-1]:
+            connection.disconnect ()
+
+        # Disconnected handlers must not accumulate.
+        self.assert_(len (signal._handlers) < 4)
+        self.assertEqual (signal.count_handlers (), 1)
+
+        signal.emit ('a')
+
+        connections[-1].disconnect ()
+        self.assert_(signal._handlers is None)
+
+        test.assert_results ((99, 'a'))
+
+
+    def test_garbage_collected_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        handler    = HandlerGarbageCollectionTestCase.HandlerObject (test)
+        connection = signal.connect_handle (handler.simple_handler)
+
+        del handler
+        self.collect_garbage ()
+
+        self.assert_(not connection.is_connected ())
+
+        signal.emit (1)
+
+        self.assert_(not connection.disconnect ())
+        test.assert_results ()
+
+
+    def test_clean_signal (self):
+        test   = NotifyTestObject ()
+        signal = CleanSignal (test)
+
+        connection = signal.connect_handle (test.simple_handler)
+        signal.emit (1)
+
+        connection.disconnect ()
+        signal.emit (2)
+
+        test.assert_results (1)
+
+
+
+class HandlerPriorityTestCase (NotifyTestCase):
+
+    def test_priority_order (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, 'a')
+        signal.connect (test.simple_handler, 'b', _priority = 10)
+        signal.connect (test.simple_handler, 'c', _priority = -5)
+        signal.connect (test.simple_handler, 'd', _priority = 10)
+        signal.connect (test.simple_handler, 'e')
+        signal.connect (test.simple_handler, 'f', _priority = 5)
+
+        signal.emit ()
+
+        test.assert_results ('b', 'd', 'f', 'a', 'e', 'c')
+
+
+    def test_connect_safe (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, 'a')
+        self.assert_(signal.connect_safe (test.simple_handler, 'b', _priority = 1))
+        self.assert_(not signal.connect_safe (test.simple_handler, 'b', _priority = 2))
+
+        signal.emit ()
+
+        test.assert_results ('b', 'a')
+
+
+    def test_block_and_disconnect (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, 'a')
+        signal.connect (test.simple_handler, 'b', _priority = 1)
+
+        self.assert_(signal.block (test.simple_handler, 'b'))
+        signal.emit (1)
+        self.assert_(signal.unblock (test.simple_handler, 'b'))
+
+        self.assert_(signal.disconnect (test.simple_handler, 'a'))
+        signal.connect (test.simple_handler, 'c', _priority = 2)
+        signal.emit (2)
+
+        test.assert_results (('a', 1), ('c', 2), ('b', 2))
+
+
+    def test_connection_handle (self):
+        test       = NotifyTestObject ()
+        signal     = Signal ()
+        signal.connect (test.simple_handler, 'a')
+        connection = signal.connect_handle (test.simple_handler, 'b', _priority = 3)
+
+        self.assertEqual (connection.priority, 3)
+
+        signal.emit ()
+        connection.disconnect ()
+        signal.emit ()
+
+        test.assert_results ('b', 'a', 'a')
+
+
+    def test_nested_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def reemit (number):
+            if number == 0:
+                signal.connect (test.simple_handler, 'first', _priority = 10)
+                signal.emit (1)
+
+        signal.connect (reemit)
+        signal.connect (test.simple_handler, 'last', _priority = -10)
+
+        signal.emit (0)
+
+        test.assert_results (('first', 1), ('last', 1), ('last', 0))
+
+
+    def test_batch_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect_batch (test.simple_handler, 'batch', _priority = 1)
+
+        signal.emit_many ([(1,), (2,)])
+
+        test.assert_results (('batch', [(1,), (2,)]), 1, 2)
+
+
+
+class KeyedSignalTestCase (NotifyTestCase):
+
+    def test_keyed_emission (self):
+        test   = NotifyTestObject ()
+        signal = KeyedSignal ()
+
+        signal.connect_key ('a', test.simple_handler, 'for a')
+        signal.connect_key ('b', test.simple_handler, 'for b')
+        signal.connect (test.simple_handler, 'any')
+
+        signal.emit ('a', 1)
+        signal.emit ('b')
+        signal.emit ('c')
+        signal.emit ()
+        signal.emit ([])
+
+        test.assert_results (('for a', 'a', 1), ('any', 'a', 1), ('for b', 'b'), ('any', 'b'),
+                             ('any', 'c'), 'any', ('any', []))
+
+
+    def test_priority (self):
+        test   = NotifyTestObject ()
+        signal = KeyedSignal ()
+
+        signal.connect (test.simple_handler, 'any 1', _priority = 1)
+        signal.connect (test.simple_handler, 'any 0')
+        signal.connect_key (0, test.simple_handler, 'keyed 0')
+        signal.connect_key (0, test.simple_handler, 'keyed 2', _priority = 2)
+
+        signal.emit (0)
+
+        test.assert_results (('keyed 2', 0), ('any 1', 0), ('keyed 0', 0), ('any 0', 0))
+
+
+    def test_accumulator (self):
+        signal = KeyedSignal (Signal.VALUE_LIST)
+
+        signal.connect_key (1, lambda x: x * 10)
+        signal.connect_key (2, lambda x: x * 20)
+        signal.connect (lambda x: -x)
+
+        self.assertEqual (signal.emit (1), [10, -1])
+        self.assertEqual (signal.emit (2), [40, -2])
+        self.assertEqual (signal.emit (3), [-3])
+
+        self.assertEqual (signal.emit_many ([(1,), (3,)]), [[10, -1], [-3]])
+        self.assertEqual (signal.emit_many ([(1,), (3,)], reduce = True), [10, -1, -3])
+
+        any_accepts = KeyedSignal (Signal.ANY_ACCEPTS)
+        any_accepts.connect_key ('x', lambda x: 'accepted')
+        any_accepts.connect (lambda x: self.fail ())
+
+        self.assertEqual (any_accepts.emit ('x'), 'accepted')
+
+
+    def test_disconnect_and_block (self):
+        test   = NotifyTestObject ()
+        signal = KeyedSignal ()
+
+        signal.connect_key ('a', test.simple_handler)
+        signal.connect_key ('a', test.simple_handler)
+        signal.connect_key ('b', test.simple_handler)
+
+        self.assert_(signal.is_connected_key ('a', test.simple_handler))
+        self.assert_(not signal.is_connected ('a', test.simple_handler))
+        self.assertEqual (signal.count_key_handlers ('a'), 2)
+        self.assertEqual (signal.count_handlers (), 3)
+
+        self.assert_(signal.block_key ('a', test.simple_handler))
+        signal.emit ('a')
+        self.assert_(signal.unblock_key ('a', test.simple_handler))
+        self.assert_(not signal.unblock_key ('a', test.simple_handler))
+
+        self.assert_(signal.disconnect_key ('a', test.simple_handler))
+        signal.emit ('a')
+
+        self.assert_(signal.disconnect_key ('a', test.simple_handler))
+        self.assert_(not signal.disconnect_key ('a', test.simple_handler))
+        signal.emit ('a')
+
+        self.assertEqual (signal.get_keys (), ['b'])
+
+        connection = signal.connect_key_handle ('c', test.simple_handler)
+        signal.emit ('c')
+
+        self.assert_(connection.disconnect ())
+        self.assertEqual (signal.get_keys (), ['b'])
+        self.assert_(signal.disconnect_key ('b', test.simple_handler))
+        self.assert_(not signal.has_handlers ())
+
+        test.assert_results ('a', 'c')
+
+
+    def test_garbage_collection (self):
+        test   = NotifyTestObject ()
+        signal = KeyedSignal ()
+
+        signal.connect_key ('a', test.simple_handler)
+        signal.connect_key ('a', NotifyTestObject ().simple_handler)
+        signal.connect_key ('b', NotifyTestObject ().simple_handler)
+
+        self.assertEqual (signal.count_handlers (), 1)
+
+        signal.emit ('a')
+        self.assertEqual (signal.count_key_handlers ('a'), 1)
+        self.assertEqual (sorted (signal.get_keys ()), ['a', 'b'])
+
+        signal.collect_garbage ()
+        self.assertEqual (signal.get_keys (), ['a'])
+
+        test.assert_results ('a')
+
+
+
+class QueuedSignalTestCase (NotifyTestCase):
+
+    def test_queued_order (self):
+        test   = NotifyTestObject ()
+        signal = QueuedSignal ()
+
+        def reemitting_handler (value):
+            test.results.append ((value, signal.emission_level))
+            if value < 2:
+                signal.emit (value * 2 + 1)
+                signal.emit (value * 2 + 2)
+
+        signal.connect (reemitting_handler)
+        signal.connect (test.simple_handler)
+
+        signal.emit (0)
+
+        # A plain signal would call the first handler with 0, 1, 3, 4, 2 and the second
+        # one with 3, 4, 1, 2, 0.
+        test.assert_results ((0, 1), 0, (1, 1), 1, (2, 1), 2, (3, 1), 3, (4, 1), 4)
+        self.assertEqual (signal.count_queued_emissions (), 0)
+
+
+    def test_flat_stack (self):
+        signal   = QueuedSignal ()
+        levels   = {}
+        num_left = [sys.getrecursionlimit () * 2]
+
+        def reemitting_handler ():
+            levels[signal.emission_level] = True
+            num_left[0] -= 1
+            if num_left[0] > 0:
+                signal.emit ()
+
+        signal.connect (reemitting_handler)
+        signal.emit ()
+
+        self.assertEqual (num_left[0], 0)
+        self.assertEqual (list (levels.keys ()), [1])
+
+
+    def test_return_value (self):
+        signal = QueuedSignal (AbstractSignal.VALUE_LIST)
+        values = []
+
+        def reemitting_handler (value):
+            if value == 0:
+                values.append (signal.emit (1))
+            return value
+
+        signal.connect (reemitting_handler)
+
+        self.assertEqual (signal.emit (0), [0])
+        self.assertEqual (values, [None])
+        self.assertEqual (signal.emit (2), [2])
+
+
+    def test_stop_emission (self):
+        test   = NotifyTestObject ()
+        signal = QueuedSignal ()
+
+        def stopping_handler (value):
+            if value == 0:
+                signal.emit (1)
+                signal.stop_emission ()
+            elif value == 1:
+                signal.emit (2)
+                signal.emit (3)
+                test.results.append (signal.count_queued_emissions ())
+                test.results.append (signal.discard_queued_emissions ())
+                test.results.append (signal.discard_queued_emissions ())
+
+        signal.connect (stopping_handler)
+        signal.connect (test.simple_handler)
+
+        signal.emit (0)
+
+        test.assert_results (2, True, False, 1)
+
+
+    def test_exception (self):
+        test   = NotifyTestObject ()
+        signal = QueuedSignal ()
+
+        def raising_handler (value):
+            if value == 0:
+                signal.emit (1)
+                raise ValueError
+
+        signal.connect (raising_handler)
+        signal.connect (test.simple_handler)
+
+        original_handler = AbstractSignal.__dict__['exception_handler']
+        AbstractSignal.exception_handler = \
+            staticmethod (AbstractSignal.reraising_exception_handler)
+
+        try:
+            self.assertRaises (ValueError, signal.emit, 0)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        self.assertEqual (signal.emission_level, 0)
+        self.assertEqual (signal.count_queued_emissions (), 0)
+
+        signal.emit (2)
+        test.assert_results (2)
+
+
+
+class AsynchronousEmissionTestCase (NotifyTestCase):
+
+    def setUp (self):
+        super (AsynchronousEmissionTestCase, self).setUp ()
+        self.executor = ThreadPoolExecutor (2)
+
+    def tearDown (self):
+        self.executor.shutdown ()
+        del self.executor
+        super (AsynchronousEmissionTestCase, self).tearDown ()
+
+
+    def test_asynchronous_signal (self):
+        signal = Signal (AbstractSignal.VALUE_LIST, asynchronous = True, executor = self.executor)
+        signal.connect (lambda x: x * 2)
+        signal.connect (lambda x: x * 3)
+
+        future = signal.emit (5)
+        self.assertEqual (future.result (5), [10, 15])
+
+
+    def test_asynchronous_keyword (self):
+        signal = Signal (AbstractSignal.LAST_VALUE, executor = self.executor)
+        signal.connect (lambda x: x + 1)
+
+        self.assertEqual (signal.emit (1), 2)
+        self.assertEqual (signal.emit (2, _async = True).result (5), 3)
+
+
+    def test_default_executor (self):
+        original_default         = AbstractExecutor.default
+        AbstractExecutor.default = self.executor
+
+        try:
+            signal = Signal (AbstractSignal.LAST_VALUE, asynchronous = True)
+            signal.connect (lambda: threading.currentThread ())
+
+            self.assert_(signal.executor is None)
+            self.assert_(signal.emit ().result (5) is not threading.currentThread ())
+        finally:
+            AbstractExecutor.default = original_default
+
+
+    def test_ordered_emission (self):
+        test   = NotifyTestObject ()
+        signal = Signal (asynchronous = True, executor = self.executor, ordered = True)
+        signal.connect (test.simple_handler)
+
+        self.assert_(signal.ordered)
+
+        for future in [signal.emit (k) for k in range (0, 20)]:
+            future.result (5)
+
+        test.assert_results (*range (0, 20))
+
+
+
+class ProcessEmissionTestCase (NotifyTestCase):
+
+    # Handlers used here are defined at module level, since they must be picklable.
+    # Most tests use a thread pool: pickling is done all the same, but it is faster.
+
+    def setUp (self):
+        super (ProcessEmissionTestCase, self).setUp ()
+        self.executor = ThreadPoolExecutor (2)
+
+    def tearDown (self):
+        self.executor.shutdown ()
+        del self.executor
+        super (ProcessEmissionTestCase, self).tearDown ()
+
+
+    def test_emission (self):
+        signal = Signal (Signal.VALUE_LIST)
+        object = _PicklableObject (10)
+
+        signal.connect (_multiply, 2)
+        signal.connect (object.add)
+        signal.connect (_multiply, 3, c = 1)
+        signal.connect_batch (_sum_batch)
+        signal.connect (_multiply, 4)
+        signal.block (_multiply, 4)
+
+        self.assertEqual (signal.emit_in_processes (self.executor, 5).result (5),
+                          [10, 15, 16, 5])
+
+
+    def test_no_handlers (self):
+        self.assertEqual (Signal ().emit_in_processes (self.executor).result (5), None)
+        self.assertEqual (Signal (Signal.VALUE_LIST).emit_in_processes (self.executor)
+                          .result (5),
+                          [])
+
+
+    def test_accumulator_stop (self):
+        signal = Signal (Signal.ANY_ACCEPTS)
+
+        signal.connect (_multiply, 0)
+        signal.connect (_multiply, 1)
+        signal.connect (_raise_error)
+
+        self.assertEqual (signal.emit_in_processes (self.executor, 7).result (5), 7)
+
+
+    def test_unpicklable_handler (self):
+        signal = Signal ()
+        signal.connect (lambda x: x)
+
+        self.assertRaises (TypeError, signal.emit_in_processes, self.executor, 1)
+
+
+    def test_unpicklable_argument (self):
+        signal = Signal ()
+        signal.connect (_multiply, 2)
+
+        self.assertRaises (TypeError, signal.emit_in_processes, self.executor, lambda: 1)
+
+
+    def test_exception_handler (self):
+        signal = Signal (Signal.VALUE_LIST)
+        signal.connect (_raise_error)
+        signal.connect (_multiply, 2)
+
+        original_handler = AbstractSignal.__dict__['exception_handler']
+        AbstractSignal.exception_handler = \
+            staticmethod (AbstractSignal.reraising_exception_handler)
+
+        try:
+            future = signal.emit_in_processes (self.executor, 1)
+            self.assert_(isinstance (future.exception (5), ValueError))
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+
+    if NotifyTestCase.note_skipped_tests (ProcessPoolExecutor is not None):
+
+        def test_process_pool (self):
+            signal   = Signal (Signal.VALUE_LIST)
+            object   = _PicklableObject (1)
+            executor = ProcessPoolExecutor (2)
+
+            signal.connect (_multiply, 2)
+            signal.connect (_multiply, 3)
+            signal.connect (object.add)
+
+            try:
+                self.assertEqual (signal.emit_in_processes (executor, 5).result (30),
+                                  [10, 15, 6])
+            finally:
+                executor.shutdown ()
+
+
+
+class BatchEmissionTestCase (NotifyTestCase):
+
+    def test_emit_many (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler, 'a')
+        signal.connect (test.simple_handler_100)
+        signal.block (test.simple_handler_100)
+
+        signal.emit_many ([(1,), (2,)])
+        signal.emit_many ([])
+
+        test.assert_results (1, 2, ('a', 1), ('a', 2))
+
+
+    def test_batch_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        signal.connect (test.simple_handler, 'first')
+        signal.connect_batch (test.simple_handler)
+        signal.connect_batch (test.simple_handler, 'a')
+
+        signal.emit_many ([(1,), (2, 3)])
+        signal.emit (4)
+
+        test.assert_results (('first', 1), ('first', 2, 3), [(1,), (2, 3)], ('a', [(1,), (2, 3)]),
+                             ('first', 4), [(4,)], ('a', [(4,)]))
+
+        self.assert_(signal.is_connected (test.simple_handler))
+        self.assert_(signal.disconnect (test.simple_handler, 'a'))
+        self.assert_(signal.block (test.simple_handler))
+
+        signal.emit_many ([(5,)])
+
+        test.assert_results (('first', 1), ('first', 2, 3), [(1,), (2, 3)], ('a', [(1,), (2, 3)]),
+                             ('first', 4), [(4,)], ('a', [(4,)]), ('first', 5))
+
+
+    def test_accumulator (self):
+        signal = Signal (AbstractSignal.VALUE_LIST)
+
+        signal.connect (lambda x: x * 2)
+        signal.connect_batch (lambda batch: [x * 3 for x, in batch])
+
+        self.assertEqual (signal.emit_many ([(1,), (2,)]), [[2, 3], [4, 6]])
+        self.assertEqual (signal.emit_many ([(1,), (2,)], reduce = True), [2, 4, 3, 6])
+        self.assertEqual (signal.emit (5), [10, 15])
+
+
+    def test_should_continue (self):
+        test   = NotifyTestObject ()
+        signal = Signal (AbstractSignal.ANY_ACCEPTS)
+
+        signal.connect (lambda x: x == 2)
+        signal.connect_batch (lambda batch: test.simple_handler (batch) or [False] * len (batch))
+        signal.connect (lambda x: x == 1)
+
+        self.assertEqual (signal.emit_many ([(1,), (2,), (3,)]), [True, True, False])
+        self.assertEqual (signal.emit_many ([(1,), (2,), (3,)], reduce = True), True)
+
+        test.assert_results ([(1,), (3,)])
+
+
+    def test_emission_stop (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def stopping_handler (x):
+            if x == 2:
+                signal.stop_emission ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (stopping_handler)
+        signal.connect (test.simple_handler)
+
+        signal.emit_many ([(1,), (2,), (3,)])
+
+        test.assert_results (1, 2, 3)
+        self.assertEqual (signal.emission_level, 0)
+
+
+
+class IterativeEmissionTestCase (NotifyTestCase):
+
+    def test_emit_iter (self):
+        test   = NotifyTestObject ()
+        signal = Signal (AbstractSignal.VALUE_LIST)
+
+        signal.connect (lambda x: x * 2)
+        signal.connect (test.simple_handler_100)
+        signal.connect (lambda x: x * 3)
+        signal.block (test.simple_handler_100)
+
+        self.assertEqual (list (signal.emit_iter (5)), [10, 15])
+        self.assertEqual (list (Signal ().emit_iter (5)), [])
+
+
+    def test_laziness (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def handler (x):
+            test.simple_handler (x)
+            return x
+
+        signal.connect (handler, 1)
+        signal.connect (handler, 2)
+        signal.connect (handler, 3)
+
+        iterator = signal.emit_iter ()
+
+        self.assertEqual (next (iterator), 1)
+        test.assert_results (1)
+
+        self.assertEqual (next (iterator), 2)
+        iterator.close ()
+
+        self.assertEqual (list (iterator), [])
+        test.assert_results (1, 2)
+
+
+    def test_emission_level (self):
+        levels = []
+        signal = Signal ()
+
+        signal.connect (lambda: levels.append (signal.emission_level))
+        signal.connect (lambda: levels.append (signal.emission_level))
+
+        for value in signal.emit_iter ():
+            levels.append (signal.emission_level)
+
+        def nested_handler ():
+            signal.disconnect (nested_handler)
+            list (signal.emit_iter ())
+
+        signal.connect (nested_handler)
+        signal.emit ()
+
+        self.assertEqual (levels, [1, 0, 1, 0, 1, 1, 2, 2])
+        self.assertEqual (signal.emission_level, 0)
+
+
+    def test_emission_stop (self):
+        signal = Signal ()
+
+        signal.connect (lambda: 1)
+        signal.connect (lambda: signal.stop_emission ())
+        signal.connect (lambda: 3)
+
+        self.assertEqual (list (signal.emit_iter ()), [1, True])
+        self.assertEqual (signal.emission_level, 0)
+
+
+    def test_exception (self):
+        signal = Signal ()
+
+        signal.connect (lambda: 1)
+        signal.connect (lambda: 1 // 0)
+        signal.connect (lambda: 3)
+
+        original_handler = AbstractSignal.__dict__['exception_handler']
+        AbstractSignal.exception_handler = \
+            staticmethod (AbstractSignal.ignoring_exception_handler)
+
+        try:
+            self.assertEqual (list (signal.emit_iter ()), [1, 3])
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+
+    def test_garbage_collection (self):
+        test    = NotifyTestObject ()
+        signal  = Signal ()
+        handler = HandlerGarbageCollectionTestCase.HandlerObject (test)
+
+        signal.connect (handler.simple_handler)
+        signal.connect (lambda x: x)
+
+        del handler
+        self.collect_garbage ()
+
+        iterator = signal.emit_iter (1)
+        self.assertEqual (next (iterator), 1)
+        self.assertEqual (len (signal._handlers), 2)
+
+        iterator.close ()
+        self.assertEqual (len (signal._handlers), 1)
+
+
+    def test_keyed_signal (self):
+        signal = KeyedSignal ()
+
+        signal.connect_key ('a', lambda key: 'a')
+        signal.connect_key ('b', lambda key: 'b')
+        signal.connect (lambda key: 'any')
+
+        self.assertEqual (list (signal.emit_iter ('a')), ['a', 'any'])
+
+
+
+class RateLimitingSignalTestCase (NotifyTestCase):
+
+    def test_debounced_signal (self):
+        test      = NotifyTestObject ()
+        scheduler = ManualScheduler ()
+        signal    = DebouncedSignal (1, scheduler)
+
+        signal.connect (test.simple_handler)
+
+        signal.emit (1)
+        scheduler.advance (0.5)
+        signal.emit (2)
+        scheduler.advance (0.5)
+        signal.emit (3)
+
+        self.assert_(signal.has_pending_emission ())
+        test.assert_results ()
+
+        scheduler.advance (1)
+        test.assert_results (3)
+
+        signal.emit (4)
+        scheduler.advance (1)
+        test.assert_results (3, 4)
+        self.assertEqual (scheduler.count_pending_calls (), 0)
+
+
+    def test_throttled_signal (self):
+        test      = NotifyTestObject ()
+        scheduler = ManualScheduler ()
+        signal    = ThrottledSignal (1, scheduler)
+
+        signal.connect (test.simple_handler)
+
+        signal.emit (1)
+        test.assert_results (1)
+
+        for k in range (2, 10):
+            signal.emit (k)
+            scheduler.advance (0.25)
+
+        test.assert_results (1, 5, 9)
+
+        scheduler.advance (1)
+        test.assert_results (1, 5, 9)
+        self.assertEqual (scheduler.count_pending_calls (), 0)
+
+        signal.emit (10)
+        test.assert_results (1, 5, 9, 10)
+
+
+    def test_debounced_superseded_call (self):
+        test      = NotifyTestObject ()
+        scheduler = _LateCancellingScheduler ()
+        signal    = DebouncedSignal (1, scheduler)
+
+        signal.connect (test.simple_handler)
+
+        signal.emit (1)
+        signal.emit (2)
+
+        # The first call was already running when the second emission cancelled it.
+        scheduler.run (0)
+        test.assert_results ()
+        self.assert_(signal.has_pending_emission ())
+
+        signal.emit (3)
+        self.assert_(scheduler.calls[1][0].cancelled)
+
+        scheduler.run (2)
+        test.assert_results (3)
+        self.assert_(not signal.has_pending_emission ())
+
+
+    def test_async_keyword (self):
+        test      = NotifyTestObject ()
+        scheduler = ManualScheduler ()
+        debounced = DebouncedSignal (1, scheduler)
+        throttled = ThrottledSignal (1, scheduler)
+
+        debounced.connect (test.simple_keywords_handler)
+        throttled.connect (test.simple_keywords_handler)
+
+        throttled.emit (1, _async = False, a = 1)
+        debounced.emit (2, _async = True)
+        scheduler.advance (1)
+
+        test.assert_results ((1, { 'a': 1 }), (2, { }))
+
+
+    def test_merge (self):
+        test      = NotifyTestObject ()
+        scheduler = ManualScheduler ()
+        signal    = DebouncedSignal (1, scheduler, lambda pending, new: pending + new)
+
+        signal.connect (test.simple_keywords_handler)
+
+        signal.emit (1, a = 1)
+        signal.emit (2, 3, a = 2, b = 3)
+        scheduler.advance (1)
+
+        test.assert_results ((1, 2, 3, { 'a': 2, 'b': 3 }))
+
+
+    def test_flush_and_discard (self):
+        test      = NotifyTestObject ()
+        scheduler = ManualScheduler ()
+        signal    = DebouncedSignal (1, scheduler)
+
+        signal.connect (test.simple_handler)
+
+        signal.emit (1)
+        self.assert_(signal.flush ())
+        self.assert_(not signal.flush ())
+        test.assert_results (1)
+
+        signal.emit (2)
+        self.assert_(signal.discard_pending_emission ())
+        scheduler.advance (1)
+        test.assert_results (1)
+
+
+    def test_source (self):
+        test      = NotifyTestObject ()
+        scheduler = ManualScheduler ()
+        variable  = Variable ()
+        signal    = DebouncedSignal (0.1, scheduler, source = variable.changed)
+
+        signal.connect (test.simple_handler)
+
+        for k in range (0, 100):
+            variable.value = k
+
+        scheduler.advance (1)
+        test.assert_results (99)
+
+        del signal
+        self.assert_(not variable.changed.has_handlers ())
+
+
+
+class _LateCancellingScheduler (object):
+
+    # Scheduler whose calls are made only by `run', even if cancelled, as if they had
+    # already started by then.
+
+    def __init__(self):
+        self.calls = []
+
+
+    def call_later (self, delay, function, *arguments):
+        call = _LateCancellingCall ()
+        self.calls.append ((call, function, arguments))
+        return call
+
+
+    def run (self, index):
+        call, function, arguments = self.calls[index]
+        function (*arguments)
+
+
+class _LateCancellingCall (object):
+
+    def __init__(self):
+        self.cancelled = False
+
+
+    def cancel (self):
+        self.cancelled = True
+
+
+
+class ThreadSafeSignalTestCase (NotifyTestCase):
+
+    def test_emission (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal (Signal.VALUE_LIST)
+
+        signal.connect (test.simple_handler)
+        signal.connect (lambda x: x * 2)
+
+        self.assertEqual (signal.emit (1), [None, 2])
+        self.assertEqual (signal.emission_level, 0)
+
+        signal.block (test.simple_handler)
+        signal.emit (2)
+
+        test.assert_results (1)
+
+
+    def test_concurrent_emission (self):
+        signal  = ThreadSafeSignal ()
+        levels  = []
+        counter = [0]
+        lock    = threading.Lock ()
+
+        def handler ():
+            lock.acquire ()
+            try:
+                levels.append (signal.emission_level)
+                counter[0] += 1
+            finally:
+                lock.release ()
+
+        signal.connect (handler)
+
+        def emit_many_times ():
+            for k in range (0, 200):
+                signal.emit ()
+
+        threads = [threading.Thread (target = emit_many_times) for k in range (0, 4)]
+        for thread in threads:
+            thread.start ()
+        for thread in threads:
+            thread.join ()
+
+        self.assertEqual (counter[0], 800)
+        self.assertEqual (levels, [1] * 800)
+        self.assertEqual (signal.emission_level, 0)
+
+
+    def test_concurrent_connection (self):
+        signal = ThreadSafeSignal ()
+        stop   = [False]
+
+        def emit_continuously ():
+            while not stop[0]:
+                signal.emit ()
+
+        emitter = threading.Thread (target = emit_continuously)
+        emitter.start ()
+
+        try:
+            handlers = [NotifyTestObject ().simple_handler for k in range (0, 50)]
+
+            for k in range (0, 10):
+                for handler in handlers:
+                    signal.connect (handler)
+                for handler in handlers[::2]:
+                    signal.disconnect (handler)
+
+            self.assertEqual (signal.count_handlers (), 10 * 50 - 10 * 25)
+
+            for handler in handlers:
+                signal.disconnect_all (handler)
+        finally:
+            stop[0] = True
+            emitter.join ()
+
+        self.assert_(not signal.has_handlers ())
+
+
+    def test_concurrent_safe_connection (self):
+        class SlowSignal (ThreadSafeSignal):
+            __slots__ = ()
+
+            def _wrap_handler (self, handler, *arguments, **keywords):
+                # Widen the window between checking and connecting.
+                time.sleep (0.01)
+                return super (SlowSignal, self)._wrap_handler (handler, *arguments, **keywords)
+
+        signal  = SlowSignal ()
+        handler = lambda: None
+        results = []
+
+        def connect_safe ():
+            results.append (signal.connect_safe (handler))
+
+        threads = [threading.Thread (target = connect_safe) for k in range (0, 4)]
+        for thread in threads:
+            thread.start ()
+        for thread in threads:
+            thread.join ()
+
+        self.assertEqual (signal.count_handlers (), 1)
+        self.assertEqual (sorted (results), [False, False, False, True])
+
+
+    def test_concurrent_object_connections (self):
+        # Switch threads as often as possible, so that they interleave in the registry.
+        if hasattr (sys, 'setswitchinterval'):
+            switch_interval = sys.getswitchinterval ()
+            sys.setswitchinterval (1e-6)
+        else:
+            switch_interval = sys.getcheckinterval ()
+            sys.setcheckinterval (1)
+
+        try:
+            test     = NotifyTestObject ()
+            signals  = [ThreadSafeCleanSignal () for k in range (0, 8)]
+            handlers = [HandlerGarbageCollectionTestCase.HandlerObject (test)
+                        for k in range (0, 20)]
+
+            def connect_all (signal):
+                for k in range (0, 5):
+                    for handler in handlers:
+                        signal.connect (handler.simple_handler, k)
+
+            threads = [threading.Thread (target = connect_all, args = (signal,))
+                       for signal in signals]
+            for thread in threads:
+                thread.start ()
+            for thread in threads:
+                thread.join ()
+        finally:
+            if hasattr (sys, 'setswitchinterval'):
+                sys.setswitchinterval (switch_interval)
+            else:
+                sys.setcheckinterval (switch_interval)
+
+        for handler in handlers:
+            self.assertEqual (CleanSignal.disconnect_object (handler), 8 * 5)
+
+        for signal in signals:
+            self.assert_(not signal.has_handlers ())
+
+
+    def test_per_thread_emission_stop (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeSignal ()
+
+        def emit_in_other_thread ():
+            thread = threading.Thread (target = signal.emit, args = ('other',))
+            thread.start ()
+            thread.join ()
+
+        def stopping_handler (argument):
+            if argument == 'this':
+                emit_in_other_thread ()
+                signal.stop_emission ()
+
+        signal.connect (stopping_handler)
+        signal.connect (test.simple_handler)
+
+        signal.emit ('this')
+
+        test.assert_results ('other')
+
+
+    def test_connection_handle (self):
+        test       = NotifyTestObject ()
+        signal     = ThreadSafeSignal ()
+        connection = signal.connect_handle (test.simple_handler)
+
+        self.assert_(connection.block ())
+        signal.emit (1)
+        self.assert_(connection.unblock ())
+        self.assert_(not connection.unblock ())
+        signal.emit (2)
+
+        self.assert_(connection.disconnect ())
+        self.assert_(not connection.disconnect ())
+        self.assert_(not connection.block ())
+        signal.emit (3)
+
+        test.assert_results (2)
+
+
+    def test_clean_signal (self):
+        test   = NotifyTestObject ()
+        signal = ThreadSafeCleanSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (NotifyTestObject ().simple_handler)
+
+        self.assertEqual (signal.count_handlers (), 1)
+
+        signal.emit (1)
+        test.assert_results (1)
+
+        del test
+        self.assert_(not signal.has_handlers ())
+
+
+
+class ExceptionHandlingSignalTestCase (NotifyTestCase):
+
+    def test_exception_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def raising_handler (*arguments):
+            raise ValueError (arguments)
+
+        def exception_handler (signal, exception, handler):
+            test.results.append ((signal, type (exception), sys.exc_info () [1] is exception,
+                                  handler))
+
+        signal.connect (raising_handler)
+        signal.connect (test.simple_handler)
+
+        original_handler = AbstractSignal.__dict__['exception_handler']
+        AbstractSignal.exception_handler = staticmethod (exception_handler)
+
+        try:
+            signal.emit (1)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        test.assert_results ((signal, ValueError, True, raising_handler), 1)
+
+
+    def test_reraising_exception_handler (self):
+        test   = NotifyTestObject ()
+        signal = Signal ()
+
+        def raising_handler (*arguments):
+            test.results.append (signal.emission_level)
+            raise ValueError
+
+        signal.connect (raising_handler)
+        signal.connect (test.simple_handler)
+
+        original_handler = AbstractSignal.__dict__['exception_handler']
+        AbstractSignal.exception_handler = \
+            staticmethod (AbstractSignal.reraising_exception_handler)
+
+        try:
+            self.assertRaises (ValueError, signal.emit, 1)
+        finally:
+            AbstractSignal.exception_handler = original_handler
+
+        self.assertEqual    (signal.emission_level, 0)
+        test.assert_results (1)
+
+
+
+class PythonEmissionSignalTestCase (NotifyTestCase):
+
+    # Make sure pure Python emission (which is the fallback for C implementation) gives
+    # the same results.  Most other tests use C implementation, if it is available.
+
+    class PythonSignal (Signal):
+        __slots__ = ()
+
+    for name, method in _PYTHON_EMISSION_METHODS.items ():
+        setattr (PythonSignal, name, method)
+
+    del name, method
+
+
+    def test_fast_emission (self):
+        # The extension is optional, only check that it is used if it is available.
+        for name, method in _PYTHON_EMISSION_METHODS.items ():
+            if HAVE_FAST_EMISSION:
+                self.assert_(Signal.__dict__[name] is not method)
+            else:
+                self.assert_(Signal.__dict__[name] is method)
+
+
+    def test_emission (self):
+        test   = NotifyTestObject ()
+        signal = self.PythonSignal ()
+
+        signal.connect (test.simple_handler)
+        signal.connect (test.simple_handler, 'a')
+        signal.connect (test.simple_keywords_handler, b = 2)
+
+        signal.emit (1)
+        signal.block (test.simple_handler)
+        signal.emit (2)
+
+        test.assert_results (1, ('a', 1), (1, { 'b': 2 }), ('a', 2), (2, { 'b': 2 }))
+
+
+    def test_accumulator (self):
+        signal = self.PythonSignal (Signal.ANY_ACCEPTS)
+
+        signal.connect (lambda: 0)
+        signal.connect (lambda: 'accepted')
+        signal.connect (lambda: self.fail ())
+
+        self.assertEqual (signal.emit (), 'accepted')
+
+
+    def test_emission_stop (self):
+        test   = NotifyTestObject ()
+        signal = self.PythonSignal ()
+
+        def reemit_signal (number):
+            signal.stop_emission ()
+            if number < 3:
+                signal (number + 1)
+
+        signal.connect (test.simple_handler)
+        signal.connect (reemit_signal)
+        signal.connect (test.simple_handler)
+
+        signal.emit (0)
+
+        test.assert_results (0, 1, 2, 3)
+
+
+
+def _multiply (x, y, c = 0):
+    return x * y + c
+
+def _sum_batch (batch):
+    return [sum (arguments) for arguments in batch]
+
+def _raise_error (*arguments):
+    raise ValueError (arguments)
+
+
+class _PicklableObject (object):
+
+    def __init__(self, value):
+        self.value = value
+
+    def add (self, x):
+        return self.value + x
+
+
+
+import __future__
+
+if NotifyTestCase.note_skipped_tests ('with_statement' in __future__.all_feature_names):
+    from test._2_5.signal import SignalContextManagerTestCase
+
+if NotifyTestCase.note_skipped_tests (sys.version_info[:2] >= (3, 5)):
+    from test._3_5.signal import AsyncEmissionTestCase
 
 
 
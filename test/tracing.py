@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------#
+# This file is part of Py-notify.                                    #
+#                                                                    #
+# Copyright (C) 2008 Paul Pogonyshev.                                #
+#                                                                    #
+# This library is free software; you can redistribute it and/or      #
+# modify it under the terms of the GNU Lesser General Public License #
+# as published by the Free Software Foundation; either version 2.1   #
+# of the License, or (at your option) any later version.             #
+#                                                                    #
+# This library is distributed in the hope that it will be useful,    #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of     #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU  #
+# Lesser General Public License for more details.                    #
+#                                                                    #
+# You should have received a copy of the GNU Lesser General Public   #
+# License along with this library; if not, write to the Free         #
+# Software Foundation, Inc., 51 Franklin Street, Fifth Floor,        #
+# Boston, MA 02110-1301 USA                                          #
+#--------------------------------------------------------------------#
+
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    sys.path.insert (0, os.path.join (sys.path[0], os.pardir))
+
+
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+try:
+    import json
+except ImportError:
+    json = None
+
+from notify.signal    import Signal
+from notify.tracing   import EmissionTracer
+from notify.variable  import Variable
+from test.__common    import NotifyTestCase, NotifyTestObject
+
+
+
+class EmissionTracerTestCase (NotifyTestCase):
+
+    def test_nesting (self):
+        test   = NotifyTestObject ()
+        outer  = Signal ()
+        inner  = Signal ()
+        tracer = EmissionTracer ()
+
+        def relay (*arguments):
+            inner.emit (*arguments)
+
+        outer.connect (relay)
+        inner.connect (test.simple_handler)
+
+        tracer.enable ()
+        self.assert_(tracer.is_enabled ())
+
+        outer.emit (1)
+        Signal ().emit (2)
+
+        tracer.disable ()
+        outer.emit (3)
+
+        events = tracer.get_events ()
+        self.assertEqual ([event['ph'] for event in events], ['B', 'B', 'X', 'E', 'X', 'E'])
+        self.assertEqual ([event['args']['depth'] for event in events if event['ph'] == 'B'],
+                          [1, 2])
+        self.assertEqual ([event['name'] for event in events if event['ph'] == 'X'],
+                          ['NotifyTestObject.simple_handler', 'relay'])
+
+        # Timestamps must be consistent, otherwise viewers would show garbage.
+        self.assert_(events[0]['ts'] <= events[1]['ts'] <= events[2]['ts'])
+        self.assert_(events[2]['ts'] + events[2]['dur'] <= events[3]['ts'] <= events[5]['ts'])
+        self.assert_(events[4]['ts'] + events[4]['dur'] <= events[5]['ts'])
+
+        test.assert_results (1, 3)
+
+        tracer.clear ()
+        self.assertEqual (tracer.get_events (), [])
+
+
+    def test_emit_iter (self):
+        signal = Signal ()
+        tracer = EmissionTracer ()
+
+        signal.connect (lambda: 1)
+        signal.connect (lambda: 2)
+
+        tracer.enable ()
+
+        try:
+            # Interleaved iterators must still produce properly nested slices.
+            iterator1 = signal.emit_iter ()
+            iterator2 = signal.emit_iter ()
+
+            self.assertEqual (next (iterator1), 1)
+            self.assertEqual (next (iterator2), 1)
+            self.assertEqual (list (iterator1), [2])
+            iterator2.close ()
+        finally:
+            tracer.disable ()
+
+        events = tracer.get_events ()
+        self.assertEqual ([event['ph'] for event in events], ['B', 'X', 'E'] * 3)
+        self.assertEqual ([event['args']['depth'] for event in events if event['ph'] == 'B'],
+                          [1, 1, 1])
+
+
+    def test_signal_as_handler (self):
+        class ReferableSignal (Signal):
+            __slots__ = ('__weakref__',)
+
+        outer  = Signal ()
+        inner  = ReferableSignal ()
+        tracer = EmissionTracer ()
+
+        outer.connect (inner.emit)
+        inner.connect (lambda: None)
+
+        tracer.enable ()
+
+        try:
+            outer.emit ()
+        finally:
+            tracer.disable ()
+
+        self.assertEqual ([event['args']['depth'] for event in tracer.get_events ()
+                           if event['ph'] == 'B'],
+                          [1, 2])
+
+
+    def test_sampling (self):
+        outer  = Signal ()
+        inner  = Signal ()
+        tracer = EmissionTracer (sample_every = 3)
+
+        outer.connect (lambda: inner.emit ())
+        inner.connect (lambda: None)
+
+        tracer.enable ()
+
+        try:
+            for k in range (7):
+                outer.emit ()
+        finally:
+            tracer.disable ()
+
+        self.assertEqual (len ([event for event in tracer.get_events ()
+                                if event['ph'] == 'B']),
+                          6)
+
+        self.assertRaises (ValueError, EmissionTracer, 0)
+
+
+    def test_variable (self):
+        variable = Variable ()
+        tracer   = EmissionTracer ()
+
+        variable.changed.connect (lambda value: None)
+
+        tracer.enable ()
+
+        try:
+            variable.value = 1
+        finally:
+            tracer.disable ()
+
+        events = tracer.get_events ()
+        self.assertEqual ([event['ph'] for event in events], ['B', 'X', 'E'])
+        self.assertEqual (events[0]['args']['signal'], '0x%x' % id (variable.changed))
+
+
+    def test_write (self):
+        if json is None:
+            return
+
+        signal = Signal ()
+        tracer = EmissionTracer ()
+
+        signal.connect (lambda: None)
+
+        tracer.enable ()
+        signal.emit ()
+        tracer.disable ()
+
+        stream = StringIO ()
+        tracer.write (stream)
+
+        self.assertEqual (len (json.loads (stream.getvalue ()) ['traceEvents']), 3)
+
+
+    def test_coexistence_with_profiler (self):
+        from notify.profiling import EmissionProfiler
+
+        signal   = Signal ()
+        tracer   = EmissionTracer ()
+        profiler = EmissionProfiler ()
+
+        signal.connect (lambda: None)
+
+        tracer.enable ()
+        profiler.enable ()
+        signal.emit ()
+        tracer.disable ()
+        signal.emit ()
+        profiler.disable ()
+
+        self.assertEqual (len (tracer.get_events ()), 3)
+        self.assertEqual (profiler.get_statistics (signal) [0].num_calls, 2)
+
+
+
+if __name__ == '__main__':
+    unittest.main ()
+
+
+
+# Local variables:
+# mode: python
+# python-indent: 4
+# indent-tabs-mode: nil
+# fill-column: 90
+# End:
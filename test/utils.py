@@ -32,7 +32,8 @@ if __name__ == '__main__':
 import unittest
 
 from notify.utils import is_callable, is_valid_identifier, mangle_identifier, as_string, \
-                         raise_not_implemented_exception, DummyReference
+                         raise_not_implemented_exception, DummyReference, \
+                         _PYTHON_IMPLEMENTATION
 
 
 
@@ -142,6 +143,16 @@ class UtilsTestCase (unittest.TestCase):
         self.assert_(DummyReference (self) () is self)
 
 
+    def test_python_implementation (self):
+        try:
+            import platform
+            implementation = platform.python_implementation ()
+        except (ImportError, AttributeError):
+            return
+
+        self.assertEqual (_PYTHON_IMPLEMENTATION, implementation)
+
+
 
 if __name__ == '__main__':
     unittest.main ()